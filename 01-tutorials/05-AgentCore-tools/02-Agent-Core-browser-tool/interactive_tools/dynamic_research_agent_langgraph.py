@@ -6,6 +6,8 @@ With simplified architecture and robust error handling
 import asyncio
 import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, TypedDict, Optional, Any, Annotated
 from datetime import datetime
 
@@ -31,16 +33,34 @@ class AgentState(TypedDict):
     errors: List[str]
 
 
+WORKER_SETUP_CODE = """
+import os
+import matplotlib
+matplotlib.use('Agg')
+for directory in ('data', 'visualizations', 'reports'):
+    os.makedirs(directory, exist_ok=True)
+"""
+
+
 class ResearchAgent:
     """Streamlined research agent"""
     
-    def __init__(self, region: str = "us-west-2", model: str = "anthropic.claude-3-5-sonnet-20240620-v1:0"):
+    def __init__(self, region: str = "us-west-2", model: str = "anthropic.claude-3-5-sonnet-20240620-v1:0",
+                 max_parallel_sessions: int = 3, data_sources: Optional[List[Dict[str, Any]]] = None):
         self.region = region
         self.model = model
         self.llm = ChatBedrockConverse(
             model=model,
             region_name=region
         )
+        # Extra sources fetched alongside the built-in dataset, each a dict with
+        # "name", "code" and the text "files" it writes (e.g. ["data/prices.csv"])
+        self.data_sources = data_sources or []
+        self.max_parallel_sessions = max_parallel_sessions
+        self._worker_clients: List[CodeInterpreter] = []
+        self._file_list: Optional[List[str]] = None
+        # Batch workers copy their files into the main session one at a time
+        self._main_session_lock = threading.Lock()
         
         console.print("[cyan]Initializing Bedrock-AgentCore Tools...[/cyan]")
         
@@ -60,6 +80,12 @@ class ResearchAgent:
     
     def cleanup(self):
         console.print("\n[yellow]Cleaning up...[/yellow]")
+        for worker in self._worker_clients:
+            try:
+                worker.stop()
+            except Exception as e:
+                console.print(f"[yellow]Could not stop worker session: {e}[/yellow]")
+        self._worker_clients = []
         if self.code_client:
             self.code_client.stop()
     
@@ -104,17 +130,125 @@ for root, dirs, files in os.walk('.'):
     for file in files:
         print(f"{indent}    {file}")
 """
-        result = self.code_client.invoke("executeCode", {
-            "code": setup_code,
+        result = self._run_code(setup_code)
+        console.print(self._extract_output(result))
+    
+    def _run_code(self, code: str, client: Optional[CodeInterpreter] = None, **options) -> Dict:
+        """Execute code in the main (or given) sandbox; the cached file list is dropped
+        because the code may have written files"""
+        client = client or self.code_client
+        result = client.invoke("executeCode", {
+            "code": code,
             "language": "python",
-            "clearContext": False
+            "clearContext": False,
+            **options
         })
-        console.print(self._extract_output(result))
+        if client is self.code_client:
+            self._file_list = None
+        return result
     
     def _refresh_file_list(self):
         """Get updated list of files in the sandbox"""
         result = self.code_client.invoke("listFiles", {"path": ""})
-        return self._extract_output(result).strip().split('\n') if self._extract_output(result).strip() else []
+        output = self._extract_output(result).strip()
+        self._file_list = output.split('\n') if output else []
+        return self._file_list
+    
+    def list_files(self) -> List[str]:
+        """List files in the sandbox, only asking the sandbox again after a write"""
+        if self._file_list is None:
+            return list(self._refresh_file_list())
+        return list(self._file_list)
+    
+    def _get_worker_clients(self, count: int) -> List[CodeInterpreter]:
+        """Start extra Code Interpreter sessions for batch execution, reused across batches"""
+        while len(self._worker_clients) < min(count, self.max_parallel_sessions):
+            worker = CodeInterpreter(self.region)
+            session_id = worker.start()
+            self._worker_clients.append(worker)
+            self._run_code(WORKER_SETUP_CODE, client=worker)
+            console.print(f"✅ Worker Code Interpreter session: {session_id}")
+        return self._worker_clients[:count]
+    
+    def _copy_files_to_main_session(self, worker: CodeInterpreter, paths: List[str]) -> Optional[str]:
+        """Copy text files written in a worker session into the main sandbox, returns an error message on failure"""
+        dump_code = (
+            "import json\n"
+            f"paths = {json.dumps(paths)}\n"
+            "print(json.dumps({path: open(path).read() for path in paths}))"
+        )
+        result = self._run_code(dump_code, client=worker)
+        if result.get("isError", False):
+            return f"Could not read {paths}: {self._extract_output(result)}"
+        try:
+            contents = json.loads(result["structuredContent"]["stdout"])
+        except (KeyError, json.JSONDecodeError) as e:
+            return f"Could not read {paths}: {e}"
+        
+        with self._main_session_lock:
+            write_result = self.code_client.invoke("writeFiles", {
+                "content": [{"path": path, "text": text} for path, text in contents.items()]
+            })
+            self._file_list = None
+        if write_result.get("isError", False):
+            return f"Could not write {paths}: {self._extract_output(write_result)}"
+        return None
+    
+    def execute_code_batch(self, snippets: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run independent code snippets in parallel Code Interpreter sessions
+        
+        Each snippet is a dict with "code" and optionally "name" and "files". The
+        first snippet runs in the main session, so everything it writes is already
+        there. The others run at the same time in worker sessions, and the text
+        "files" they write are copied into the main sandbox afterwards so later
+        steps can use them.
+        
+        Returns one result dict ("name", "output", "error") per snippet, in order.
+        """
+        def run_in_main_session() -> Dict[str, Any]:
+            # Worker file copies also go to the main session, so they wait for this
+            with self._main_session_lock:
+                result = self._run_code(snippets[0]["code"])
+            return {
+                "name": snippets[0].get("name", "snippet 1"),
+                "output": self._extract_output(result),
+                "error": result.get("isError", False)
+            }
+        
+        if len(snippets) == 1:
+            return [run_in_main_session()]
+        
+        workers = self._get_worker_clients(len(snippets) - 1)
+        
+        def run_on_worker(worker: CodeInterpreter, index: int, snippet: Dict[str, Any]) -> Dict[str, Any]:
+            result = self._run_code(snippet["code"], client=worker)
+            outcome = {
+                "name": snippet.get("name", f"snippet {index + 1}"),
+                "output": self._extract_output(result),
+                "error": result.get("isError", False)
+            }
+            if snippet.get("files") and not outcome["error"]:
+                copy_error = self._copy_files_to_main_session(worker, snippet["files"])
+                if copy_error:
+                    outcome["output"] += f"\nSTDERR: {copy_error}"
+                    outcome["error"] = True
+            return outcome
+        
+        # Each worker runs its share of the remaining snippets one after another
+        def run_share(worker_index: int) -> List[tuple]:
+            return [
+                (index, run_on_worker(workers[worker_index], index, snippets[index]))
+                for index in range(1 + worker_index, len(snippets), len(workers))
+            ]
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(snippets)
+        with ThreadPoolExecutor(max_workers=len(workers) + 1) as executor:
+            main_result = executor.submit(run_in_main_session)
+            for share in executor.map(run_share, range(len(workers))):
+                for index, outcome in share:
+                    results[index] = outcome
+            results[0] = main_result.result()
+        return results
     
     def _extract_output(self, result: Dict) -> str:
         """Extract output from code execution result"""
@@ -180,11 +314,7 @@ Return ONLY the Python code, no explanations."""
         console.print(Syntax(code_preview, "python"))
         
         # Execute the code
-        result = self.code_client.invoke("executeCode", {
-            "code": generated_code,
-            "language": "python",
-            "clearContext": False
-        })
+        result = self._run_code(generated_code)
         
         # Extract output
         output = self._extract_output(result)
@@ -196,13 +326,9 @@ Return ONLY the Python code, no explanations."""
         else:
             console.print(f"[green]✅ Code executed successfully[/green]")
         
-        # Get updated file list
-        files = self._refresh_file_list()
-        
         return {
             "output": output,
-            "error": has_error,
-            "files": files
+            "error": has_error
         }
     
     def create_workflow(self) -> StateGraph:
@@ -362,20 +488,23 @@ print("\\nSummary statistics:")
 print(df.describe())
 """
         
-        # Execute the data creation code directly
-        result = self.code_client.invoke("executeCode", {
-            "code": synthetic_data_code,
-            "language": "python",
-            "clearContext": False
-        })
-        
-        output = self._extract_output(result)
-        console.print(output)
+        # Generate the built-in dataset in the main session while any extra sources
+        # are fetched in worker sessions; without extra sources nothing runs in parallel
+        sources = [{"name": "synthetic purchase data", "code": synthetic_data_code}] + self.data_sources
+        if len(sources) > 1:
+            console.print(f"[cyan]Fetching {len(sources)} sources in parallel sessions[/cyan]")
+        results = self.execute_code_batch(sources)
         
-        # Check if we have errors
+        outputs = []
         errors = state["errors"]
-        if result.get("isError", False):
-            errors.append("Error generating synthetic data")
+        for source_result in results:
+            if len(results) > 1:
+                outputs.append(f"--- {source_result['name']} ---")
+            outputs.append(source_result["output"])
+            if source_result["error"]:
+                errors.append(f"Error collecting {source_result['name']}")
+        output = "\n".join(outputs)
+        console.print(output)
         
         return {
             **state,
@@ -413,8 +542,7 @@ print(df.describe())
             **state,
             "research_data": {
                 **state["research_data"],
-                "processing_output": result["output"],
-                "available_files": result["files"]
+                "processing_output": result["output"]
             },
             "completed_tasks": state["completed_tasks"] + ["process_data"],
             "errors": errors
@@ -425,7 +553,7 @@ print(df.describe())
         console.print("\n[bold magenta]📈 Analyzing data...[/bold magenta]")
         
         # Find the best data file to use
-        available_files = state["research_data"].get("available_files", [])
+        available_files = self.list_files()
         data_file = 'data/processed_data.csv' if 'data/processed_data.csv' in available_files else 'data/research_data.csv'
         
         # Get understanding to guide analysis
@@ -444,7 +572,7 @@ print(df.describe())
             context={
                 "query": state["research_query"],
                 "understanding": understanding,
-                "available_files": state["research_data"].get("available_files", [])
+                "available_files": available_files
             }
         )
         
@@ -457,8 +585,7 @@ print(df.describe())
             **state,
             "research_data": {
                 **state["research_data"],
-                "analysis_output": result["output"],
-                "available_files": result["files"]
+                "analysis_output": result["output"]
             },
             "completed_tasks": state["completed_tasks"] + ["analyze_data"],
             "errors": errors
@@ -469,9 +596,7 @@ print(df.describe())
         console.print("\n[bold magenta]💡 Generating insights and report...[/bold magenta]")
         
         # Get list of available files
-        available_files = state["research_data"].get("available_files", [])
-        if not available_files:
-            available_files = self._refresh_file_list()
+        available_files = self.list_files()
             
         # Filter for specific file types
         data_files = [f for f in available_files if f.endswith('.csv') or f.endswith('.json')]
@@ -512,10 +637,9 @@ Format as a complete professional markdown document with proper headings, bullet
         
         # Save the report directly
         try:
-            save_result = self.code_client.invoke("executeCode", {
-                "code": f"import os\nos.makedirs('reports', exist_ok=True)\nwith open('reports/final_report.md', 'w') as f:\n    f.write('''{report_content}''')\nprint('Report saved successfully to reports/final_report.md')",
-                "language": "python"
-            })
+            save_result = self._run_code(
+                f"import os\nos.makedirs('reports', exist_ok=True)\nwith open('reports/final_report.md', 'w') as f:\n    f.write('''{report_content}''')\nprint('Report saved successfully to reports/final_report.md')"
+            )
             console.print(self._extract_output(save_result))
         except Exception as e:
             console.print(f"[yellow]Could not save report file: {e}[/yellow]")
@@ -545,8 +669,12 @@ Format as a complete professional markdown document with proper headings, bullet
         }
 
 
-async def run_research(query: str):
-    """Run research with dynamic LLM-generated code"""
+async def run_research(query: str, data_sources: Optional[List[Dict[str, Any]]] = None):
+    """Run research with dynamic LLM-generated code
+    
+    data_sources are extra data-fetching snippets (see ResearchAgent) that run in
+    parallel Code Interpreter sessions while the built-in dataset is generated.
+    """
     console.print(Panel(
         f"[bold cyan]🚀 Dynamic Research Agent[/bold cyan]\n\n"
         f"Research Query: {query}\n\n"
@@ -554,7 +682,7 @@ async def run_research(query: str):
         border_style="blue"
     ))
     
-    with ResearchAgent() as agent:
+    with ResearchAgent(data_sources=data_sources) as agent:
         workflow = agent.create_workflow()
         
         initial_state = {
@@ -570,7 +698,7 @@ async def run_research(query: str):
         
         # List all files created
         console.print("\n[bold]Files created during research:[/bold]")
-        files = agent._refresh_file_list()
+        files = agent.list_files()
         for file in files:
             if file.endswith(('/')):
                 console.print(f"[blue]📁 {file}[/blue]")
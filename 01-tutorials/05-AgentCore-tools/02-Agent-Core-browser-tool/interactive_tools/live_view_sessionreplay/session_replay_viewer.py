@@ -17,6 +17,8 @@ import socket
 import signal
 import shutil
 import gzip
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse
@@ -638,12 +640,24 @@ class LocalDataSource(DataSource):
 class S3DataSource(DataSource):
     """S3 data source"""
     
-    def __init__(self, bucket, prefix=''):
+    # Number of recordings whose metadata is fetched concurrently
+    METADATA_FETCH_WORKERS = 16
+    
+    def __init__(self, bucket, prefix='', cache_dir=None):
         self.s3_client = boto3.client('s3')
         self.bucket = bucket
         self.prefix = prefix.rstrip('/')
         self.temp_dir = Path(tempfile.mkdtemp(prefix="bedrock_agentcore_replay_"))
         
+        # Metadata of listed recordings is kept on disk and revalidated by ETag
+        cache_dir = Path(cache_dir) if cache_dir else Path.home() / '.cache' / 'bedrock_agentcore_replay'
+        cache_name = hashlib.sha256(f"{bucket}/{self.prefix}".encode('utf-8')).hexdigest()[:16]
+        self.index_path = cache_dir / f"metadata-index-{cache_name}.json"
+        self._index = self._load_index()
+        self._index_lock = threading.Lock()
+        # Index of the metadata key layout that worked last, tried first for other recordings
+        self._metadata_layout = self._index.get('layout')
+        
         console.print(f"[cyan]Using S3 location:[/cyan]")
         console.print(f"  Bucket: {bucket}")
         console.print(f"  Prefix: {prefix}")
@@ -653,6 +667,60 @@ class S3DataSource(DataSource):
         if self.temp_dir.exists():
             shutil.rmtree(self.temp_dir)
     
+    def _load_index(self):
+        """Load the on-disk metadata index, starting over if it is missing or corrupt"""
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+            if isinstance(index.get('recordings'), dict):
+                return index
+        except (OSError, ValueError):
+            pass
+        return {'layout': None, 'recordings': {}}
+    
+    def _save_index(self):
+        """Atomically write the metadata index"""
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.index_path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(self._index, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            console.print(f"[dim]Could not save metadata index: {e}[/dim]")
+    
+    def _build_recording(self, recording_id, metadata):
+        timestamp = int(metadata.get('startTime', time.time() * 1000))
+        return {
+            'id': recording_id,
+            'sessionId': recording_id,  # Use the folder name as the session ID
+            'timestamp': timestamp,
+            'date': datetime.fromtimestamp(
+                timestamp / 1000
+            ).strftime('%Y-%m-%d %H:%M:%S'),
+            'events': metadata.get('eventCount', 0),
+            'duration': metadata.get('duration', 0)
+        }
+    
+    def _fetch_all_metadata(self, recording_ids):
+        """Fetch metadata of many recordings concurrently, returns {recording_id: metadata}"""
+        recording_ids = list(recording_ids)
+        if not recording_ids:
+            return {}
+        
+        workers = min(self.METADATA_FETCH_WORKERS, len(recording_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(recording_ids, executor.map(self._get_metadata, recording_ids)))
+        
+        # Forget recordings that are no longer listed or lost their metadata, and persist the index
+        with self._index_lock:
+            self._index['layout'] = self._metadata_layout
+            for recording_id in list(self._index['recordings']):
+                if not results.get(recording_id):
+                    del self._index['recordings'][recording_id]
+            self._save_index()
+        return results
+    
     def list_recordings(self):
         """List recordings from S3"""
         recordings = []
@@ -661,6 +729,7 @@ class S3DataSource(DataSource):
             paginator = self.s3_client.get_paginator('list_objects_v2')
             
             # Look for any directories (not just rrweb-*)
+            recording_ids = []
             for page in paginator.paginate(
                 Bucket=self.bucket, 
                 Prefix=self.prefix,
@@ -668,32 +737,21 @@ class S3DataSource(DataSource):
             ):
                 if 'CommonPrefixes' in page:
                     console.print(f"Found {len(page['CommonPrefixes'])} directories in prefix {self.prefix}")
-                    
-                    for prefix_info in page['CommonPrefixes']:
-                        prefix = prefix_info['Prefix']
-                        recording_id = prefix.rstrip('/').split('/')[-1]
-                        
-                        # Check if it's a recording directory by looking for metadata.json
-                        metadata = self._get_metadata(recording_id)
-                        if metadata:
-                            # This is a valid recording directory
-                            session_id = recording_id  # Use the folder name as the session ID
-                            timestamp = int(metadata.get('startTime', time.time() * 1000))
-                            
-                            recordings.append({
-                                'id': recording_id,
-                                'sessionId': session_id,
-                                'timestamp': timestamp,
-                                'date': datetime.fromtimestamp(
-                                    timestamp / 1000
-                                ).strftime('%Y-%m-%d %H:%M:%S'),
-                                'events': metadata.get('eventCount', 0),
-                                'duration': metadata.get('duration', 0)
-                            })
-                            console.print(f"✅ Found recording: {recording_id}")
-                        else:
-                            console.print(f"⚠️ Directory without metadata: {recording_id}")
-                
+                    recording_ids.extend(
+                        prefix_info['Prefix'].rstrip('/').split('/')[-1]
+                        for prefix_info in page['CommonPrefixes']
+                    )
+            
+            # Check each directory for metadata.json, all at once
+            for recording_id, metadata in self._fetch_all_metadata(recording_ids).items():
+                if metadata:
+                    # This is a valid recording directory
+                    recordings.append(self._build_recording(recording_id, metadata))
+                    console.print(f"✅ Found recording: {recording_id}")
+                else:
+                    console.print(f"⚠️ Directory without metadata: {recording_id}")
+            
+            if recording_ids:
                 recordings.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
                 console.print(f"[green]Found {len(recordings)} recordings[/green]")
                 
@@ -701,39 +759,21 @@ class S3DataSource(DataSource):
             if not recordings:
                 console.print("Trying alternative method to find recordings...")
                 
-                # Get a flat list of all objects
-                all_objects = []
-                for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
-                    if 'Contents' in page:
-                        all_objects.extend(page['Contents'])
-                
-                # Extract unique directory names
+                # Extract unique directory names from a flat list of all objects
                 dirs = set()
-                for obj in all_objects:
-                    key = obj['Key']
-                    if '/' in key[len(self.prefix):]:
-                        dir_name = key.split('/', 1)[0] if not self.prefix else key[len(self.prefix):].split('/', 1)[0]
-                        dirs.add(dir_name)
+                for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+                    for obj in page.get('Contents', []):
+                        key = obj['Key']
+                        if '/' in key[len(self.prefix):]:
+                            dir_name = key.split('/', 1)[0] if not self.prefix else key[len(self.prefix):].split('/', 1)[0]
+                            dirs.add(dir_name)
                 
                 console.print(f"Found directories: {dirs}")
                 
                 # Check each directory for metadata
-                for dir_name in dirs:
-                    metadata = self._get_metadata(dir_name)
+                for dir_name, metadata in self._fetch_all_metadata(dirs).items():
                     if metadata:
-                        session_id = dir_name
-                        timestamp = int(metadata.get('startTime', time.time() * 1000))
-                        
-                        recordings.append({
-                            'id': dir_name,
-                            'sessionId': session_id,
-                            'timestamp': timestamp,
-                            'date': datetime.fromtimestamp(
-                                timestamp / 1000
-                            ).strftime('%Y-%m-%d %H:%M:%S'),
-                            'events': metadata.get('eventCount', 0),
-                            'duration': metadata.get('duration', 0)
-                        })
+                        recordings.append(self._build_recording(dir_name, metadata))
                 
                 recordings.sort(key=lambda x: x.get('timestamp', 0), reverse=True)
                 console.print(f"[green]Found {len(recordings)} recordings with alternative method[/green]")
@@ -745,26 +785,64 @@ class S3DataSource(DataSource):
         
         return recordings
     
+    def _metadata_keys(self, recording_id):
+        """Possible metadata.json keys, starting with the layout that worked before"""
+        keys_to_try = [
+            f"{self.prefix}/{recording_id}/metadata.json",
+            f"{recording_id}/metadata.json",
+            f"{self.prefix}{recording_id}/metadata.json"
+        ]
+        order = list(range(len(keys_to_try)))
+        with self._index_lock:
+            layout = self._metadata_layout
+        if layout is not None and 0 <= layout < len(keys_to_try):
+            order.remove(layout)
+            order.insert(0, layout)
+        return [(layout_index, keys_to_try[layout_index]) for layout_index in order]
+    
     def _get_metadata(self, recording_id):
-        """Get metadata for a recording"""
+        """Get metadata for a recording
+        
+        A metadata file already in the index is only downloaded again if its
+        ETag changed (conditional GET answered with 304 Not Modified otherwise).
+        """
+        with self._index_lock:
+            cached = self._index['recordings'].get(recording_id)
+        
         try:
-            # Try both possible metadata paths
-            keys_to_try = [
-                f"{self.prefix}/{recording_id}/metadata.json",
-                f"{recording_id}/metadata.json",
-                f"{self.prefix}{recording_id}/metadata.json"
-            ]
+            candidates = self._metadata_keys(recording_id)
+            if cached:
+                # Check the key the metadata was found at first
+                candidates.sort(key=lambda candidate: candidate[1] != cached['key'])
             
-            for key in keys_to_try:
+            for layout_index, key in candidates:
+                request = {'Bucket': self.bucket, 'Key': key}
+                if cached and cached['key'] == key and cached.get('etag'):
+                    request['IfNoneMatch'] = cached['etag']
                 try:
-                    console.print(f"[dim]Trying metadata path: {key}[/dim]")
-                    response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+                    response = self.s3_client.get_object(**request)
                     data = json.loads(response['Body'].read().decode('utf-8'))
-                    console.print(f"[dim]Found metadata at: {key}[/dim]")
-                    return data
+                except ClientError as e:
+                    code = e.response.get('Error', {}).get('Code')
+                    if code in ('304', 'NotModified'):
+                        with self._index_lock:
+                            self._metadata_layout = layout_index
+                        return cached['metadata']
+                    if code not in ('NoSuchKey', '404', 'AccessDenied', '403'):
+                        console.print(f"[dim]No metadata at: {key} ({str(e)})[/dim]")
+                    continue
                 except Exception as e:
                     console.print(f"[dim]No metadata at: {key} ({str(e)})[/dim]")
                     continue
+                
+                with self._index_lock:
+                    self._metadata_layout = layout_index
+                    self._index['recordings'][recording_id] = {
+                        'key': key,
+                        'etag': response.get('ETag'),
+                        'metadata': data
+                    }
+                return data
             
             return {}
         except Exception as e:
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the SQL lexer used by validate_query in pg_analyze_performance.py
+
+Splits large multi-statement inputs with lex_sql and, for comparison, with the
+previous splitter that re-scanned the query from the start for every semicolon.
+Run from the DB-performance-analyzer directory (boto3 and psycopg2 must be
+importable, e.g. pip install boto3 psycopg2-binary):
+
+    python3 scripts/benchmark_sql_lexer.py
+    python3 scripts/benchmark_sql_lexer.py --statements 1000 50000 --legacy-max 1000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pg_analyze_performance import lex_sql  # noqa: E402
+
+STATEMENT = (
+    "SELECT o.id, c.name, 'status;pending' AS note, $q$ literal; text $q$ AS body, count(*) "
+    "FROM orders o JOIN customers c ON c.id = o.customer_id -- join; comment\n"
+    "WHERE o.total > 100 AND c.region = 'EU' /* block; comment */ "
+    "AND o.id IN (SELECT order_id FROM items) GROUP BY o.id, c.name;\n"
+)
+
+def legacy_split_statements(query_text):
+    """The previous splitter, quadratic because of is_within_quotes"""
+    def is_within_quotes(text, position):
+        single_quotes = False
+        double_quotes = False
+        for i in range(position):
+            if text[i] == "'" and not double_quotes:
+                single_quotes = not single_quotes
+            elif text[i] == '"' and not single_quotes:
+                double_quotes = not double_quotes
+        return single_quotes or double_quotes
+
+    statements = []
+    current_stmt = []
+    i = 0
+    comment_block = False
+    line_comment = False
+    while i < len(query_text):
+        char = query_text[i]
+        if query_text[i:i+2] == '/*' and not line_comment:
+            comment_block = True
+            current_stmt.append(char)
+            i += 1
+        elif query_text[i:i+2] == '*/' and comment_block:
+            comment_block = False
+            current_stmt.append(char)
+            i += 1
+        elif query_text[i:i+2] == '--' and not comment_block:
+            line_comment = True
+            current_stmt.append(char)
+            i += 1
+        elif char == '\n' and line_comment:
+            line_comment = False
+            current_stmt.append(char)
+        elif char == ';' and not comment_block and not line_comment and not is_within_quotes(query_text, i):
+            current_stmt.append(char)
+            stmt = ''.join(current_stmt).strip()
+            if stmt:
+                statements.append(stmt)
+            current_stmt = []
+        else:
+            current_stmt.append(char)
+        i += 1
+    last_stmt = ''.join(current_stmt).strip()
+    if last_stmt:
+        statements.append(last_stmt)
+    return statements
+
+def best_of(func, query, repeat):
+    """Fastest of several runs in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(query)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQL statement splitting")
+    parser.add_argument('--statements', type=int, nargs='+', default=[100, 1000, 10000],
+                        help="Number of statements per input")
+    parser.add_argument('--legacy-max', type=int, default=500,
+                        help="Largest input (in statements) to run the quadratic splitter on")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement")
+    args = parser.parse_args()
+
+    print(f"{'statements':>10} {'KB':>8} {'lex_sql ms':>12} {'MB/s':>8} {'legacy ms':>12}")
+    for count in args.statements:
+        query = STATEMENT * count
+        statements = lex_sql(query)
+        assert len(statements) == count, f"expected {count} statements, got {len(statements)}"
+
+        lexer_seconds = best_of(lex_sql, query, args.repeat)
+        throughput = len(query) / lexer_seconds / (1024 * 1024)
+        if count <= args.legacy_max:
+            legacy = f"{best_of(legacy_split_statements, query, 1) * 1000:12.1f}"
+        else:
+            legacy = f"{'skipped':>12}"
+        print(f"{count:>10} {len(query) / 1024:>8.0f} {lexer_seconds * 1000:>12.1f} {throughput:>8.1f} {legacy}")
+
+if __name__ == '__main__':
+    main()
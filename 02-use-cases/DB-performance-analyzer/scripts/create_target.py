@@ -39,7 +39,8 @@ lambda_target_config = {
                             'properties': {
                                 'environment': {'type': 'string'},
                                 'action_type': {'type': 'string'},
-                                'query': {'type': 'string'}
+                                'query': {'type': 'string'},
+                                'history': {'type': 'boolean'}
                             },
                             'required': ['environment', 'action_type', 'query']
                         }
@@ -190,6 +191,18 @@ pgstat_target_config = {
                             },
                             'required': ['environment', 'action_type']
                         }
+                    },
+                    {
+                        'name': 'full_report',
+                        'description': 'Runs all PostgreSQL checks concurrently and returns one combined report.',
+                        'inputSchema': {
+                            'type': 'object',
+                            'properties': {
+                                'environment': {'type': 'string'},
+                                'action_type': {'type': 'string'}
+                            },
+                            'required': ['environment', 'action_type']
+                        }
                     }
                 ]
             }
@@ -28,6 +28,10 @@ lambda_target_config = {
                                 },
                                  "query": {
                                     "type": "string"
+                                },
+                                "history": {
+                                    "type": "boolean",
+                                    "description": "Re-plan the query and compare the plan with the last analysis of the same query to flag regressions."
                                 }
                             },
                             "required": ["environment","action_type","query"]
@@ -131,6 +131,23 @@ lambda_target_config = {
                             },
                             "required": ["environment","action_type"]
                             }
+                        },
+                        {
+                        "name": "full_report",
+                        "description": "Runs all PostgreSQL checks (slow queries, connections, indexes, autovacuum, I/O, replication and system health) concurrently and returns one combined report. Provide the environment (dev/prod) to analyze. Use action_type default value as full_report.",
+                        "inputSchema": {
+                            "type": "object",
+                            "properties": {
+                                "environment": {
+                                    "type": "string"
+                                },
+                                "action_type": {
+                                    "type": "string",
+                                    "description": "The type of action to perform. Use 'full_report' for this tool."
+                                }
+                            },
+                            "required": ["environment","action_type"]
+                            }
                         }
                 ]
             }
@@ -1,10 +1,18 @@
+import copy
+import hashlib
+import itertools
 import json
+import sqlite3
+import threading
 import boto3
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 import os
 import re
 import time
 import logging
+from collections import Counter, OrderedDict
 from datetime import datetime
 from botocore.exceptions import ClientError
 
@@ -20,55 +28,56 @@ class QueryLimitError(Exception):
     """Custom exception for query limit violations"""
     pass
 
-def analyze_query_complexity(query):
-    """
-    Analyze query complexity and potential resource impact
-    
-    Args:
-        query (str): SQL query to analyze
-    
-    Returns:
-        dict: Complexity metrics
-        
-    Raises:
-        QueryComplexityError: If query is too complex
-    """
-    query_lower = query.lower()
-    complexity_score = 0
+# Token patterns of the SQL lexer; block comments and dollar-quoted strings are
+# scanned separately because their end depends on nesting or on the opening tag
+_SQL_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<line_comment>--[^\n]*)
+  | (?P<block_comment>/\*)
+  | (?P<string>[eE]'[^'\\]*(?:(?:\\.|'')[^'\\]*)*'|'[^']*(?:''[^']*)*')
+  | (?P<quoted_identifier>"[^"]*(?:""[^"]*)*")
+  | (?P<dollar_quote>\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$)
+  | (?P<parameter>\$\d+)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?)
+  | (?P<other>.)
+""", re.VERBOSE | re.DOTALL)
+
+AGGREGATE_FUNCTIONS = {'count', 'sum', 'avg', 'max', 'min'}
+
+def _new_statement(start):
+    return {
+        'text_start': None,
+        'text_end': start,
+        'first_word': '',
+        'keywords': Counter(),
+        'join_count': 0,
+        'subquery_count': 0,
+        'aggregation_count': 0,
+        'window_functions': False,
+        'in_where': False,
+        'condition_count': 0,
+        'previous': None
+    }
+
+def _statement_complexity(statement):
+    """Complexity metrics and warnings from the counters collected by lex_sql"""
+    join_count = statement['join_count']
+    subquery_count = statement['subquery_count']
+    agg_count = statement['aggregation_count']
+    condition_count = statement['condition_count']
     warnings = []
     
-    # Check for joins
-    join_count = sum(1 for join_type in ['join', 'inner join', 'left join', 'right join', 'full join'] 
-                    if join_type in query_lower)
-    complexity_score += join_count * 2
+    complexity_score = join_count * 2 + subquery_count * 3 + agg_count + condition_count
     if join_count > 3:
         warnings.append(f"Query contains {join_count} joins - consider simplifying")
-    
-    # Check for subqueries
-    subquery_count = query_lower.count('(select')
-    complexity_score += subquery_count * 3
     if subquery_count > 2:
         warnings.append(f"Query contains {subquery_count} subqueries - consider restructuring")
-    
-    # Check for aggregations
-    agg_functions = ['count(', 'sum(', 'avg(', 'max(', 'min(']
-    agg_count = sum(query_lower.count(func) for func in agg_functions)
-    complexity_score += agg_count
-    
-    # Check for window functions
-    if 'over(' in query_lower or 'partition by' in query_lower:
+    if statement['window_functions']:
         complexity_score += 3
         warnings.append("Query uses window functions - monitor performance")
-    
-    # Check for complex WHERE conditions
-    where_pos = query_lower.find('where')
-    if where_pos != -1:
-        where_clause = query_lower[where_pos:]
-        and_count = where_clause.count(' and ')
-        or_count = where_clause.count(' or ')
-        complexity_score += (and_count + or_count)
-        if (and_count + or_count) > 5:
-            warnings.append(f"Complex WHERE clause with {and_count + or_count} conditions")
+    if condition_count > 5:
+        warnings.append(f"Complex WHERE clause with {condition_count} conditions")
     
     return {
         'complexity_score': complexity_score,
@@ -78,6 +87,127 @@ def analyze_query_complexity(query):
         'aggregation_count': agg_count
     }
 
+def lex_sql(query):
+    """
+    Split SQL text into statements and collect keyword counts and complexity metrics
+    in a single linear pass
+    
+    Quoted strings (including E'' strings), quoted identifiers, dollar-quoted
+    strings and line or (nested) block comments are skipped, so semicolons and
+    keywords inside them are ignored.
+    
+    Args:
+        query (str): SQL text with one or more statements
+    
+    Returns:
+        list: One dict per statement with 'text' (without surrounding comments and
+        the trailing semicolon),
+        'first_word', 'keywords' (Counter of lowercased keywords) and 'complexity'
+    """
+    statements = []
+    length = len(query)
+    pos = 0
+    current = _new_statement(0)
+    
+    def finish(statement):
+        # Statements made only of whitespace and comments are dropped; comments
+        # before the first and after the last token are not part of the text
+        if statement['first_word']:
+            statements.append({
+                'text': query[statement['text_start']:statement['text_end']],
+                'first_word': statement['first_word'],
+                'keywords': statement['keywords'],
+                'complexity': _statement_complexity(statement)
+            })
+    
+    while pos < length:
+        match = _SQL_TOKEN.match(query, pos)
+        kind = match.lastgroup
+        end = match.end()
+        
+        if kind == 'block_comment':
+            # PostgreSQL block comments nest
+            depth = 1
+            while depth and end < length:
+                close = query.find('*/', end)
+                if close == -1:
+                    end = length
+                    break
+                opening = query.find('/*', end, close)
+                if opening != -1:
+                    depth += 1
+                    end = opening + 2
+                else:
+                    depth -= 1
+                    end = close + 2
+            pos = end
+            continue
+        
+        if kind == 'dollar_quote':
+            close = query.find(match.group(), end)
+            end = length if close == -1 else close + len(match.group())
+            kind = 'string'
+        
+        if kind in ('space', 'line_comment'):
+            pos = end
+            continue
+        
+        token = match.group()
+        if kind == 'other' and token == ';':
+            finish(current)
+            current = _new_statement(end)
+            pos = end
+            continue
+        
+        if current['text_start'] is None:
+            current['text_start'] = pos
+        current['text_end'] = end
+        previous = current['previous']
+        if kind == 'word':
+            word = token.lower()
+            if not current['first_word']:
+                current['first_word'] = word
+            current['keywords'][word] += 1
+            if word == 'join':
+                current['join_count'] += 1
+            elif word == 'select' and previous == '(':
+                current['subquery_count'] += 1
+            elif word == 'by' and previous == 'partition':
+                current['window_functions'] = True
+            elif word == 'where':
+                current['in_where'] = True
+            elif word in ('and', 'or') and current['in_where']:
+                current['condition_count'] += 1
+            current['previous'] = word
+        elif kind == 'other':
+            if token == '(':
+                if previous in AGGREGATE_FUNCTIONS:
+                    current['aggregation_count'] += 1
+                elif previous == 'over':
+                    current['window_functions'] = True
+            current['previous'] = token
+        else:
+            current['previous'] = kind
+        pos = end
+    
+    finish(current)
+    return statements
+
+def analyze_query_complexity(query):
+    """
+    Analyze query complexity and potential resource impact
+    
+    Args:
+        query (str): SQL query to analyze
+    
+    Returns:
+        dict: Complexity metrics of the first statement in the query
+    """
+    statements = lex_sql(query)
+    if not statements:
+        return _statement_complexity(_new_statement(0))
+    return statements[0]['complexity']
+
 def validate_and_execute_queries(secret_name, query, max_rows=20, 
                                max_statements=5, max_total_rows=1000, 
                                max_complexity=15):
@@ -94,6 +224,7 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
     start_time = time.time()
     conn = None
     total_rows = 0
+    total_bytes = 0
     
     try:
         # Validate and split queries
@@ -115,9 +246,10 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
             cur.execute("SET idle_in_transaction_session_timeout = '60s'")
             
             # Execute each statement
-            for stmt_index, stmt in enumerate(statements, 1):
-                # Analyze query complexity
-                complexity_metrics = analyze_query_complexity(stmt)
+            for stmt_index, statement in enumerate(statements, 1):
+                stmt = statement['text']
+                # Complexity was measured while splitting the statements
+                complexity_metrics = statement['complexity']
                 if complexity_metrics['complexity_score'] > max_complexity:
                     raise QueryComplexityError(
                         f"Statement {stmt_index} is too complex (score: {complexity_metrics['complexity_score']})"
@@ -142,7 +274,7 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                 stmt_lower = stmt.lower().strip()
                 
                 # Only add LIMIT for SELECT queries
-                if stmt_lower.startswith('select') and 'limit' not in stmt_lower:
+                if stmt_lower.startswith('select') and 'limit' not in statement['keywords']:
                     remaining_rows = max_total_rows - total_rows
                     limit_rows = min(max_rows, remaining_rows)
                     stmt = f"{stmt} LIMIT {limit_rows + 1}"
@@ -152,49 +284,41 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                     #cur.execute(f"EXPLAIN (FORMAT JSON) {stmt}")
                     #explain_plan = cur.fetchone()[0]
                     
-                    # Analyze plan for potential issues
-                    optimization_suggestions = analyze_query_performance(secret_name, stmt)
-                    if optimization_suggestions:
-                        response['optimization_suggestions'].extend(
-                            f"Statement {stmt_index}: {suggestion}"
-                            for suggestion in optimization_suggestions
-                        )
-                
-                # Execute actual query
-                cur.execute(stmt)
-                
-                # Get column names
-                stmt_response['columns'] = [desc[0] for desc in cur.description]
+                    # Analyze plan for potential issues; expensive statements are only planned,
+                    # not executed an extra time by EXPLAIN ANALYZE
+                    plan_analysis = analyze_query_performance(
+                        secret_name, stmt, conn=conn, analyze_cost_threshold=ANALYZE_COST_THRESHOLD
+                    )
+                    response['optimization_suggestions'].extend(
+                        f"Statement {stmt_index}: {suggestion}"
+                        for suggestion in summarize_plan_analysis(plan_analysis)
+                    )
                 
-                # Fetch results
-                rows = cur.fetchall()
-                row_count = len(rows)
+                # Execute actual query, fetching only what fits the remaining budgets
+                remaining_rows = max_total_rows - total_rows
+                result = fetch_columnar(
+                    conn, stmt,
+                    max_rows=min(max_rows, remaining_rows),
+                    max_bytes=MAX_RESULT_BYTES - total_bytes,
+                    server_side=stmt_lower.startswith('select')
+                )
+                stmt_response.update(result)
+                total_rows += result['row_count']
+                total_bytes += result['bytes']
                 
-                # Check total row limit
-                total_rows += row_count
-                if total_rows > max_total_rows:
-                    stmt_response['truncated'] = True
-                    excess_rows = total_rows - max_total_rows
-                    rows = rows[:-excess_rows]
+                if result['truncated'] == 'bytes':
+                    stmt_response['message'] = (
+                        f"Results truncated. Maximum result size ({MAX_RESULT_BYTES} bytes) reached"
+                    )
+                elif result['truncated'] and remaining_rows <= max_rows:
                     stmt_response['message'] = (
                         f"Results truncated. Maximum total rows ({max_total_rows}) reached"
                     )
-                    total_rows = max_total_rows
-                
-                # Check individual statement limit
-                elif row_count > max_rows:
-                    stmt_response['truncated'] = True
-                    rows = rows[:max_rows]
+                elif result['truncated']:
                     stmt_response['message'] = (
                         f"Results truncated to {max_rows} rows"
                     )
                 
-                stmt_response['row_count'] = len(rows)
-                stmt_response['rows'] = [
-                    dict(zip(stmt_response['columns'], row))
-                    for row in rows
-                ]
-                
                 response['results'].append(stmt_response)
             
             # Add overall performance metrics
@@ -203,6 +327,7 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
                 'execution_time': total_time,
                 'statements_executed': len(statements),
                 'total_rows': total_rows,
+                'total_bytes': total_bytes,
                 'timestamp': datetime.utcnow().isoformat(),
                 'needs_analysis': total_time > 5,
                 'performance_message': (
@@ -234,29 +359,72 @@ def validate_and_execute_queries(secret_name, query, max_rows=20,
         raise Exception(error_msg)
     
     finally:
-        if conn:
-            conn.close()
+        release_db_connection(secret_name, conn)
+
+# Secrets, AWS clients and database connections are kept at module level so that
+# warm Lambda invocations skip the Secrets Manager round trip and the TLS handshake
+SECRET_CACHE_TTL_SECONDS = int(os.environ.get('SECRET_CACHE_TTL_SECONDS', '300'))
+DB_POOL_MAX_CONNECTIONS = int(os.environ.get('DB_POOL_MAX_CONNECTIONS', '2'))
+DB_CONNECTION_CHECK_SECONDS = int(os.environ.get('DB_CONNECTION_CHECK_SECONDS', '60'))
+# execute_query only runs EXPLAIN ANALYZE (which executes the statement a second time)
+# when the planner's estimated total cost is at or below this threshold
+ANALYZE_COST_THRESHOLD = float(os.environ.get('ANALYZE_COST_THRESHOLD', '10000'))
+# Plans and their analysis are cached per query fingerprint; set PLAN_CACHE_DB_PATH
+# (e.g. /tmp/plan_cache.db) to keep them in SQLite instead of only in memory
+PLAN_CACHE_TTL_SECONDS = int(os.environ.get('PLAN_CACHE_TTL_SECONDS', '900'))
+PLAN_CACHE_MAX_ENTRIES = int(os.environ.get('PLAN_CACHE_MAX_ENTRIES', '256'))
+PLAN_CACHE_DB_PATH = os.environ.get('PLAN_CACHE_DB_PATH', '')
+# Relative cost or execution time increase reported as a plan regression in history mode
+PLAN_REGRESSION_THRESHOLD = float(os.environ.get('PLAN_REGRESSION_THRESHOLD', '0.2'))
+# SELECT results are read from a server-side cursor in batches and cut off at the row
+# limits or once the rendered values of a response reach MAX_RESULT_BYTES
+RESULT_FETCH_BATCH_ROWS = int(os.environ.get('RESULT_FETCH_BATCH_ROWS', '200'))
+MAX_RESULT_BYTES = int(os.environ.get('MAX_RESULT_BYTES', '262144'))
+_cursor_ids = itertools.count(1)
+_aws_clients = {}
+_secret_cache = {}  # cache key -> (value, fetched_at)
+_connection_pools = {}  # secret name -> psycopg2 connection pool
+_connection_last_used = {}  # id(connection) -> time it was returned to the pool
+
+def _get_aws_client(service_name, region_name=None):
+    """Create boto3 clients once per Lambda container"""
+    key = (service_name, region_name)
+    if key not in _aws_clients:
+        _aws_clients[key] = boto3.client(service_name, region_name=region_name)
+    return _aws_clients[key]
+
+def _get_cached(key):
+    cached = _secret_cache.get(key)
+    if cached and time.time() - cached[1] < SECRET_CACHE_TTL_SECONDS:
+        return cached[0]
+    return None
 
 def get_secret(secret_name):
-    """Get secret from AWS Secrets Manager """
-    secret_name = secret_name
-    region_name = os.environ['REGION']
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
-    
+    """Get secret from AWS Secrets Manager, cached for SECRET_CACHE_TTL_SECONDS"""
+    secret = _get_cached(('secret', secret_name))
+    if secret is not None:
+        return secret
+
+    client = _get_aws_client('secretsmanager', os.environ['REGION'])
     try:
         secret_value = client.get_secret_value(SecretId=secret_name)
         secret = json.loads(secret_value['SecretString'])
+        _secret_cache[('secret', secret_name)] = (secret, time.time())
         return secret
     except ClientError as e:
         raise Exception(f"Failed to get secret: {str(e)}")
 
 def get_env_secret(environment):
-    ssm_client = boto3.client('ssm')
-    """Retrieve the secret name for the specified environment"""
+    """Retrieve the secret name for the specified environment, cached like the secrets"""
+    cached_name = _get_cached(('parameter', environment))
+    if cached_name is not None:
+        return cached_name
+    secret_name = _get_env_secret(environment)
+    _secret_cache[('parameter', environment)] = (secret_name, time.time())
+    return secret_name
+
+def _get_env_secret(environment):
+    ssm_client = _get_aws_client('ssm')
     if environment == 'prod':
         try:
             # Get the secret name from Parameter Store
@@ -282,22 +450,80 @@ def get_env_secret(environment):
         print("environement does not exist")
         raise ValueError(f"Unknown environment: {environment}")
 
-def connect_to_db(secret_name):
-    """Establish database connection"""
-    cur_secret = secret_name
-    secret = get_secret(cur_secret)
-    try:
-        conn = psycopg2.connect(
+def _get_connection_pool(secret_name):
+    db_pool = _connection_pools.get(secret_name)
+    if db_pool is None or db_pool.closed:
+        secret = get_secret(secret_name)
+        # minconn=0 so the pool only connects when a connection is actually needed
+        db_pool = psycopg2.pool.SimpleConnectionPool(
+            0, DB_POOL_MAX_CONNECTIONS,
             host=secret['host'],
             database=secret['dbname'],
             user=secret['username'],
             password=secret['password'],
             port=secret['port']
         )
-        return conn
+        _connection_pools[secret_name] = db_pool
+    return db_pool
+
+def _reset_connection_pool(secret_name):
+    """Drop the pool and cached secret, e.g. after the credentials were rotated"""
+    _secret_cache.pop(('secret', secret_name), None)
+    db_pool = _connection_pools.pop(secret_name, None)
+    if db_pool is not None and not db_pool.closed:
+        db_pool.closeall()
+
+def _checkout_connection(db_pool):
+    """Get a pooled connection, replacing it if it went stale while the container was frozen"""
+    conn = db_pool.getconn()
+    idle_seconds = time.time() - _connection_last_used.pop(id(conn), time.time())
+    if not conn.closed and idle_seconds > DB_CONNECTION_CHECK_SECONDS:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except psycopg2.Error:
+            db_pool.putconn(conn, close=True)
+            conn = db_pool.getconn()
+    if conn.closed:
+        db_pool.putconn(conn, close=True)
+        conn = db_pool.getconn()
+    return conn
+
+def connect_to_db(secret_name):
+    """Get a database connection from the warm pool, return it with release_db_connection"""
+    try:
+        return _checkout_connection(_get_connection_pool(secret_name))
+    except psycopg2.OperationalError:
+        # The cached secret may be outdated after a rotation, retry once with a fresh one
+        _reset_connection_pool(secret_name)
+        try:
+            return _checkout_connection(_get_connection_pool(secret_name))
+        except Exception as e:
+            raise Exception(f"Failed to connect to the database: {str(e)}")
     except Exception as e:
         raise Exception(f"Failed to connect to the database: {str(e)}")
 
+def release_db_connection(secret_name, conn):
+    """Return a connection to the pool, ending its transaction; broken connections are closed"""
+    if conn is None:
+        return
+    broken = bool(conn.closed) or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN
+    if not broken:
+        try:
+            # Also reverts SET commands issued in the transaction
+            conn.rollback()
+        except psycopg2.Error:
+            broken = True
+
+    db_pool = _connection_pools.get(secret_name)
+    if db_pool is None or db_pool.closed:
+        conn.close()
+        return
+    if not broken:
+        _connection_last_used[id(conn)] = time.time()
+    db_pool.putconn(conn, close=broken)
+
 # Define the queries dictionary for different object types
 queries = {
     'table': """
@@ -476,6 +702,7 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
         list: List of dictionaries containing object information
         str: Error message if no objects found
     """
+    conn = None
     try:
         # Input validation
         if not object_name or not object_schema:
@@ -568,12 +795,10 @@ def extract_database_object_ddl(secret_name, object_type, object_name=None, obje
         raise
 
     finally:
-        if conn:
-            try:
-                conn.close()
-                print("\nDatabase connection closed")
-            except Exception as e:
-                print(f"\nError closing connection: {str(e)}")
+        try:
+            release_db_connection(secret_name, conn)
+        except Exception as e:
+            print(f"\nError releasing connection: {str(e)}")
 
 
 def analyze_table_definition(definition):
@@ -754,7 +979,210 @@ def clean_query_for_explain(query):
     
     return cleaned_query.strip()
 
-def analyze_query_performance(secret_name, query_or_object_name, parameters=None, object_type=None):
+def fingerprint_query(query):
+    """
+    Normalize a query so that runs differing only in literals, case, comments or
+    whitespace share a fingerprint
+    
+    Parameters:
+    - query: SQL query string
+    Returns:
+    - Normalized query string
+    """
+    normalized = re.sub(r'--[^\n]*|/\*.*?\*/', ' ', query, flags=re.DOTALL)
+    # Keep quoted identifiers, replace string and numeric literals
+    parts = re.split(r'("(?:[^"]|"")*")', normalized)
+    for i in range(0, len(parts), 2):
+        part = re.sub(r"'(?:[^']|'')*'", '?', parts[i])
+        part = re.sub(r'(?<![\w$])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b', '?', part, flags=re.IGNORECASE)
+        part = re.sub(r'\(\s*\?(?:\s*,\s*\?)*\s*\)', '(?)', part)
+        part = re.sub(r'\s*([=<>!,()])\s*', r'\1', part)
+        parts[i] = part.lower()
+    return ' '.join(''.join(parts).split()).rstrip(';').strip()
+
+class PlanCache:
+    """
+    LRU of query plans and their analysis keyed by query fingerprint, optionally
+    backed by SQLite so it outlives the Lambda container
+    
+    Entries stay available to history mode after their TTL has passed, until they
+    are evicted.
+    """
+    def __init__(self, max_entries, ttl_seconds, db_path=''):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self.hits = 0
+        self.misses = 0
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute("""
+                    CREATE TABLE IF NOT EXISTS plan_cache (
+                        cache_key TEXT PRIMARY KEY,
+                        entry TEXT NOT NULL,
+                        analyzed_at REAL NOT NULL
+                    )
+                """)
+                self._db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Plan cache persistence disabled, cannot open {db_path}: {str(e)}")
+                self._db = None
+
+    @staticmethod
+    def make_key(secret_name, query, mode):
+        """Cache key of a query on a database; mode separates differently produced plans"""
+        fingerprint = fingerprint_query(query)
+        return hashlib.sha256(f"{secret_name}\0{mode}\0{fingerprint}".encode('utf-8')).hexdigest()
+
+    def _load(self, key):
+        entry = self._entries.get(key)
+        if entry is None and self._db is not None:
+            row = self._db.execute(
+                "SELECT entry FROM plan_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row:
+                entry = json.loads(row[0])
+                self._entries[key] = entry
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get(self, key):
+        """Fresh entry for the key, or None"""
+        with self._lock:
+            entry = self._load(key)
+            if entry is None or time.time() - entry['analyzed_at'] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return copy.deepcopy(entry)
+
+    def get_last(self, key):
+        """Most recent entry for the key regardless of its age, or None"""
+        with self._lock:
+            entry = self._load(key)
+            return copy.deepcopy(entry) if entry is not None else None
+
+    def put(self, key, query, plan, analysis):
+        # Per-response annotations are not part of the cached analysis
+        analysis = {k: v for k, v in analysis.items() if k not in ('cache', 'plan_diff')}
+        entry = {
+            'query': fingerprint_query(query),
+            'plan': plan,
+            'analysis': analysis,
+            'analyzed_at': time.time()
+        }
+        with self._lock:
+            self._entries[key] = copy.deepcopy(entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO plan_cache (cache_key, entry, analyzed_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(entry, default=str), entry['analyzed_at'])
+                    )
+                    # Keep the table bounded like the in-memory LRU
+                    self._db.execute("""
+                        DELETE FROM plan_cache WHERE cache_key NOT IN (
+                            SELECT cache_key FROM plan_cache ORDER BY analyzed_at DESC LIMIT ?
+                        )
+                    """, (self.max_entries,))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to persist plan cache entry: {str(e)}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+_plan_cache = None
+
+def get_plan_cache():
+    """Create the plan cache once per Lambda container"""
+    global _plan_cache
+    if _plan_cache is None:
+        _plan_cache = PlanCache(PLAN_CACHE_MAX_ENTRIES, PLAN_CACHE_TTL_SECONDS, PLAN_CACHE_DB_PATH)
+    return _plan_cache
+
+def _collect_plan_nodes(node, nodes=None):
+    """Flatten a plan tree into (node type, relation, index) tuples"""
+    if nodes is None:
+        nodes = []
+    nodes.append((node.get('Node Type'), node.get('Relation Name'), node.get('Index Name')))
+    for child in node.get('Plans', []):
+        _collect_plan_nodes(child, nodes)
+    return nodes
+
+def diff_plans(previous_entry, plan, analysis):
+    """
+    Compare a new plan with the last cached plan of the same query fingerprint
+    
+    Parameters:
+    - previous_entry: Plan cache entry of the earlier analysis
+    - plan: New plan (root object of EXPLAIN FORMAT JSON)
+    - analysis: Analysis of the new plan
+    Returns:
+    - Dictionary with the detected changes and regressions
+    """
+    previous_plan = previous_entry['plan']['Plan']
+    current_plan = plan['Plan']
+    previous_stats = previous_entry['analysis']['performance_stats']
+    current_stats = analysis['performance_stats']
+    diff = {
+        'previous_analyzed_at': datetime.fromtimestamp(previous_entry['analyzed_at']).isoformat(),
+        'changes': [],
+        'regressions': []
+    }
+
+    def compare(label, previous, current, unit=''):
+        if not previous or current is None:
+            return
+        change = (current - previous) / previous
+        if abs(change) < 0.01:
+            return
+        description = f"{label} changed from {previous:.2f}{unit} to {current:.2f}{unit} ({change:+.0%})"
+        if change > PLAN_REGRESSION_THRESHOLD:
+            diff['regressions'].append(description)
+        else:
+            diff['changes'].append(description)
+
+    compare("Estimated total cost", previous_plan.get('Total Cost'), current_plan.get('Total Cost'))
+    # Execution times are only comparable when both plans were executed
+    if previous_entry['analysis'].get('plan_type') == analysis.get('plan_type') == 'Analyzed Plan':
+        compare("Execution time", previous_stats.get('execution_time_ms'),
+                current_stats.get('execution_time_ms'), ' ms')
+
+    previous_nodes = _collect_plan_nodes(previous_plan)
+    current_nodes = _collect_plan_nodes(current_plan)
+    if previous_nodes != current_nodes:
+        diff['changes'].append(
+            f"Plan shape changed: {previous_plan.get('Node Type')} ({len(previous_nodes)} nodes) -> "
+            f"{current_plan.get('Node Type')} ({len(current_nodes)} nodes)"
+        )
+        # A relation that used to be read through an index is now scanned sequentially
+        indexed_relations = {relation for node_type, relation, index in previous_nodes if index}
+        for node_type, relation, _ in current_nodes:
+            if node_type == 'Seq Scan' and relation in indexed_relations:
+                diff['regressions'].append(f"Table {relation} switched from an index scan to a sequential scan")
+
+    previous_issues = {issue['description'] for issue in previous_entry['analysis']['issues']}
+    for issue in analysis['issues']:
+        if issue['description'] not in previous_issues:
+            diff['changes'].append(f"New issue: {issue['description']}")
+    return diff
+
+def analyze_query_performance(secret_name, query_or_object_name, parameters=None, object_type=None, conn=None,
+                              analyze_cost_threshold=None, use_cache=True, history=False):
     """
     Analyze query performance and provide optimization recommendations
     
@@ -763,8 +1191,29 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
     - query_or_object_name: SQL query string or object name to analyze
     - parameters: Optional. List of parameter values for parameterized queries
     - object_type: Optional. If provided, will fetch definition from database object
+    - conn: Optional. Connection of the calling request to run the EXPLAINs on; a pooled
+      connection is used (and released) when not provided
+    - analyze_cost_threshold: Optional. Plan the query first and only run EXPLAIN ANALYZE,
+      which executes it, if the estimated total cost is at or below this value; otherwise
+      the estimated plan is analyzed
+    - use_cache: Optional. Return a fresh cached analysis of the same query fingerprint
+      without touching the database
+    - history: Optional. Always re-plan the query and compare the plan with the last
+      cached one to flag regressions
     """
-    conn = connect_to_db(secret_name)
+    plan_cache = get_plan_cache()
+    cache_mode = f"threshold={analyze_cost_threshold}"
+    if use_cache and not history and not object_type:
+        cache_key = plan_cache.make_key(secret_name, clean_query_for_explain(query_or_object_name), cache_mode)
+        cached = plan_cache.get(cache_key)
+        if cached is not None:
+            analysis = cached['analysis']
+            analysis['cache'] = {'hit': True, 'age_seconds': round(time.time() - cached['analyzed_at'])}
+            return analysis
+
+    owns_connection = conn is None
+    if owns_connection:
+        conn = connect_to_db(secret_name)
     try:
         with conn.cursor() as cur:
             # If object_type is provided, fetch the query definition
@@ -775,6 +1224,7 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
 
             # Clean the query before analysis
             query_to_analyze = clean_query_for_explain(query_to_analyze)
+            cache_key = plan_cache.make_key(secret_name, query_to_analyze, cache_mode)
 
             # Check if the query contains parameter placeholders
             has_parameters = any(f'${i}' in query_to_analyze for i in range(1, 21))
@@ -797,28 +1247,52 @@ def analyze_query_performance(secret_name, query_or_object_name, parameters=None
                 
                 # Pass True for is_generic_plan
                 analysis = analyze_execution_plan(plan[0], estimated_plan[0], True)
+                cached_plan = plan[0]
             else:
-                # For non-parameterized queries, use ANALYZE
-                cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query_to_analyze}")
-                plan = cur.fetchone()[0]
-                
-                cur.execute(f"EXPLAIN (FORMAT JSON) {query_to_analyze}")
-                estimated_plan = cur.fetchone()[0]
-                
-                # Pass False for is_generic_plan
-                analysis = analyze_execution_plan(plan[0], estimated_plan[0], False)
-
+                estimated_plan = None
+                if analyze_cost_threshold is not None:
+                    cur.execute(f"EXPLAIN (FORMAT JSON) {query_to_analyze}")
+                    estimated_plan = cur.fetchone()[0]
+                    estimated_cost = estimated_plan[0]['Plan'].get('Total Cost', 0)
+                    
+                if estimated_plan is not None and estimated_cost > analyze_cost_threshold:
+                    # Too expensive to execute just for the plan, analyze the estimates only
+                    analysis = analyze_execution_plan(estimated_plan[0], estimated_plan[0], True,
+                                                      plan_type='Estimated Plan')
+                    analysis['summary'].append(
+                        f"Estimated cost {estimated_cost:.0f} exceeds the ANALYZE threshold "
+                        f"({analyze_cost_threshold:.0f}); the plan was not executed"
+                    )
+                    cached_plan = estimated_plan[0]
+                else:
+                    # For non-parameterized queries, use ANALYZE. Its output also carries the
+                    # planner estimates, so no separate EXPLAIN is needed
+                    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query_to_analyze}")
+                    plan = cur.fetchone()[0]
+                    
+                    # Pass False for is_generic_plan
+                    analysis = analyze_execution_plan(plan[0], plan[0], False)
+                    cached_plan = plan[0]
+
+            if history:
+                previous = plan_cache.get_last(cache_key)
+                if previous is not None:
+                    analysis['plan_diff'] = diff_plans(previous, cached_plan, analysis)
+            plan_cache.put(cache_key, query_to_analyze, cached_plan, analysis)
             return analysis
 
     except Exception as e:
         raise Exception(f"Failed to analyze query performance: {str(e)}")
     finally:
-        if conn:
-            conn.close()
+        if owns_connection:
+            release_db_connection(secret_name, conn)
 
-def analyze_execution_plan(actual_plan, estimated_plan, is_generic_plan):
+def analyze_execution_plan(actual_plan, estimated_plan, is_generic_plan, plan_type=None):
     """
     Analyze execution plan and provide detailed explanations and recommendations
+
+    is_generic_plan means the plan carries no actual execution metrics; plan_type
+    overrides the reported plan type (e.g. 'Estimated Plan')
     """
     analysis = {
         'summary': [],
@@ -827,7 +1301,7 @@ def analyze_execution_plan(actual_plan, estimated_plan, is_generic_plan):
         'performance_stats': {}
     }
 
-    analysis['plan_type'] = 'Generic Plan' if is_generic_plan else 'Analyzed Plan'
+    analysis['plan_type'] = plan_type or ('Generic Plan' if is_generic_plan else 'Analyzed Plan')
 
     # Extract key performance metrics
     total_cost = actual_plan['Plan'].get('Total Cost')
@@ -1011,12 +1485,15 @@ def format_analysis_output(analysis):
     # Performance Statistics
     output.append("Query Performance Summary:")
     
-    # Check if this is a generic plan
-    is_generic_plan = analysis.get('plan_type') == 'Generic Plan'
+    # Check if this plan has no actual execution metrics (generic or estimated plan)
+    is_generic_plan = analysis.get('plan_type') != 'Analyzed Plan'
     
     if is_generic_plan:
         # For generic plans, show estimated metrics
-        output.append(f"- Plan Type: Generic Plan (Parameterized Query)")
+        if analysis.get('plan_type') == 'Generic Plan':
+            output.append(f"- Plan Type: Generic Plan (Parameterized Query)")
+        else:
+            output.append(f"- Plan Type: {analysis.get('plan_type')}")
         output.append(f"- Estimated Total Cost: {analysis['performance_stats'].get('total_cost', 'N/A')}")
         output.append(f"- Estimated Rows: {analysis['performance_stats'].get('estimated_rows', 'N/A')}")
         output.append(f"- Plan Rows: {analysis['performance_stats'].get('plan_rows', 'N/A')}")
@@ -1027,8 +1504,26 @@ def format_analysis_output(analysis):
         output.append(f"- Actual Rows: {analysis['performance_stats'].get('actual_rows', 'N/A')}")
         output.append(f"- Estimated Rows: {analysis['performance_stats'].get('estimated_rows', 'N/A')}")
     
+    for note in analysis.get('summary', []):
+        output.append(f"- {note}")
+    if analysis.get('cache', {}).get('hit'):
+        output.append(f"- Served from the plan cache (analyzed {analysis['cache']['age_seconds']}s ago, "
+                      f"the database was not queried)")
+    
     output.append("")
 
+    # Plan changes since the previous analysis (history mode)
+    plan_diff = analysis.get('plan_diff')
+    if plan_diff is not None:
+        output.append(f"Plan Changes Since {plan_diff['previous_analyzed_at']}:")
+        for regression in plan_diff['regressions']:
+            output.append(f"- ⚠️ Regression: {regression}")
+        for change in plan_diff['changes']:
+            output.append(f"- {change}")
+        if not plan_diff['regressions'] and not plan_diff['changes']:
+            output.append("- No changes, the plan is the same")
+        output.append("")
+
     # Issues
     if analysis['issues']:
         output.append("Identified Issues:")
@@ -1046,6 +1541,17 @@ def format_analysis_output(analysis):
 
     return "\n".join(output)
 
+def summarize_plan_analysis(analysis):
+    """
+    Condense a plan analysis into one-line optimization suggestions
+    """
+    suggestions = list(analysis.get('summary', []))
+    suggestions.extend(
+        f"{issue['description']} (Severity: {issue['severity']})"
+        for issue in analysis.get('issues', [])
+    )
+    return suggestions
+
 def monitor_query_performance(query, start_time, rows_returned):
     """
     Monitor query performance and suggest analysis if needed
@@ -1104,7 +1610,8 @@ def validate_query(query):
         query (str): SQL query to validate
     
     Returns:
-        list: List of validated statements
+        list: Validated statements as returned by lex_sql, with their text,
+        keyword counts and complexity metrics
         
     Raises:
         ValueError: If query contains prohibited operations
@@ -1112,113 +1619,90 @@ def validate_query(query):
     if not query or not isinstance(query, str):
         raise ValueError("Query must be a non-empty string")
 
-    def is_within_quotes(text, position):
-        """Check if a position in text is within quotes"""
-        single_quotes = False
-        double_quotes = False
-        for i in range(position):
-            if text[i] == "'" and not double_quotes:
-                single_quotes = not single_quotes
-            elif text[i] == '"' and not single_quotes:
-                double_quotes = not double_quotes
-        return single_quotes or double_quotes
-
-    def split_statements(query_text):
-        """Split query into individual statements, respecting quotes and comments"""
-        statements = []
-        current_stmt = []
-        i = 0
-        comment_block = False
-        line_comment = False
-        
-        while i < len(query_text):
-            char = query_text[i]
-            
-            # Handle comment blocks
-            if query_text[i:i+2] == '/*' and not line_comment:
-                comment_block = True
-                current_stmt.append(char)
-                i += 1
-            elif query_text[i:i+2] == '*/' and comment_block:
-                comment_block = False
-                current_stmt.append(char)
-                i += 1
-            # Handle line comments
-            elif query_text[i:i+2] == '--' and not comment_block:
-                line_comment = True
-                current_stmt.append(char)
-                i += 1
-            elif char == '\n' and line_comment:
-                line_comment = False
-                current_stmt.append(char)
-            # Handle semicolons
-            elif char == ';' and not comment_block and not line_comment and not is_within_quotes(query_text, i):
-                current_stmt.append(char)
-                stmt = ''.join(current_stmt).strip()
-                if stmt:
-                    statements.append(stmt)
-                current_stmt = []
-            else:
-                current_stmt.append(char)
-            i += 1
-        
-        # Add the last statement if exists
-        last_stmt = ''.join(current_stmt).strip()
-        if last_stmt:
-            statements.append(last_stmt)
-        
-        return [stmt for stmt in statements if stmt]
-
-    # Split into statements
-    statements = split_statements(query)
-    validated_statements = []
+    dangerous_operations = {
+        'insert', 'update', 'delete', 'drop', 'truncate', 'alter', 'create',
+        'grant', 'revoke', 'execute', 'copy'
+    }
 
-    # Validate each statement
-    for stmt in statements:
-        stmt = stmt.strip()
-        if stmt.endswith(';'):
-            stmt = stmt[:-1]
-        
-        stmt_lower = stmt.lower().strip()
-        
-        # Get the command type
-        first_word = stmt_lower.split()[0] if stmt_lower.split() else ''
-        
+    statements = lex_sql(query)
+    for statement in statements:
+        first_word = statement['first_word']
         if first_word not in ['select', 'show']:
             raise ValueError(f"Prohibited operation detected: {first_word}")
         
-        # For SELECT statements, check for dangerous operations
+        # For SELECT statements, check for dangerous operations outside of
+        # literals, quoted identifiers and comments
         if first_word == 'select':
-            dangerous_operations = [
-                r'\binsert\b', r'\bupdate\b', r'\bdelete\b', r'\bdrop\b', 
-                r'\btruncate\b', r'\balter\b', r'\bcreate\b', r'\bgrant\b', 
-                r'\brevoke\b', r'\bexecute\b', r'\bcopy\b'
-            ]
-            
-            # Remove content within quotes for checking
-            query_for_check = ''
-            in_quote = False
-            quote_char = None
-            
-            for char in stmt:
-                if char in ["'", '"'] and (not quote_char or char == quote_char):
-                    if not in_quote:
-                        quote_char = char
-                        in_quote = True
-                    else:
-                        quote_char = None
-                        in_quote = False
-                elif not in_quote:
-                    query_for_check += char
-            
-            # Check for dangerous operations
-            for operation in dangerous_operations:
-                if re.search(operation, query_for_check.lower()):
-                    raise ValueError(f"Statement contains prohibited operation: {operation}")
-        
-        validated_statements.append(stmt)
+            prohibited = sorted(dangerous_operations.intersection(statement['keywords']))
+            if prohibited:
+                raise ValueError(f"Statement contains prohibited operation: {prohibited[0]}")
+    
+    return statements
+
+def fetch_columnar(conn, query, max_rows, max_bytes=MAX_RESULT_BYTES, server_side=True):
+    """
+    Execute a query and fetch its rows in batches until a row or byte budget is reached
+    
+    Args:
+        conn: Database connection, the query runs in its current transaction
+        query (str): SQL query to execute
+        max_rows (int): Maximum number of rows to keep
+        max_bytes (int): Maximum size of the kept values, measured as rendered text
+        server_side (bool): Use a named cursor so rows past the budget are never sent
+            by the server; only possible for SELECT statements
+    
+    Returns:
+        dict: Columnar result with 'columns', 'rows' (one list of values per row),
+        'row_count', 'bytes' and 'truncated' (False, 'rows' or 'bytes')
+    """
+    cursor_name = f"read_query_{next(_cursor_ids)}" if server_side else None
+    result = {'columns': [], 'rows': [], 'row_count': 0, 'bytes': 0, 'truncated': False}
+    
+    with conn.cursor(name=cursor_name) as cur:
+        cur.execute(query)
+        while not result['truncated']:
+            # One row more than the budget tells whether the result was cut off
+            batch = cur.fetchmany(min(RESULT_FETCH_BATCH_ROWS, max_rows + 1 - result['row_count']))
+            # Named cursors only know their columns after the first fetch
+            if not result['columns'] and cur.description:
+                result['columns'] = [desc[0] for desc in cur.description]
+            if not batch:
+                break
+            for row in batch:
+                if result['row_count'] >= max_rows:
+                    result['truncated'] = 'rows'
+                    break
+                row_bytes = sum(len(str(value)) for value in row)
+                if result['bytes'] + row_bytes > max_bytes:
+                    result['truncated'] = 'bytes'
+                    break
+                result['rows'].append(list(row))
+                result['row_count'] += 1
+                result['bytes'] += row_bytes
+    
+    return result
+
+def format_result_table(columns, rows):
+    """
+    Render a columnar result as text table lines, one line at a time
+    
+    Args:
+        columns (list): Column names
+        rows (list): One list of values per row
+    
+    Yields:
+        str: Header, separator and row lines
+    """
+    widths = [len(str(col)) for col in columns]
+    for row in rows:
+        for index, value in enumerate(row):
+            widths[index] = max(widths[index], len(str(value)))
     
-    return validated_statements
+    header = " | ".join(str(col).ljust(width) for col, width in zip(columns, widths))
+    yield header
+    yield "-" * len(header)
+    for row in rows:
+        yield " | ".join(str(value).ljust(width) for value, width in zip(row, widths))
 
 def execute_read_query(secret_name, query, max_rows=20):
     """
@@ -1242,6 +1726,7 @@ def execute_read_query(secret_name, query, max_rows=20):
     
     start_time = time.time()
     conn = None
+    total_bytes = 0
     
     try:
         # Validate and split queries
@@ -1256,7 +1741,8 @@ def execute_read_query(secret_name, query, max_rows=20):
             cur.execute("SET statement_timeout = '30s'")
             
             # Execute each statement
-            for stmt_index, stmt in enumerate(statements, 1):
+            for stmt_index, statement in enumerate(statements, 1):
+                stmt = statement['text']
                 stmt_response = {
                     'columns': [],
                     'rows': [],
@@ -1272,45 +1758,37 @@ def execute_read_query(secret_name, query, max_rows=20):
                 
                 # Prepare the final query
                 final_query = stmt
-                if is_select_query and 'limit' not in stmt_lower:
+                if is_select_query and 'limit' not in statement['keywords']:
                     final_query = f"{stmt} LIMIT {max_rows + 1}"
                 
                 # Execute query
                 try:
-                    cur.execute(final_query)
+                    result = fetch_columnar(
+                        conn, final_query,
+                        max_rows=max_rows,
+                        max_bytes=MAX_RESULT_BYTES - total_bytes,
+                        server_side=is_select_query
+                    )
                 except psycopg2.Error as pe:
                     logger.error(f"Error executing query: {final_query}")
                     logger.error(f"Error details: {str(pe)}")
                     raise
+                stmt_response.update(result)
+                total_bytes += result['bytes']
                 
-                # Get column names
-                stmt_response['columns'] = [desc[0] for desc in cur.description]
-                
-                # Fetch results
-                rows = cur.fetchall()
-                total_rows = len(rows)
-                
-                # Handle row limiting only for SELECT queries
-                if is_select_query and total_rows > max_rows:
-                    stmt_response['truncated'] = True
-                    rows = rows[:max_rows]
+                if result['truncated'] == 'bytes':
                     stmt_response['message'] = (
-                        f"Results truncated to {max_rows} rows for performance reasons. "
-                        f"Total rows available: {total_rows}"
+                        f"Results truncated to {result['row_count']} rows, the maximum result size "
+                        f"({MAX_RESULT_BYTES} bytes) was reached"
+                    )
+                elif result['truncated']:
+                    stmt_response['message'] = (
+                        f"Results truncated to {max_rows} rows for performance reasons"
                     )
-                    stmt_response['row_count'] = max_rows
-                else:
-                    stmt_response['row_count'] = total_rows
-                
-                # Convert rows to list of dictionaries
-                stmt_response['rows'] = [
-                    dict(zip(stmt_response['columns'], row))
-                    for row in rows
-                ]
                 
                 # Add performance monitoring only for SELECT queries
                 if is_select_query:
-                    complexity_metrics = analyze_query_complexity(stmt)
+                    complexity_metrics = statement['complexity']
                     stmt_response['complexity_metrics'] = complexity_metrics
                     
                     # Add complexity warnings if any
@@ -1354,8 +1832,7 @@ def execute_read_query(secret_name, query, max_rows=20):
         raise Exception(error_msg)
     
     finally:
-        if conn:
-            conn.close()
+        release_db_connection(secret_name, conn)
 
 def format_enhanced_results(results):
     """
@@ -1402,27 +1879,7 @@ def format_enhanced_results(results):
             formatted_output.append(f"Note: {result['message']}")
         
         if result['columns']:
-            # Calculate column widths
-            widths = {
-                col: max(len(str(col)), 
-                        max(len(str(row[col])) for row in result['rows']))
-                for col in result['columns']
-            }
-            
-            # Add header
-            header = " | ".join(
-                str(col).ljust(widths[col])
-                for col in result['columns']
-            )
-            formatted_output.append(header)
-            formatted_output.append("-" * len(header))
-            
-            # Add rows
-            for row in result['rows']:
-                formatted_output.append(" | ".join(
-                    str(row[col]).ljust(widths[col])
-                    for col in result['columns']
-                ))
+            formatted_output.extend(format_result_table(result['columns'], result['rows']))
             
         formatted_output.append(f"Rows returned: {result['row_count']}")
         formatted_output.append("")
@@ -1449,33 +1906,9 @@ def format_query_results(results):
     if results['message']:
         formatted_output.append(f"Note: {results['message']}\n")
     
-    # Add column headers
+    # Add column headers and rows
     if results['columns']:
-        # Calculate column widths
-        widths = {}
-        for col in results['columns']:
-            widths[col] = len(str(col))
-            for row in results['rows']:
-                widths[col] = max(widths[col], len(str(row[col])))
-        
-        # Create header
-        header = " | ".join(
-            str(col).ljust(widths[col])
-            for col in results['columns']
-        )
-        formatted_output.append(header)
-        
-        # Add separator
-        separator = "-" * len(header)
-        formatted_output.append(separator)
-        
-        # Add rows
-        for row in results['rows']:
-            formatted_row = " | ".join(
-                str(row[col]).ljust(widths[col])
-                for col in results['columns']
-            )
-            formatted_output.append(formatted_row)
+        formatted_output.extend(format_result_table(results['columns'], results['rows']))
     
     # Add summary
     formatted_output.append(f"\nTotal rows: {results['row_count']}")
@@ -1500,27 +1933,7 @@ def format_multi_query_results(results):
             formatted_output.append(f"Note: {result['message']}")
         
         if result['columns']:
-            # Calculate column widths
-            widths = {
-                col: max(len(str(col)), 
-                        max(len(str(row[col])) for row in result['rows']))
-                for col in result['columns']
-            }
-            
-            # Add header
-            header = " | ".join(
-                str(col).ljust(widths[col])
-                for col in result['columns']
-            )
-            formatted_output.append(header)
-            formatted_output.append("-" * len(header))
-            
-            # Add rows
-            for row in result['rows']:
-                formatted_output.append(" | ".join(
-                    str(row[col]).ljust(widths[col])
-                    for col in result['columns']
-                ))
+            formatted_output.extend(format_result_table(result['columns'], result['rows']))
             
         formatted_output.append(f"Rows returned: {result['row_count']}")
         formatted_output.append("")
@@ -1555,8 +1968,10 @@ def lambda_handler(event, context):
         # Get explain plan for a query
         if action_type == 'explain_query':
             query = event.get('query') if 'arguments' not in event else event['arguments'].get('query')
+            history = event.get('history') if 'arguments' not in event else event['arguments'].get('history')
+            history = str(history).lower() in ('true', '1', 'yes')
             print("Executing explain query scripts")
-            results = analyze_query_performance(secret_name, query)
+            results = analyze_query_performance(secret_name, query, history=history)
             formatted_results = format_analysis_output(results)
         elif action_type == 'extract_ddl':
             if 'arguments' in event:
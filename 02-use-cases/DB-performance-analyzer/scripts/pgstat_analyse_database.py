@@ -2,23 +2,56 @@
 import json
 import boto3
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from botocore.exceptions import ClientError
 
+# Secrets, AWS clients and database connections are kept at module level so that
+# warm Lambda invocations skip the Secrets Manager round trip and the TLS handshake
+SECRET_CACHE_TTL_SECONDS = int(os.environ.get('SECRET_CACHE_TTL_SECONDS', '300'))
+DB_POOL_MAX_CONNECTIONS = int(os.environ.get('DB_POOL_MAX_CONNECTIONS', '2'))
+DB_CONNECTION_CHECK_SECONDS = int(os.environ.get('DB_CONNECTION_CHECK_SECONDS', '60'))
+# The full_report action runs its checks on this many worker threads, the queries
+# of a check are cut off once it has run for FULL_REPORT_CHECK_TIMEOUT_SECONDS
+FULL_REPORT_MAX_WORKERS = int(os.environ.get('FULL_REPORT_MAX_WORKERS', '4'))
+FULL_REPORT_CHECK_TIMEOUT_SECONDS = float(os.environ.get('FULL_REPORT_CHECK_TIMEOUT_SECONDS', '20'))
+_aws_clients = {}
+_secret_cache = {}  # cache key -> (value, fetched_at)
+_connection_pools = {}  # secret name -> psycopg2 connection pool
+_connection_pools_lock = threading.Lock()  # full_report checks create the pool concurrently
+_connection_owners = {}  # id(connection) -> pool that handed it out
+_connection_last_used = {}  # id(connection) -> time it was returned to the pool
+_check_context = threading.local()  # state of the full_report check running on this thread
+_statement_timeout_connections = set()  # id(connection) with a full_report statement_timeout
+
+def _get_aws_client(service_name, region_name=None):
+    """Create boto3 clients once per Lambda container"""
+    key = (service_name, region_name)
+    if key not in _aws_clients:
+        _aws_clients[key] = boto3.client(service_name, region_name=region_name)
+    return _aws_clients[key]
+
+def _get_cached(key):
+    cached = _secret_cache.get(key)
+    if cached and time.time() - cached[1] < SECRET_CACHE_TTL_SECONDS:
+        return cached[0]
+    return None
+
 def get_secret(secret_name):
-    """Get secret from AWS Secrets Manager """
-    #secret_name = os.environ['SECRET_NAME']
-    region_name = os.environ['REGION']
-    
-    session = boto3.session.Session()
-    client = session.client(
-        service_name='secretsmanager',
-        region_name=region_name
-    )
-    
+    """Get secret from AWS Secrets Manager, cached for SECRET_CACHE_TTL_SECONDS"""
+    secret = _get_cached(('secret', secret_name))
+    if secret is not None:
+        return secret
+
+    client = _get_aws_client('secretsmanager', os.environ['REGION'])
     try:
         secret_value = client.get_secret_value(SecretId=secret_name)
         secret = json.loads(secret_value['SecretString'])
+        _secret_cache[('secret', secret_name)] = (secret, time.time())
         return secret
     except ClientError as e:
         raise Exception(f"Failed to get secret: {str(e)}")
@@ -143,8 +176,7 @@ def execute_slow_query(secret_name, min_exec_time):
     except Exception as e:
         raise Exception(f"Failed to retrieve slow queries: {str(e)}")
     finally:
-        if conn:
-            conn.close()
+        release_db_connection(secret_name, conn)
 
 def format_results_for_slow_query(results):
     """Format results in a human-readable string"""
@@ -319,8 +351,7 @@ def execute_connect_issues(secret_name, min_exec_time):
     except Exception as e:
         raise Exception(f"Failed to retrieve connection metrics: {str(e)}")
     finally:
-        if conn:
-            conn.close()
+        release_db_connection(secret_name, conn)
 
 def format_results_for_conn_issues(results):
     """Format connection management results in a human-readable string"""
@@ -467,8 +498,7 @@ def execute_index_analysis(secret_name):
     except Exception as e:
         raise Exception(f"Failed to retrieve index metrics: {str(e)}")
     finally:
-        if conn:
-            conn.close()
+        release_db_connection(secret_name, conn)
     
 def format_results_for_index_analysis(results):
     """Format index analysis results in a human-readable string"""
@@ -603,8 +633,7 @@ def execute_autovacuum_analysis(secret_name):
     except Exception as e:
         raise Exception(f"Failed to retrieve autovacuum metrics: {str(e)}")
     finally:
-        if conn:
-            conn.close()
+        release_db_connection(secret_name, conn)
 
 def format_results_for_autovacuum_analysis(results):
     """Format autovacuum analysis results in a human-readable string"""
@@ -749,8 +778,7 @@ def execute_io_analysis(secret_name):
     except Exception as e:
         raise Exception(f"Failed to retrieve I/O metrics: {str(e)}")
     finally:
-        if conn:
-            conn.close()
+        release_db_connection(secret_name, conn)
 
 def format_results_for_io_analysis(results):
     """Format I/O analysis results in a human-readable string"""
@@ -889,8 +917,7 @@ def execute_replication_analysis(secret_name):
     except Exception as e:
         raise Exception(f"Failed to retrieve replication metrics: {str(e)}")
     finally:
-        if conn:
-            conn.close()
+        release_db_connection(secret_name, conn)
 
 def format_results_for_replication_analysis(results):
     """Format replication analysis results in a human-readable string"""
@@ -1040,8 +1067,7 @@ def execute_system_health(secret_name):
     except Exception as e:
         raise Exception(f"Failed to retrieve system health metrics: {str(e)}")
     finally:
-        if conn:
-            conn.close()
+        release_db_connection(secret_name, conn)
 
 def format_results_for_system_health(results):
     """Format system health analysis results in a human-readable string"""
@@ -1135,28 +1161,227 @@ def format_results_for_system_health(results):
     
     return output
 
-def connect_to_db(secret_name):
-    """Establish database connection"""
-    cur_secret = secret_name
-    secret = get_secret(cur_secret)
-    print(secret)
-    try:
-        print("in connect_to_db")
-        conn = psycopg2.connect(
+def _get_connection_pool(secret_name):
+    db_pool = _connection_pools.get(secret_name)
+    if db_pool is not None and not db_pool.closed:
+        return db_pool
+    with _connection_pools_lock:
+        # Another thread may have created the pool while this one waited for the lock
+        db_pool = _connection_pools.get(secret_name)
+        if db_pool is not None and not db_pool.closed:
+            return db_pool
+        secret = get_secret(secret_name)
+        # minconn=0 so the pool only connects when a connection is actually needed;
+        # thread safe and large enough for the concurrent full_report checks
+        db_pool = psycopg2.pool.ThreadedConnectionPool(
+            0, max(DB_POOL_MAX_CONNECTIONS, FULL_REPORT_MAX_WORKERS),
             host=secret['host'],
             database=secret['dbname'],
             user=secret['username'],
             password=secret['password'],
             port=secret['port']
         )
-        return conn
+        _connection_pools[secret_name] = db_pool
+        return db_pool
+
+def _reset_connection_pool(secret_name):
+    """Drop the pool and cached secret, e.g. after the credentials were rotated"""
+    with _connection_pools_lock:
+        _secret_cache.pop(('secret', secret_name), None)
+        db_pool = _connection_pools.pop(secret_name, None)
+        if db_pool is not None and not db_pool.closed:
+            db_pool.closeall()
+
+def _checkout_connection(db_pool):
+    """Get a pooled connection, replacing it if it went stale while the container was frozen"""
+    conn = db_pool.getconn()
+    idle_seconds = time.time() - _connection_last_used.pop(id(conn), time.time())
+    if not conn.closed and idle_seconds > DB_CONNECTION_CHECK_SECONDS:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except psycopg2.Error:
+            db_pool.putconn(conn, close=True)
+            conn = db_pool.getconn()
+    if conn.closed:
+        db_pool.putconn(conn, close=True)
+        conn = db_pool.getconn()
+    return conn
+
+def connect_to_db(secret_name):
+    """Get a database connection from the warm pool, return it with release_db_connection"""
+    try:
+        db_pool = _get_connection_pool(secret_name)
+        conn = _checkout_connection(db_pool)
+    except psycopg2.OperationalError:
+        # The cached secret may be outdated after a rotation, retry once with a fresh one
+        _reset_connection_pool(secret_name)
+        try:
+            db_pool = _get_connection_pool(secret_name)
+            conn = _checkout_connection(db_pool)
+        except Exception as e:
+            raise Exception(f"Failed to connect to the database: {str(e)}")
     except Exception as e:
         raise Exception(f"Failed to connect to the database: {str(e)}")
+    # Connections go back to the pool they came from, even if it was replaced meanwhile
+    _connection_owners[id(conn)] = db_pool
+
+    # Bound the queries of a full_report check by what is left of its time budget and
+    # let run_full_report cancel them once the budget is used up
+    check_state = getattr(_check_context, 'state', None)
+    if check_state is not None:
+        check_state['connections'].append(conn)
+        remaining_ms = int((check_state['deadline'] - time.time()) * 1000)
+        try:
+            if remaining_ms <= 0:
+                raise Exception("time budget exhausted")
+            with conn.cursor() as cur:
+                # Session level, so it survives the commits the checks issue
+                cur.execute("SET statement_timeout = %s", (remaining_ms,))
+            conn.commit()
+            _statement_timeout_connections.add(id(conn))
+        except Exception as e:
+            release_db_connection(secret_name, conn)
+            raise Exception(f"Failed to connect to the database: {str(e)}")
+    return conn
+
+def release_db_connection(secret_name, conn):
+    """Return a connection to the pool, ending its transaction; broken connections are closed"""
+    if conn is None:
+        return
+    broken = bool(conn.closed) or conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN
+    check_state = getattr(_check_context, 'state', None)
+    if check_state is not None:
+        # The pool may hand the connection to another check, which must not be cancelled
+        if conn in check_state['connections']:
+            check_state['connections'].remove(conn)
+        if conn.info.transaction_status == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+            # A statement failed, e.g. because it was cancelled or hit statement_timeout
+            check_state['aborted'] = True
+    if not broken:
+        try:
+            # Also reverts SET commands issued in the transaction
+            conn.rollback()
+            if id(conn) in _statement_timeout_connections:
+                with conn.cursor() as cur:
+                    cur.execute("RESET statement_timeout")
+                conn.commit()
+        except psycopg2.Error:
+            broken = True
+    _statement_timeout_connections.discard(id(conn))
+
+    db_pool = _connection_owners.pop(id(conn), None)
+    if db_pool is None or db_pool.closed:
+        conn.close()
+        return
+    if not broken:
+        _connection_last_used[id(conn)] = time.time()
+    db_pool.putconn(conn, close=broken)
+
+# (action_type, section title, execute function, formatter) of the full_report checks
+FULL_REPORT_CHECKS = [
+    ('slow_query', 'Slow Queries',
+     lambda secret_name: execute_slow_query(secret_name, 1000), format_results_for_slow_query),
+    ('connection_management_issues', 'Connection Management',
+     lambda secret_name: execute_connect_issues(secret_name, 1000), format_results_for_conn_issues),
+    ('index_analysis', 'Index Analysis',
+     execute_index_analysis, format_results_for_index_analysis),
+    ('autovacuum_analysis', 'Autovacuum Analysis',
+     execute_autovacuum_analysis, format_results_for_autovacuum_analysis),
+    ('io_analysis', 'I/O Analysis',
+     execute_io_analysis, format_results_for_io_analysis),
+    ('replication_analysis', 'Replication Analysis',
+     execute_replication_analysis, format_results_for_replication_analysis),
+    ('system_health', 'System Health',
+     execute_system_health, format_results_for_system_health),
+]
+
+def _run_report_check(secret_name, execute, formatter, check_state):
+    """Run one full_report check on a worker thread, recording the connections it opens"""
+    started_at = time.time()
+    check_state['deadline'] = started_at + FULL_REPORT_CHECK_TIMEOUT_SECONDS
+    check_state['started_at'] = started_at
+    _check_context.state = check_state
+    try:
+        return formatter(execute(secret_name))
+    finally:
+        _check_context.state = None
+        check_state['finished_at'] = time.time()
+
+def run_full_report(secret_name):
+    """Run all checks concurrently and return one merged report.
+
+    Each check gets FULL_REPORT_CHECK_TIMEOUT_SECONDS from the moment it starts.
+    Its connections carry a statement_timeout for the rest of that budget, and once
+    the budget is used up its running queries are cancelled on every poll until
+    the check returns. A check whose queries were cut off this way is reported as
+    timed out. Failed checks do not affect the others.
+    """
+    states = {action: {'connections': [], 'started_at': None, 'aborted': False}
+              for action, _, _, _ in FULL_REPORT_CHECKS}
+    report_start = time.time()
+
+    with ThreadPoolExecutor(max_workers=FULL_REPORT_MAX_WORKERS) as executor:
+        futures = {
+            executor.submit(_run_report_check, secret_name, execute, formatter, states[action]): action
+            for action, _, execute, formatter in FULL_REPORT_CHECKS
+        }
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            now = time.time()
+            for future in pending:
+                state = states[futures[future]]
+                if state['started_at'] is not None and now > state['deadline']:
+                    # A cancel sent between two statements is lost, so keep sending them
+                    if not state.get('cancelling'):
+                        print(f"Cancelling {futures[future]} after {FULL_REPORT_CHECK_TIMEOUT_SECONDS}s")
+                        state['cancelling'] = True
+                    for conn in list(state['connections']):
+                        try:
+                            conn.cancel()
+                        except Exception as e:
+                            print(f"Failed to cancel {futures[future]}: {str(e)}")
+
+    summary = []
+    sections = []
+    for future, action in futures.items():
+        _, title, _, _ = next(check for check in FULL_REPORT_CHECKS if check[0] == action)
+        state = states[action]
+        elapsed = state['finished_at'] - state['started_at']
+        timed_out = state['finished_at'] > state['deadline'] and (
+            state['aborted'] or future.exception() is not None)
+        if timed_out:
+            status = f"⏱️ timed out after {FULL_REPORT_CHECK_TIMEOUT_SECONDS:.0f}s"
+            body = "Check exceeded its time budget and was cancelled.\n"
+        elif future.exception() is not None:
+            status = "❌ failed"
+            body = f"Check failed: {str(future.exception())}\n"
+        else:
+            status = f"✅ completed in {elapsed:.2f}s"
+            body = future.result()
+        summary.append(f"• {title}: {status}")
+        sections.append(f"{'=' * 60}\n{title.upper()}\n{'=' * 60}\n{body}")
+
+    output = "Database Full Health Report\n\n"
+    output += f"Checks run concurrently in {time.time() - report_start:.2f}s:\n"
+    output += "\n".join(summary) + "\n\n"
+    output += "\n".join(sections)
+    return output
 
 def get_env_secret(environment):
-    ssm_client = boto3.client('ssm')
+    """Retrieve the secret name for the specified environment, cached like the secrets"""
+    cached_name = _get_cached(('parameter', environment))
+    if cached_name is not None:
+        return cached_name
+    secret_name = _get_env_secret(environment)
+    _secret_cache[('parameter', environment)] = (secret_name, time.time())
+    return secret_name
+
+def _get_env_secret(environment):
+    ssm_client = _get_aws_client('ssm')
     print("in get_env_secret")
-    """Retrieve the secret name for the specified environment"""
     if environment == 'prod':
         print("in get_env_secret1")
         try:
@@ -1242,6 +1467,9 @@ def lambda_handler(event, context):
             print("Executing system_health")
             results = execute_system_health(secret_name)
             formatted_output = format_results_for_system_health(results)
+        elif action_type == 'full_report':
+            print("Executing full_report")
+            formatted_output = run_full_report(secret_name)
         else:
             return {
                 "functionResponse": {
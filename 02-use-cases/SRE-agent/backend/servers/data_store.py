@@ -0,0 +1,328 @@
+"""
+In-memory data layer for the demo backend servers.
+
+Each dataset is loaded from disk once, kept in memory together with secondary
+indexes on the fields the endpoints filter by, and transparently reloaded when
+the underlying file changes (detected through its mtime and size).
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+logger = logging.getLogger(__name__)
+
+# How often (in seconds) a dataset re-stats its file to look for changes
+RELOAD_CHECK_INTERVAL_SECONDS = float(
+    os.getenv("BACKEND_DATA_RELOAD_INTERVAL", "1.0")
+)
+
+
+# Inclusive (start, end) bounds in epoch microseconds, either side optional
+TimeRange = Tuple[Optional[int], Optional[int]]
+
+
+def _load_json(file_path: Path) -> Any:
+    """Load a JSON document from disk"""
+    with open(file_path, "r") as f:
+        return json.load(f)
+
+
+def to_epoch_micros(timestamp_str: str) -> Optional[int]:
+    """Convert an ISO 8601 timestamp to epoch microseconds.
+
+    Timestamps without a timezone are treated as UTC. Returns None if the
+    value cannot be parsed.
+    """
+    try:
+        if timestamp_str.endswith("Z"):
+            timestamp_str = timestamp_str[:-1] + "+00:00"
+        dt = datetime.fromisoformat(timestamp_str)
+    except (TypeError, ValueError):
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    delta = dt - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def parse_time_range(
+    start_time: Optional[str] = None, end_time: Optional[str] = None
+) -> Optional[TimeRange]:
+    """Convert query parameters into a TimeRange, or None if neither is set.
+
+    Unparseable bounds fall back to the current time, matching the previous
+    per-request parsing behaviour of the servers.
+    """
+    if not start_time and not end_time:
+        return None
+
+    def _bound(value: Optional[str]) -> Optional[int]:
+        if not value:
+            return None
+        epoch = to_epoch_micros(value)
+        if epoch is None:
+            epoch = int(time.time() * 1_000_000)
+        return epoch
+
+    return (_bound(start_time), _bound(end_time))
+
+
+def iter_ndjson(records: Iterable[Any]) -> Iterator[bytes]:
+    """Serialize records as newline-delimited JSON, one chunk per record"""
+    for record in records:
+        yield json.dumps(record).encode("utf-8") + b"\n"
+
+
+class DatasetSnapshot:
+    """Immutable, fully indexed view of a dataset at one point in time.
+
+    Request handlers must treat ``raw``, ``records`` and the records themselves
+    as read-only because they are shared between requests.
+    """
+
+    def __init__(
+        self,
+        raw: Any,
+        records: List[Dict[str, Any]],
+        index_fields: Sequence[str],
+        derived_builders: Dict[str, Callable[[List[Dict[str, Any]]], Any]],
+        time_field: Optional[str] = None,
+    ):
+        self.raw = raw
+        self.records = records
+        self.indexes: Dict[str, Dict[Any, List[int]]] = {
+            field: {} for field in index_fields
+        }
+        for position, record in enumerate(records):
+            for field, index in self.indexes.items():
+                value = record.get(field)
+                if value is not None:
+                    index.setdefault(value, []).append(position)
+
+        # Time index: epochs sorted ascending with their record positions
+        self.time_field = time_field
+        self._time_keys = array("q")
+        self._time_order = array("q")
+        self._unparseable_times: List[int] = []
+        if time_field is not None:
+            timed = []
+            for position, record in enumerate(records):
+                value = record.get(time_field)
+                if not value:
+                    continue
+                epoch = to_epoch_micros(value)
+                if epoch is None:
+                    self._unparseable_times.append(position)
+                else:
+                    timed.append((epoch, position))
+            timed.sort()
+            self._time_keys = array("q", (epoch for epoch, _ in timed))
+            self._time_order = array("q", (position for _, position in timed))
+
+        self.derived: Dict[str, Any] = {
+            name: builder(records) for name, builder in derived_builders.items()
+        }
+
+    def time_positions(self, time_range: TimeRange) -> List[int]:
+        """Return positions of records inside an inclusive time range.
+
+        Uses binary search over the pre-parsed timestamps. Records whose
+        timestamp could not be parsed are always included; records without a
+        timestamp never are. Positions are returned in file order.
+        """
+        if self.time_field is None:
+            raise ValueError("Dataset has no time index")
+
+        start, end = time_range
+        lo = bisect_left(self._time_keys, start) if start is not None else 0
+        hi = (
+            bisect_right(self._time_keys, end)
+            if end is not None
+            else len(self._time_keys)
+        )
+        matched = self._time_order[lo:hi].tolist()
+        matched.extend(self._unparseable_times)
+        matched.sort()
+        return matched
+
+    def positions(
+        self, time_range: Optional[TimeRange] = None, **filters: Optional[Any]
+    ) -> Optional[List[int]]:
+        """Return record positions matching all filters, in file order.
+
+        Equality filters whose value is ``None`` are ignored. Returns ``None``
+        when no filter is active, meaning "every record".
+        """
+        active = {k: v for k, v in filters.items() if v is not None}
+        if not active and time_range is None:
+            return None
+
+        result: Optional[List[int]] = None
+        if time_range is not None:
+            result = self.time_positions(time_range)
+            if not result:
+                return []
+
+        for field, value in active.items():
+            index = self.indexes.get(field)
+            if index is None:
+                matches = [
+                    i for i, r in enumerate(self.records) if r.get(field) == value
+                ]
+            else:
+                matches = index.get(value, [])
+
+            if result is None:
+                result = matches
+            else:
+                wanted = set(matches)
+                result = [i for i in result if i in wanted]
+
+            if not result:
+                return []
+
+        return result
+
+    def select(
+        self, time_range: Optional[TimeRange] = None, **filters: Optional[Any]
+    ) -> List[Dict[str, Any]]:
+        """Return records matching all filters as a new list"""
+        positions = self.positions(time_range=time_range, **filters)
+        if positions is None:
+            return list(self.records)
+        return [self.records[i] for i in positions]
+
+    def get(self, field: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Return the first record whose ``field`` equals ``value``"""
+        positions = self.positions(**{field: value})
+        if not positions:
+            return None
+        return self.records[positions[0]]
+
+
+class Dataset:
+    """A JSON (or custom format) data file cached in memory with indexes.
+
+    Args:
+        path: File to load
+        records_key: Key of the list of records inside the JSON document.
+            When omitted and the document is a list, the list itself is used.
+        index_fields: Record fields to build equality indexes for
+        loader: Callable used to read the file, defaults to ``json.load``
+        derived: Extra structures computed from the records at load time,
+            exposed through ``DatasetSnapshot.derived``
+        time_field: Record field holding an ISO timestamp. When set, the
+            timestamps are parsed once at load time and kept sorted so time
+            range filters are answered with a binary search.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        records_key: Optional[str] = None,
+        index_fields: Iterable[str] = (),
+        loader: Callable[[Path], Any] = _load_json,
+        derived: Optional[Dict[str, Callable[[List[Dict[str, Any]]], Any]]] = None,
+        time_field: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.records_key = records_key
+        self.index_fields = tuple(index_fields)
+        self.loader = loader
+        self.derived = dict(derived or {})
+        self.time_field = time_field
+
+        self._lock = threading.Lock()
+        self._snapshot: Optional[DatasetSnapshot] = None
+        self._signature: Optional[tuple] = None
+        self._last_check = 0.0
+
+    def _extract_records(self, raw: Any) -> List[Dict[str, Any]]:
+        if self.records_key is not None:
+            if isinstance(raw, dict):
+                return raw.get(self.records_key, [])
+            return []
+        if isinstance(raw, list):
+            return raw
+        return []
+
+    def _file_signature(self) -> tuple:
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _reload(self, signature: tuple) -> DatasetSnapshot:
+        start = time.perf_counter()
+        raw = self.loader(self.path)
+        snapshot = DatasetSnapshot(
+            raw=raw,
+            records=self._extract_records(raw),
+            index_fields=self.index_fields,
+            derived_builders=self.derived,
+            time_field=self.time_field,
+        )
+        self._snapshot = snapshot
+        self._signature = signature
+        logger.info(
+            f"Loaded {self.path.name}: {len(snapshot.records)} records "
+            f"in {(time.perf_counter() - start) * 1000:.1f}ms"
+        )
+        return snapshot
+
+    def exists(self) -> bool:
+        """Check whether the backing file exists"""
+        return self._snapshot is not None or self.path.exists()
+
+    def snapshot(self) -> DatasetSnapshot:
+        """Return the current snapshot, reloading it if the file has changed.
+
+        Raises:
+            FileNotFoundError: If the file has never been loaded and is missing
+        """
+        now = time.monotonic()
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and now - self._last_check < RELOAD_CHECK_INTERVAL_SECONDS
+        ):
+            return snapshot
+
+        with self._lock:
+            if (
+                self._snapshot is not None
+                and now - self._last_check < RELOAD_CHECK_INTERVAL_SECONDS
+            ):
+                return self._snapshot
+
+            try:
+                signature = self._file_signature()
+            except FileNotFoundError:
+                if self._snapshot is None:
+                    raise
+                # Keep serving the last good copy if the file is being replaced
+                logger.warning(f"{self.path} disappeared, serving cached data")
+                self._last_check = now
+                return self._snapshot
+
+            self._last_check = now
+            if self._snapshot is not None and signature == self._signature:
+                return self._snapshot
+
+            return self._reload(signature)
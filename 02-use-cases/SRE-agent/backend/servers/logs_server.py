@@ -1,6 +1,6 @@
+import itertools
 import json
 import logging
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
@@ -11,8 +11,9 @@ from fastapi import (
     HTTPException,
     Depends,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from data_store import Dataset, iter_ndjson, parse_time_range
 from retrieve_api_key import retrieve_api_key
 
 # Configure logging with basicConfig
@@ -47,53 +48,6 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
-def _parse_timestamp(timestamp_str: str) -> datetime:
-    """Parse ISO timestamp string to datetime object"""
-    try:
-        # Handle both with and without timezone
-        if timestamp_str.endswith("Z"):
-            return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-        elif "+" in timestamp_str or timestamp_str.endswith("0"):
-            return datetime.fromisoformat(timestamp_str)
-        else:
-            return datetime.fromisoformat(timestamp_str + "+00:00")
-    except:
-        # Fallback: assume current time if parsing fails
-        return datetime.now(timezone.utc)
-
-
-def _filter_by_time(
-    logs: list, start_time: Optional[str] = None, end_time: Optional[str] = None
-) -> list:
-    """Filter logs by time range"""
-    if not start_time and not end_time:
-        return logs
-
-    filtered_logs = []
-    start_dt = _parse_timestamp(start_time) if start_time else None
-    end_dt = _parse_timestamp(end_time) if end_time else None
-
-    for log in logs:
-        log_timestamp = log.get("timestamp")
-        if not log_timestamp:
-            continue
-
-        try:
-            log_dt = _parse_timestamp(log_timestamp)
-
-            if start_dt and log_dt < start_dt:
-                continue
-            if end_dt and log_dt > end_dt:
-                continue
-
-            filtered_logs.append(log)
-        except:
-            # Include logs with unparseable timestamps
-            filtered_logs.append(log)
-
-    return filtered_logs
-
-
 def _parse_log_file(file_path: Path, pattern: Optional[str] = None):
     """Parse log file and filter by pattern"""
     logs = []
@@ -143,6 +97,33 @@ def _parse_log_file(file_path: Path, pattern: Optional[str] = None):
     return logs
 
 
+def _build_search_text(logs: list) -> list:
+    """Lower-cased searchable text for each log, aligned with the log list"""
+    search_text = []
+    for log in logs:
+        if "timestamp" in log:
+            line = f"{log.get('timestamp', '')} [{log.get('level', '')}] {log.get('service', '')} {log.get('message', '')}"
+        else:
+            line = log.get("message", "")
+        search_text.append(line.lower())
+    return search_text
+
+
+# In-memory datasets, loaded once and reloaded when the files change
+APPLICATION_LOGS = Dataset(
+    DATA_PATH / "application.log",
+    loader=_parse_log_file,
+    index_fields=("level", "service"),
+    derived={"search_text": _build_search_text},
+    time_field="timestamp",
+)
+ERROR_LOGS = Dataset(
+    DATA_PATH / "error.log", index_fields=("service",), time_field="timestamp"
+)
+LOG_PATTERNS = Dataset(DATA_PATH / "log_patterns.json", records_key="patterns")
+LOG_COUNTS = Dataset(DATA_PATH / "log_counts.json")
+
+
 @app.get("/logs/search")
 async def search_logs(
     pattern: str = Query(..., description="Search pattern or keyword"),
@@ -151,22 +132,37 @@ async def search_logs(
     log_level: Optional[str] = Query(
         None, enum=["ERROR", "WARN", "INFO", "DEBUG"], description="Filter by log level"
     ),
+    limit: int = Query(100, ge=1, le=10000, description="Maximum logs to return"),
+    stream: bool = Query(
+        False, description="Stream matching logs as newline-delimited JSON"
+    ),
     api_key: str = Depends(_validate_api_key),
 ):
     """Search logs by pattern/timeframe"""
     try:
-        application_logs = _parse_log_file(DATA_PATH / "application.log", pattern)
-
-        # Filter by log level if provided
-        if log_level:
-            application_logs = [
-                log for log in application_logs if log.get("level") == log_level
-            ]
-
-        # Filter by time range
-        application_logs = _filter_by_time(application_logs, start_time, end_time)
-
-        return {"logs": application_logs[:100]}  # Limit results
+        snapshot = APPLICATION_LOGS.snapshot()
+        search_text = snapshot.derived["search_text"]
+        pattern_lower = pattern.lower()
+
+        # Filter by log level and time range through the indexes, then by pattern
+        positions = snapshot.positions(
+            time_range=parse_time_range(start_time, end_time),
+            level=log_level or None,
+        )
+        if positions is None:
+            positions = range(len(snapshot.records))
+        matches = (
+            snapshot.records[i] for i in positions if pattern_lower in search_text[i]
+        )
+        application_logs = itertools.islice(matches, limit)
+
+        if stream:
+            # Matches are produced lazily from the immutable snapshot as the
+            # response is written, so the result window is never materialized
+            return StreamingResponse(
+                iter_ndjson(application_logs), media_type="application/x-ndjson"
+            )
+        return {"logs": list(application_logs)}
     except Exception as e:
         logging.error(f"Error searching logs: {str(e)}")
         return JSONResponse(status_code=500, content={"error": str(e)})
@@ -176,20 +172,22 @@ async def search_logs(
 async def get_error_logs(
     since: Optional[str] = Query(None, description="Get errors since this timestamp"),
     service: Optional[str] = Query(None, description="Filter by service name"),
+    stream: bool = Query(
+        False, description="Stream matching errors as newline-delimited JSON"
+    ),
     api_key: str = Depends(_validate_api_key),
 ):
     """Retrieve error-specific entries"""
     try:
-        with open(DATA_PATH / "error.log", "r") as f:
-            error_logs = json.load(f)
-
-        if service:
-            error_logs = [log for log in error_logs if log.get("service") == service]
-
-        # Filter by since timestamp
-        if since:
-            error_logs = _filter_by_time(error_logs, start_time=since)
-
+        # Filter by service and since timestamp through the indexes
+        error_logs = ERROR_LOGS.snapshot().select(
+            time_range=parse_time_range(since), service=service or None
+        )
+
+        if stream:
+            return StreamingResponse(
+                iter_ndjson(error_logs), media_type="application/x-ndjson"
+            )
         return {"errors": error_logs}
     except Exception as e:
         logging.error(f"Error retrieving error logs: {str(e)}")
@@ -211,15 +209,11 @@ async def analyze_log_patterns(
     """Identify recurring issues"""
     try:
         # Read patterns from actual data file
-        patterns_file = DATA_PATH / "log_patterns.json"
-        if not patterns_file.exists():
+        if not LOG_PATTERNS.exists():
             return {"patterns": []}
-        
-        with open(patterns_file, "r") as f:
-            data = json.load(f)
-        
-        patterns = data.get("patterns", [])
-        
+
+        patterns = LOG_PATTERNS.snapshot().records
+
         # Filter by min_occurrences
         patterns = [p for p in patterns if p["count"] >= min_occurrences]
 
@@ -239,14 +233,13 @@ async def get_recent_logs(
 ):
     """Fetch latest log entries"""
     try:
-        all_logs = _parse_log_file(DATA_PATH / "application.log")
+        all_logs = APPLICATION_LOGS.snapshot().records
 
         if service:
             all_logs = [log for log in all_logs if service in log.get("service", "")]
 
-        # Return the most recent logs (last N entries)
-        recent_logs = all_logs[-limit:] if len(all_logs) > limit else all_logs
-        recent_logs.reverse()  # Most recent first
+        # Return the most recent logs (last N entries), most recent first
+        recent_logs = all_logs[-limit:][::-1]
 
         return {"logs": recent_logs}
     except Exception as e:
@@ -270,13 +263,11 @@ async def count_log_events(
     """Count occurrences of specific events"""
     try:
         # Read counts from actual data file
-        counts_file = DATA_PATH / "log_counts.json"
-        if not counts_file.exists():
+        if not LOG_COUNTS.exists():
             return {"total_count": 0, "counts": []}
-        
-        with open(counts_file, "r") as f:
-            data = json.load(f)
-        
+
+        data = LOG_COUNTS.snapshot().raw
+
         if event_type.lower() == "error":
             error_data = data.get("error_counts", {})
             total_count = error_data.get("total_count", 0)
@@ -1,6 +1,4 @@
-import json
 import logging
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
@@ -11,8 +9,9 @@ from fastapi import (
     HTTPException,
     Depends,
 )
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from data_store import Dataset, iter_ndjson, parse_time_range
 from retrieve_api_key import retrieve_api_key
 
 # Configure logging with basicConfig
@@ -26,6 +25,35 @@ app = FastAPI(title="Application Metrics API", version="1.0.0")
 
 DATA_PATH = Path(__file__).parent.parent / "data" / "metrics_data"
 
+# In-memory datasets, loaded once and reloaded when the files change
+RESPONSE_TIMES = Dataset(
+    DATA_PATH / "response_times.json",
+    records_key="metrics",
+    index_fields=("service",),
+    time_field="timestamp",
+)
+THROUGHPUT = Dataset(
+    DATA_PATH / "throughput.json",
+    records_key="metrics",
+    index_fields=("service",),
+    time_field="timestamp",
+)
+RESOURCE_USAGE = Dataset(
+    DATA_PATH / "resource_usage.json",
+    records_key="metrics",
+    index_fields=("service",),
+    time_field="timestamp",
+)
+ERROR_RATES = Dataset(
+    DATA_PATH / "error_rates.json", records_key="error_rates", index_fields=("service",)
+)
+AVAILABILITY = Dataset(
+    DATA_PATH / "availability.json",
+    records_key="availability_metrics",
+    index_fields=("service",),
+)
+TRENDS = Dataset(DATA_PATH / "trends.json")
+
 # API Key for authentication
 CREDENTIAL_PROVIDER_NAME = "sre-agent-api-key-credential-provider"
 
@@ -47,53 +75,6 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
-def _parse_timestamp(timestamp_str: str) -> datetime:
-    """Parse ISO timestamp string to datetime object"""
-    try:
-        # Handle both with and without timezone
-        if timestamp_str.endswith("Z"):
-            return datetime.fromisoformat(timestamp_str.replace("Z", "+00:00"))
-        elif "+" in timestamp_str or timestamp_str.endswith("0"):
-            return datetime.fromisoformat(timestamp_str)
-        else:
-            return datetime.fromisoformat(timestamp_str + "+00:00")
-    except:
-        # Fallback: assume current time if parsing fails
-        return datetime.now(timezone.utc)
-
-
-def _filter_metrics_by_time(
-    metrics: list, start_time: Optional[str] = None, end_time: Optional[str] = None
-) -> list:
-    """Filter metrics by time range"""
-    if not start_time and not end_time:
-        return metrics
-
-    filtered_metrics = []
-    start_dt = _parse_timestamp(start_time) if start_time else None
-    end_dt = _parse_timestamp(end_time) if end_time else None
-
-    for metric in metrics:
-        metric_timestamp = metric.get("timestamp")
-        if not metric_timestamp:
-            continue
-
-        try:
-            metric_dt = _parse_timestamp(metric_timestamp)
-
-            if start_dt and metric_dt < start_dt:
-                continue
-            if end_dt and metric_dt > end_dt:
-                continue
-
-            filtered_metrics.append(metric)
-        except:
-            # Include metrics with unparseable timestamps
-            filtered_metrics.append(metric)
-
-    return filtered_metrics
-
-
 @app.get("/metrics/performance")
 async def get_performance_metrics(
     metric_type: Optional[str] = Query(
@@ -104,57 +85,54 @@ async def get_performance_metrics(
     start_time: Optional[str] = Query(None, description="Start time for metrics"),
     end_time: Optional[str] = Query(None, description="End time for metrics"),
     service: Optional[str] = Query(None, description="Filter by service name"),
+    stream: bool = Query(
+        False, description="Stream metrics as newline-delimited JSON"
+    ),
     api_key: str = Depends(_validate_api_key),
 ):
     """Retrieve performance data"""
     try:
-        metrics = []
+        # Filter by service and time range through the indexes
+        filters = {
+            "service": service or None,
+            "time_range": parse_time_range(start_time, end_time),
+        }
 
         if metric_type == "response_time":
-            with open(DATA_PATH / "response_times.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
+            metrics = RESPONSE_TIMES.snapshot().select(**filters)
         elif metric_type == "throughput":
-            with open(DATA_PATH / "throughput.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
+            metrics = THROUGHPUT.snapshot().select(**filters)
         elif metric_type in ["cpu_usage", "memory_usage"]:
-            with open(DATA_PATH / "resource_usage.json", "r") as f:
-                data = json.load(f)
-                raw_metrics = data.get("metrics", [])
-                # Transform resource metrics to match expected format
-                metrics = []
-                for m in raw_metrics:
-                    if metric_type == "cpu_usage":
-                        metrics.append(
-                            {
-                                "timestamp": m["timestamp"],
-                                "service": m["service"],
-                                "value": m["cpu_usage_percent"],
-                                "unit": "percent",
-                            }
-                        )
-                    else:  # memory_usage
-                        metrics.append(
-                            {
-                                "timestamp": m["timestamp"],
-                                "service": m["service"],
-                                "value": m["memory_usage_mb"],
-                                "unit": "MB",
-                            }
-                        )
+            raw_metrics = RESOURCE_USAGE.snapshot().select(**filters)
+            # Transform resource metrics to match expected format
+            metrics = []
+            for m in raw_metrics:
+                if metric_type == "cpu_usage":
+                    metrics.append(
+                        {
+                            "timestamp": m["timestamp"],
+                            "service": m["service"],
+                            "value": m["cpu_usage_percent"],
+                            "unit": "percent",
+                        }
+                    )
+                else:  # memory_usage
+                    metrics.append(
+                        {
+                            "timestamp": m["timestamp"],
+                            "service": m["service"],
+                            "value": m["memory_usage_mb"],
+                            "unit": "MB",
+                        }
+                    )
         else:
             # Return combined metrics for demo
-            with open(DATA_PATH / "resource_usage.json", "r") as f:
-                data = json.load(f)
-                metrics = data.get("metrics", [])
-
-        if service:
-            metrics = [m for m in metrics if m.get("service") == service]
-
-        # Filter by time range
-        metrics = _filter_metrics_by_time(metrics, start_time, end_time)
+            metrics = RESOURCE_USAGE.snapshot().select(**filters)
 
+        if stream:
+            return StreamingResponse(
+                iter_ndjson(metrics), media_type="application/x-ndjson"
+            )
         return {"metrics": metrics}
     except Exception as e:
         logging.error(f"Error retrieving performance metrics: {str(e)}")
@@ -171,13 +149,7 @@ async def get_error_rates(
 ):
     """Fetch error rate statistics"""
     try:
-        with open(DATA_PATH / "error_rates.json", "r") as f:
-            data = json.load(f)
-
-        error_rates = data.get("error_rates", [])
-
-        if service:
-            error_rates = [e for e in error_rates if e.get("service") == service]
+        error_rates = ERROR_RATES.snapshot().select(service=service or None)
 
         # TODO: In real implementation, would filter by time window
 
@@ -202,13 +174,7 @@ async def get_resource_metrics(
 ):
     """Monitor resource utilization"""
     try:
-        with open(DATA_PATH / "resource_usage.json", "r") as f:
-            data = json.load(f)
-
-        metrics = data.get("metrics", [])
-
-        if service:
-            metrics = [m for m in metrics if m.get("service") == service]
+        metrics = RESOURCE_USAGE.snapshot().select(service=service or None)
 
         # Filter by resource type if specified
         if resource_type:
@@ -247,15 +213,9 @@ async def get_availability_metrics(
 ):
     """Check service availability"""
     try:
-        with open(DATA_PATH / "availability.json", "r") as f:
-            data = json.load(f)
-
-        availability_metrics = data.get("availability_metrics", [])
-
-        if service:
-            availability_metrics = [
-                a for a in availability_metrics if a.get("service") == service
-            ]
+        availability_metrics = AVAILABILITY.snapshot().select(
+            service=service or None
+        )
 
         # TODO: In real implementation, would calculate based on time window
 
@@ -282,18 +242,16 @@ async def analyze_trends(
     """Identify metric trends and anomalies"""
     try:
         # Read trends from actual data file
-        trends_file = DATA_PATH / "trends.json"
-        if not trends_file.exists():
+        if not TRENDS.exists():
             return {
                 "trend": "no_data",
                 "average_value": 0,
                 "standard_deviation": 0,
                 "anomalies": [],
             }
-        
-        with open(trends_file, "r") as f:
-            data = json.load(f)
-        
+
+        data = TRENDS.snapshot().raw
+
         # Determine which trend data to use based on metric name
         if "response" in metric_name.lower():
             trend_data = data.get("response_time_trends", {})
@@ -13,6 +13,8 @@ from fastapi import (
 )
 from fastapi.responses import JSONResponse
 
+from data_store import Dataset
+from search_index import InvertedIndex, load_markdown_sections
 from retrieve_api_key import retrieve_api_key
 
 # Configure logging with basicConfig
@@ -26,6 +28,47 @@ app = FastAPI(title="DevOps Runbooks API", version="1.0.0")
 
 DATA_PATH = Path(__file__).parent.parent / "data" / "runbooks_data"
 
+# In-memory datasets, loaded once and reloaded when the files change
+PLAYBOOKS = Dataset(
+    DATA_PATH / "incident_playbooks.json",
+    records_key="playbooks",
+    index_fields=("id", "incident_type", "severity"),
+    derived={
+        "search_index": InvertedIndex.builder(
+            ("title", "description", "steps", "triggers")
+        )
+    },
+)
+TROUBLESHOOTING_GUIDES = Dataset(
+    DATA_PATH / "troubleshooting_guides.json",
+    records_key="guides",
+    index_fields=("category",),
+    derived={
+        "search_index": InvertedIndex.builder(
+            ("title", "steps", "common_causes", "resolution")
+        )
+    },
+)
+MARKDOWN_RUNBOOKS = [
+    Dataset(
+        markdown_file,
+        loader=load_markdown_sections,
+        derived={"search_index": InvertedIndex.builder(("title", "content"))},
+    )
+    for markdown_file in sorted((DATA_PATH / "markdown").glob("*.md"))
+]
+
+# Maximum number of related guides/markdown sections returned by a search
+MAX_RELATED_DOCUMENTS = 5
+ESCALATION_PROCEDURES = Dataset(
+    DATA_PATH / "escalation_procedures.json",
+    records_key="escalation_procedures",
+    index_fields=("severity",),
+)
+COMMON_RESOLUTIONS = Dataset(
+    DATA_PATH / "common_resolutions.json", records_key="resolutions"
+)
+
 # API Key for authentication
 CREDENTIAL_PROVIDER_NAME = "sre-agent-api-key-credential-provider"
 
@@ -47,6 +90,67 @@ def _validate_api_key(x_api_key: str = Header(None, alias="X-API-Key")):
     return x_api_key
 
 
+def _log_runbook_details(label: str, items: list, title_key: str = "title"):
+    """Log each returned runbook and its first steps at debug level"""
+    if not logging.getLogger().isEnabledFor(logging.DEBUG):
+        return
+    for i, item in enumerate(items):
+        logging.debug(
+            f"  📖 {label} {i+1}: {item.get(title_key, f'No {title_key}')} (ID: {item.get('id', 'No ID')})"
+        )
+        steps = item.get("steps", [])
+        logging.debug(f"     Steps count: {len(steps)}")
+        for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
+            logging.debug(f"     Step {j+1}: {step}")
+        if len(steps) > 3:
+            logging.debug(f"     ... and {len(steps) - 3} more steps")
+
+
+def _log_response_data(response_data: dict):
+    """Log the full response payload at debug level"""
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug(
+            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
+        )
+
+
+def _search_related_documents(keyword: str) -> list:
+    """Rank troubleshooting guides and markdown runbook sections for a keyword"""
+    related = []
+
+    guides = TROUBLESHOOTING_GUIDES.snapshot()
+    for position, score in guides.derived["search_index"].search(
+        keyword, limit=MAX_RELATED_DOCUMENTS
+    ):
+        guide = guides.records[position]
+        related.append(
+            {
+                "source": "troubleshooting_guides",
+                "id": guide.get("id"),
+                "title": guide.get("title"),
+                "score": round(score, 4),
+            }
+        )
+
+    for markdown in MARKDOWN_RUNBOOKS:
+        sections = markdown.snapshot()
+        for position, score in sections.derived["search_index"].search(
+            keyword, limit=MAX_RELATED_DOCUMENTS
+        ):
+            section = sections.records[position]
+            related.append(
+                {
+                    "source": f"markdown/{section['source']}",
+                    "id": section.get("id"),
+                    "title": section.get("title"),
+                    "score": round(score, 4),
+                }
+            )
+
+    related.sort(key=lambda doc: -doc["score"])
+    return related[:MAX_RELATED_DOCUMENTS]
+
+
 @app.get("/runbooks/search")
 async def search_runbooks(
     incident_type: Optional[str] = Query(
@@ -70,56 +174,40 @@ async def search_runbooks(
             f"🔍 RUNBOOKS API: search_runbooks called - incident_type={incident_type}, keyword={keyword}, severity={severity}"
         )
 
-        with open(DATA_PATH / "incident_playbooks.json", "r") as f:
-            data = json.load(f)
-
-        runbooks = data.get("playbooks", [])
-        original_count = len(runbooks)
-
-        if incident_type:
-            runbooks = [r for r in runbooks if r.get("incident_type") == incident_type]
-            logging.info(
-                f"📋 RUNBOOKS API: Filtered by incident_type '{incident_type}': {len(runbooks)} runbooks"
-            )
+        snapshot = PLAYBOOKS.snapshot()
+        original_count = len(snapshot.records)
 
-        if severity:
-            runbooks = [r for r in runbooks if r.get("severity") == severity]
+        # Filter by incident type and severity through the indexes
+        positions = snapshot.positions(
+            incident_type=incident_type or None, severity=severity or None
+        )
+        if positions is not None:
             logging.info(
-                f"📋 RUNBOOKS API: Filtered by severity '{severity}': {len(runbooks)} runbooks"
+                f"📋 RUNBOOKS API: Filtered by incident_type '{incident_type}' and severity '{severity}': {len(positions)} runbooks"
             )
 
         if keyword:
-            runbooks = [
-                r
-                for r in runbooks
-                if keyword.lower() in r.get("title", "").lower()
-                or keyword.lower() in r.get("description", "").lower()
-                or any(keyword.lower() in step.lower() for step in r.get("steps", []))
-            ]
+            # Rank the remaining playbooks by BM25 relevance to the keyword
+            ranked = snapshot.derived["search_index"].search(keyword, positions)
+            runbooks = [snapshot.records[position] for position, _ in ranked]
+            response_data = {
+                "runbooks": runbooks,
+                "related_documents": _search_related_documents(keyword),
+            }
             logging.info(
                 f"📋 RUNBOOKS API: Filtered by keyword '{keyword}': {len(runbooks)} runbooks"
             )
-
-        response_data = {"runbooks": runbooks}
-
-        # Log detailed response
-        logging.info(
-            f"📤 RUNBOOKS API: Returning {len(runbooks)} runbooks out of {original_count} total"
-        )
-        for i, runbook in enumerate(runbooks):
-            logging.info(
-                f"  📖 Runbook {i+1}: {runbook.get('title', 'No title')} (ID: {runbook.get('id', 'No ID')})"
+        else:
+            runbooks = snapshot.select(
+                incident_type=incident_type or None, severity=severity or None
             )
-            steps = runbook.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j+1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
+            response_data = {"runbooks": runbooks}
 
         logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
+            f"📤 RUNBOOKS API: Returning {len(runbooks)} runbooks out of {original_count} total"
         )
+        _log_runbook_details("Runbook", runbooks)
+        _log_response_data(response_data)
         return response_data
     except Exception as e:
         logging.error(f"❌ Error searching runbooks: {str(e)}")
@@ -137,25 +225,21 @@ async def get_incident_playbook(
             f"🔍 RUNBOOKS API: get_incident_playbook called for playbook_id='{playbook_id}'"
         )
 
-        with open(DATA_PATH / "incident_playbooks.json", "r") as f:
-            data = json.load(f)
-
-        playbooks = data.get("playbooks", [])
+        playbook = PLAYBOOKS.snapshot().get("id", playbook_id)
 
-        for playbook in playbooks:
-            if playbook.get("id") == playbook_id:
-                logging.info(
-                    f"📖 RUNBOOKS API: Found playbook '{playbook.get('title', 'No title')}'"
-                )
-                steps = playbook.get("steps", [])
-                logging.info(f"📝 RUNBOOKS API: Playbook has {len(steps)} steps:")
+        if playbook is not None:
+            logging.info(
+                f"📖 RUNBOOKS API: Found playbook '{playbook.get('title', 'No title')}'"
+            )
+            steps = playbook.get("steps", [])
+            logging.info(f"📝 RUNBOOKS API: Playbook has {len(steps)} steps")
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
                 for i, step in enumerate(steps):
-                    logging.info(f"   Step {i+1}: {step}")
-
-                logging.info(
+                    logging.debug(f"   Step {i+1}: {step}")
+                logging.debug(
                     f"📤 RUNBOOKS API: Returning complete playbook data: {json.dumps(playbook, indent=2)}"
                 )
-                return playbook
+            return playbook
 
         logging.warning(f"❌ RUNBOOKS API: Playbook '{playbook_id}' not found")
         return JSONResponse(status_code=404, content={"error": "Playbook not found"})
@@ -180,14 +264,11 @@ async def get_troubleshooting_guide(
             f"🔍 RUNBOOKS API: get_troubleshooting_guide called - category={category}, issue_type={issue_type}"
         )
 
-        with open(DATA_PATH / "troubleshooting_guides.json", "r") as f:
-            data = json.load(f)
-
-        guides = data.get("guides", [])
-        original_count = len(guides)
+        snapshot = TROUBLESHOOTING_GUIDES.snapshot()
+        original_count = len(snapshot.records)
 
+        guides = snapshot.select(category=category or None)
         if category:
-            guides = [g for g in guides if g.get("category") == category]
             logging.info(
                 f"📋 RUNBOOKS API: Filtered by category '{category}': {len(guides)} guides"
             )
@@ -209,20 +290,8 @@ async def get_troubleshooting_guide(
         logging.info(
             f"📤 RUNBOOKS API: Returning {len(guides)} guides out of {original_count} total"
         )
-        for i, guide in enumerate(guides):
-            logging.info(
-                f"  📖 Guide {i+1}: {guide.get('title', 'No title')} (ID: {guide.get('id', 'No ID')})"
-            )
-            steps = guide.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j+1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
-
-        logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
-        )
+        _log_runbook_details("Guide", guides)
+        _log_response_data(response_data)
         return response_data
     except Exception as e:
         logging.error(f"❌ Error retrieving troubleshooting guides: {str(e)}")
@@ -241,13 +310,7 @@ async def get_escalation_procedures(
 ):
     """Retrieve escalation procedures"""
     try:
-        with open(DATA_PATH / "escalation_procedures.json", "r") as f:
-            data = json.load(f)
-
-        procedures = data.get("escalation_procedures", [])
-
-        if severity:
-            procedures = [p for p in procedures if p.get("severity") == severity]
+        procedures = ESCALATION_PROCEDURES.snapshot().select(severity=severity or None)
 
         if incident_type:
             procedures = [
@@ -278,10 +341,7 @@ async def get_common_resolutions(
             f"🔍 RUNBOOKS API: get_common_resolutions called - issue='{issue}', service={service}"
         )
 
-        with open(DATA_PATH / "common_resolutions.json", "r") as f:
-            data = json.load(f)
-
-        resolutions = data.get("resolutions", [])
+        resolutions = COMMON_RESOLUTIONS.snapshot().records
         original_count = len(resolutions)
 
         # Filter by issue
@@ -314,20 +374,8 @@ async def get_common_resolutions(
         logging.info(
             f"📤 RUNBOOKS API: Returning {len(matching_resolutions)} resolutions out of {original_count} total"
         )
-        for i, resolution in enumerate(matching_resolutions):
-            logging.info(
-                f"  📖 Resolution {i+1}: {resolution.get('issue', 'No issue title')} (ID: {resolution.get('id', 'No ID')})"
-            )
-            steps = resolution.get("steps", [])
-            logging.info(f"     Steps count: {len(steps)}")
-            for j, step in enumerate(steps[:3]):  # Show first 3 steps for brevity
-                logging.info(f"     Step {j+1}: {step}")
-            if len(steps) > 3:
-                logging.info(f"     ... and {len(steps) - 3} more steps")
-
-        logging.info(
-            f"📋 RUNBOOKS API: Full response data: {json.dumps(response_data, indent=2)}"
-        )
+        _log_runbook_details("Resolution", matching_resolutions, title_key="issue")
+        _log_response_data(response_data)
         return response_data
     except Exception as e:
         logging.error(f"❌ Error retrieving common resolutions: {str(e)}")
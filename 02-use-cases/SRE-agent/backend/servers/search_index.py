@@ -0,0 +1,175 @@
+"""
+Tokenized inverted index with BM25 ranking for runbook keyword search.
+
+The index is built once per dataset snapshot (see ``data_store.Dataset``'s
+``derived`` builders) so a query only touches the postings of its own terms.
+"""
+
+import math
+import re
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Standard BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Query terms shorter than this are not expanded to vocabulary prefixes
+MIN_PREFIX_LENGTH = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lower-cased alphanumeric tokens"""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def _flatten_text(value: Any) -> str:
+    """Collect all strings from a (possibly nested) record field"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        return " ".join(_flatten_text(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return " ".join(_flatten_text(v) for v in value)
+    return ""
+
+
+class InvertedIndex:
+    """In-memory inverted index over a fixed list of documents.
+
+    Args:
+        documents: Text of each document; document ids are list positions
+        k1: BM25 term frequency saturation
+        b: BM25 document length normalization
+    """
+
+    def __init__(
+        self, documents: Sequence[str], k1: float = BM25_K1, b: float = BM25_B
+    ):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_lengths: List[int] = []
+
+        for doc_id, text in enumerate(documents):
+            tokens = tokenize(text)
+            self.doc_lengths.append(len(tokens))
+            for token in tokens:
+                postings = self.postings.setdefault(token, {})
+                postings[doc_id] = postings.get(doc_id, 0) + 1
+
+        self.doc_count = len(self.doc_lengths)
+        self.avg_doc_length = (
+            sum(self.doc_lengths) / self.doc_count if self.doc_count else 0.0
+        )
+        self.vocabulary = sorted(self.postings)
+        self.idf = {
+            term: math.log(
+                1 + (self.doc_count - len(docs) + 0.5) / (len(docs) + 0.5)
+            )
+            for term, docs in self.postings.items()
+        }
+
+    @classmethod
+    def builder(
+        cls, fields: Sequence[str]
+    ) -> Callable[[List[Dict[str, Any]]], "InvertedIndex"]:
+        """Return a ``Dataset`` derived builder indexing the given record fields"""
+
+        def _build(records: List[Dict[str, Any]]) -> "InvertedIndex":
+            return cls(
+                [
+                    " ".join(_flatten_text(record.get(field)) for field in fields)
+                    for record in records
+                ]
+            )
+
+        return _build
+
+    def _expand(self, term: str) -> List[str]:
+        """Return the term itself, or vocabulary terms it is a prefix of"""
+        if term in self.postings:
+            return [term]
+        if len(term) < MIN_PREFIX_LENGTH:
+            return []
+        matches = []
+        position = bisect_left(self.vocabulary, term)
+        while position < len(self.vocabulary) and self.vocabulary[
+            position
+        ].startswith(term):
+            matches.append(self.vocabulary[position])
+            position += 1
+        return matches
+
+    def search(
+        self,
+        query: str,
+        candidates: Optional[Iterable[int]] = None,
+        limit: Optional[int] = None,
+    ) -> List[Tuple[int, float]]:
+        """Rank documents against a query with BM25.
+
+        Query terms missing from the vocabulary are matched as prefixes, so
+        partial words keep matching like the previous substring search did.
+
+        Args:
+            query: Free text query
+            candidates: Optional document ids to restrict the search to
+            limit: Maximum number of results to return
+
+        Returns:
+            (document id, score) pairs sorted by descending score
+        """
+        allowed = set(candidates) if candidates is not None else None
+        scores: Dict[int, float] = {}
+
+        for query_term in set(tokenize(query)):
+            for term in self._expand(query_term):
+                idf = self.idf[term]
+                for doc_id, frequency in self.postings[term].items():
+                    if allowed is not None and doc_id not in allowed:
+                        continue
+                    length_norm = 1 - self.b + self.b * (
+                        self.doc_lengths[doc_id] / self.avg_doc_length
+                    )
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * (
+                        frequency * (self.k1 + 1)
+                    ) / (frequency + self.k1 * length_norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return ranked
+
+
+_ID_PATTERN = re.compile(r"\*\*[^*]*ID:\*\*\s*`([^`]+)`")
+
+
+def load_markdown_sections(file_path: Path) -> List[Dict[str, Any]]:
+    """Split a markdown runbook into one record per ``##`` section"""
+    sections: List[Dict[str, Any]] = []
+    current: Optional[Dict[str, Any]] = None
+    lines: List[str] = []
+
+    def _close() -> None:
+        if current is not None:
+            content = "\n".join(lines).strip()
+            match = _ID_PATTERN.search(content)
+            current["id"] = match.group(1) if match else None
+            current["content"] = content
+            sections.append(current)
+
+    with open(file_path, "r") as f:
+        for line in f:
+            if line.startswith("## "):
+                _close()
+                current = {"source": file_path.stem, "title": line[3:].strip()}
+                lines = []
+            elif current is not None:
+                lines.append(line.rstrip("\n"))
+    _close()
+
+    return sections
@@ -9,12 +9,13 @@ from typing import Any, Dict, List
 import yaml
 from langchain_anthropic import ChatAnthropic
 from langchain_aws import ChatBedrock
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
 from langchain_core.tools import BaseTool
 from langgraph.prebuilt import create_react_agent
 
 from .agent_state import AgentState
 from .constants import SREConstants
+from .message_history import MessageHistoryManager, store_trace
 from .prompt_loader import prompt_loader
 
 # Logging will be configured by the main entry point
@@ -103,6 +104,11 @@ class BaseAgentNode:
         # Create the react agent
         self.agent = create_react_agent(self.llm, self.tools)
 
+        # Keeps the history sent to the agent within a token budget
+        self.history = MessageHistoryManager.from_config(
+            _load_agent_config().get("message_history", {})
+        )
+
     def _get_system_prompt(self) -> str:
         """Get system prompt for this agent using prompt loader."""
         try:
@@ -158,19 +164,20 @@ class BaseAgentNode:
             # Add system prompt and user prompt
             system_message = SystemMessage(content=self._get_system_prompt())
             user_message = HumanMessage(content=agent_prompt)
+            history = self.history.compact(messages)
 
             # Stream the agent execution to capture tool calls with timeout
             logger.info(f"{self.name} - Starting agent execution")
 
             try:
-                # Add timeout to prevent infinite hanging (120 seconds)
-                timeout_seconds = 120
+                # Add timeout to prevent infinite hanging
+                timeout_seconds = SREConstants.timeouts.agent_execution_timeout_seconds
 
                 async def execute_agent():
                     nonlocal agent_response  # Fix scope issue - allow access to outer variable
                     chunk_count = 0
                     async for chunk in self.agent.astream(
-                        {"messages": [system_message] + messages + [user_message]}
+                        {"messages": [system_message] + history + [user_message]}
                     ):
                         chunk_count += 1
                         logger.info(
@@ -258,6 +265,15 @@ class BaseAgentNode:
             if agent_response:
                 logger.info(f"{self.name} - Full response: {str(agent_response)}")
 
+            # Tool calls and results stay in the trace store behind the trace ids;
+            # only the agent's final answer is added to the conversation state
+            trace_ids = store_trace(all_messages)
+            final_messages = [
+                msg
+                for msg in all_messages[-1:]
+                if isinstance(msg, AIMessage) and not msg.tool_calls
+            ]
+
             # Update state with streaming info
             return {
                 "agent_results": {
@@ -265,10 +281,10 @@ class BaseAgentNode:
                     self.name: agent_response,
                 },
                 "agents_invoked": state.get("agents_invoked", []) + [self.name],
-                "messages": messages + all_messages,
+                "messages": messages + final_messages,
                 "metadata": {
                     **state.get("metadata", {}),
-                    f"{self.name.replace(' ', '_')}_trace": all_messages,
+                    f"{self.name.replace(' ', '_')}_trace": trace_ids,
                 },
             }
 
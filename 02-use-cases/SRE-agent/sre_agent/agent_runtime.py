@@ -1,12 +1,16 @@
 #!/usr/bin/env python3
 
 import asyncio
+import json
 import logging
 import os
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import BaseTool
@@ -43,9 +47,139 @@ class InvocationResponse(BaseModel):
     output: Dict[str, Any]
 
 
+class AdmissionRejectedError(Exception):
+    """Raised when both the in-flight slots and the wait queue are full."""
+
+
+class Admission:
+    """A request admitted by AdmissionController.
+
+    ``queued`` tells whether the request has to wait for an in-flight slot.
+    Entering the context waits for the slot (if needed); leaving releases it.
+    A request that gives up before entering the context must call ``close``.
+    """
+
+    def __init__(
+        self, controller: "AdmissionController", waiter: Optional[asyncio.Future]
+    ):
+        self._controller = controller
+        self._waiter = waiter
+        self._closed = False
+
+    @property
+    def queued(self) -> bool:
+        return self._waiter is not None
+
+    def close(self) -> None:
+        """Give back the slot or the place in the queue; safe to call twice."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._waiter is None:
+            self._controller._release()
+        else:
+            self._controller._abandon(self._waiter)
+
+    async def __aenter__(self) -> "Admission":
+        if self._waiter is not None:
+            try:
+                await self._waiter
+            except asyncio.CancelledError:
+                self.close()
+                raise
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+
+class AdmissionController:
+    """Bound the number of concurrent investigations and queue the rest.
+
+    Each investigation fans out into several LLM and tool calls, so running
+    too many at once only slows all of them down. Requests beyond
+    ``max_in_flight`` wait in a FIFO queue of at most ``max_queued`` entries;
+    further requests are rejected immediately.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def check_capacity(self) -> None:
+        """Raise AdmissionRejectedError if a new request could not even queue."""
+        if self.in_flight >= self.max_in_flight and self.queued >= self.max_queued:
+            raise AdmissionRejectedError(
+                f"Too many concurrent investigations ({self.in_flight} running, "
+                f"{self.queued} queued)"
+            )
+
+    def admit(self) -> Admission:
+        """Take a free slot or a place in the queue without waiting.
+
+        The decision is made synchronously, so ``Admission.queued`` reflects
+        what actually happened to this request. Raises AdmissionRejectedError
+        when the queue is full.
+        """
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            return Admission(self, None)
+
+        self.check_capacity()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        return Admission(self, waiter)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Wait for an in-flight slot and hold it for the duration of the block."""
+        async with self.admit():
+            yield
+
+    def _release(self) -> None:
+        """Hand the slot to the next queued request, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Clean up after a queued request was cancelled."""
+        if waiter.done() and not waiter.cancelled():
+            # The slot was already handed over, pass it on
+            self._release()
+        elif waiter in self._waiters:
+            self._waiters.remove(waiter)
+
+    def stats(self) -> Dict[str, int]:
+        """Return current admission counters."""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_in_flight": self.max_in_flight,
+            "max_queued": self.max_queued,
+        }
+
+
 # Global variables for agent state
 agent_graph = None
 tools: list[BaseTool] = []
+_initialize_lock = asyncio.Lock()
+
+admission_controller = AdmissionController(
+    max_in_flight=int(os.getenv("MAX_CONCURRENT_INVESTIGATIONS", "4")),
+    max_queued=int(os.getenv("MAX_QUEUED_INVESTIGATIONS", "16")),
+)
+
+AGENT_NODE_NAMES = ["kubernetes_agent", "logs_agent", "metrics_agent", "runbooks_agent"]
 
 
 async def initialize_agent():
@@ -55,31 +189,39 @@ async def initialize_agent():
     if agent_graph is not None:
         return  # Already initialized
 
-    try:
-        logger.info("Initializing SRE Agent system...")
+    async with _initialize_lock:
+        if agent_graph is not None:
+            return  # Initialized by a concurrent request
 
-        # Get provider from environment variable with bedrock as default
-        provider = os.getenv("LLM_PROVIDER", "bedrock").lower()
+        try:
+            logger.info("Initializing SRE Agent system...")
 
-        # Validate provider
-        if provider not in ["anthropic", "bedrock"]:
-            logger.warning(f"Invalid provider '{provider}', defaulting to 'bedrock'")
-            provider = "bedrock"
+            # Get provider from environment variable with bedrock as default
+            provider = os.getenv("LLM_PROVIDER", "bedrock").lower()
 
-        logger.info(f"Environment LLM_PROVIDER: {os.getenv('LLM_PROVIDER', 'NOT_SET')}")
-        logger.info(f"Using LLM provider: {provider}")
-        logger.info(f"Calling create_multi_agent_system with provider: {provider}")
+            # Validate provider
+            if provider not in ["anthropic", "bedrock"]:
+                logger.warning(
+                    f"Invalid provider '{provider}', defaulting to 'bedrock'"
+                )
+                provider = "bedrock"
 
-        # Create multi-agent system using the same function as CLI
-        agent_graph, tools = await create_multi_agent_system(provider)
+            logger.info(
+                f"Environment LLM_PROVIDER: {os.getenv('LLM_PROVIDER', 'NOT_SET')}"
+            )
+            logger.info(f"Using LLM provider: {provider}")
+            logger.info(f"Calling create_multi_agent_system with provider: {provider}")
 
-        logger.info(
-            f"SRE Agent system initialized successfully with {len(tools)} tools"
-        )
+            # Create multi-agent system using the same function as CLI
+            agent_graph, tools = await create_multi_agent_system(provider)
 
-    except Exception as e:
-        logger.error(f"Failed to initialize SRE Agent system: {e}")
-        raise
+            logger.info(
+                f"SRE Agent system initialized successfully with {len(tools)} tools"
+            )
+
+        except Exception as e:
+            logger.error(f"Failed to initialize SRE Agent system: {e}")
+            raise
 
 
 @app.on_event("startup")
@@ -88,11 +230,168 @@ async def startup_event():
     await initialize_agent()
 
 
+def _extract_prompt(request: InvocationRequest) -> str:
+    """Extract the user prompt from an invocation request."""
+    user_prompt = request.input.get("prompt", "")
+    if not user_prompt:
+        raise HTTPException(
+            status_code=400,
+            detail="No prompt found in input. Please provide a 'prompt' key in the input.",
+        )
+    return user_prompt
+
+
+def _create_initial_state(user_prompt: str) -> AgentState:
+    """Create initial state exactly like the CLI does."""
+    return {
+        "messages": [HumanMessage(content=user_prompt)],
+        "next": "supervisor",
+        "agent_results": {},
+        "current_query": user_prompt,
+        "metadata": {},
+        "requires_collaboration": False,
+        "agents_invoked": [],
+        "final_response": None,
+        "auto_approve_plan": True,  # Always auto-approve plans in runtime mode
+    }
+
+
+def _final_response_data(final_response: str) -> Dict[str, Any]:
+    """Build the response payload for a final response."""
+    if not final_response:
+        logger.warning("No final response received from agent graph")
+        final_response = (
+            "I encountered an issue processing your request. Please try again."
+        )
+    else:
+        logger.info(f"Final response length: {len(final_response)} characters")
+
+    return {
+        "message": final_response,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "model": SREConstants.app.agent_model_name,
+    }
+
+
+async def _run_investigation(
+    user_prompt: str,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Run the agent graph and yield (event type, data) pairs as nodes finish.
+
+    Event types are ``routing`` (supervisor decisions), ``agent_result``
+    (one per agent) and ``final`` (aggregated response).
+    """
+    logger.info(f"Processing query: {user_prompt}")
+    logger.info("Starting agent graph execution")
+
+    final_response = ""
+
+    async for event in agent_graph.astream(_create_initial_state(user_prompt)):
+        for node_name, node_output in event.items():
+            logger.info(f"Processing node: {node_name}")
+
+            # Log key events from each node
+            if node_name == "supervisor":
+                next_agent = node_output.get("next", "")
+                metadata = node_output.get("metadata", {})
+                logger.info(f"Supervisor routing to: {next_agent}")
+                if metadata.get("routing_reasoning"):
+                    logger.info(f"Routing reasoning: {metadata['routing_reasoning']}")
+                yield "routing", {
+                    "next": next_agent,
+                    "reasoning": metadata.get("routing_reasoning", ""),
+                    "plan": metadata.get("plan_text", ""),
+                }
+
+            elif node_name in AGENT_NODE_NAMES:
+                logger.info(f"{node_name} completed with results")
+                agent_results = node_output.get("agent_results", {})
+                agent_key = node_name.replace("_agent", "")
+                for agent_name, result in agent_results.items():
+                    if agent_key in agent_name.lower():
+                        yield "agent_result", {"agent": agent_name, "result": result}
+
+            elif node_name == "parallel_agents":
+                logger.info("Parallel agents completed with results")
+                agent_results = node_output.get("agent_results", {})
+                timings = node_output.get("metadata", {}).get("agent_timings", {})
+                for agent_name in timings:
+                    yield "agent_result", {
+                        "agent": agent_name,
+                        "result": agent_results.get(agent_name, ""),
+                        "elapsed_seconds": timings[agent_name],
+                    }
+
+            # Capture final response from aggregate node
+            elif node_name == "aggregate":
+                final_response = node_output.get("final_response", "")
+                logger.info("Aggregate node completed, final response captured")
+
+    yield "final", _final_response_data(final_response)
+
+
+def _format_sse(event_type: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event."""
+    return f"event: {event_type}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _wants_stream(request: InvocationRequest, http_request: Request) -> bool:
+    """Streaming is requested with ``Accept: text/event-stream`` or ``input.stream``.
+
+    The AgentCore runtime only forwards ``POST /invocations``, so streaming is
+    negotiated on that endpoint rather than on a separate path.
+    """
+    if "text/event-stream" in http_request.headers.get("accept", ""):
+        return True
+    return bool(request.input.get("stream", False))
+
+
+def _stream_investigation(user_prompt: str) -> StreamingResponse:
+    """Run an investigation and stream its progress as server-sent events.
+
+    Emits ``accepted`` right away, ``queued`` if the request has to wait for
+    a slot, then ``routing``, ``agent_result`` and finally ``final`` (or
+    ``error``).
+    """
+
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            admission = admission_controller.admit()
+            try:
+                yield _format_sse("accepted", admission_controller.stats())
+                if admission.queued:
+                    yield _format_sse("queued", admission_controller.stats())
+
+                async with admission:
+                    async for event_type, data in _run_investigation(user_prompt):
+                        yield _format_sse(event_type, data)
+            finally:
+                # The client may disconnect before the context is entered
+                admission.close()
+        except AdmissionRejectedError as e:
+            logger.warning(f"Rejecting streaming invocation: {e}")
+            yield _format_sse("error", {"error": str(e), "status_code": 503})
+        except Exception as e:
+            logger.error(f"Agent processing failed: {e}")
+            logger.exception("Full exception details:")
+            yield _format_sse(
+                "error", {"error": f"Agent processing failed: {str(e)}"}
+            )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.post("/invocations", response_model=InvocationResponse)
-async def invoke_agent(request: InvocationRequest):
-    """Main agent invocation endpoint."""
-    global agent_graph, tools
+async def invoke_agent(request: InvocationRequest, http_request: Request):
+    """Main agent invocation endpoint.
 
+    Returns a single JSON response, or server-sent events when the client
+    asks for a stream (see ``_wants_stream``).
+    """
     logger.info("Received invocation request")
 
     try:
@@ -100,75 +399,20 @@ async def invoke_agent(request: InvocationRequest):
         await initialize_agent()
 
         # Extract user prompt
-        user_prompt = request.input.get("prompt", "")
-        if not user_prompt:
-            raise HTTPException(
-                status_code=400,
-                detail="No prompt found in input. Please provide a 'prompt' key in the input.",
-            )
+        user_prompt = _extract_prompt(request)
 
-        logger.info(f"Processing query: {user_prompt}")
-
-        # Create initial state exactly like the CLI does
-        initial_state: AgentState = {
-            "messages": [HumanMessage(content=user_prompt)],
-            "next": "supervisor",
-            "agent_results": {},
-            "current_query": user_prompt,
-            "metadata": {},
-            "requires_collaboration": False,
-            "agents_invoked": [],
-            "final_response": None,
-            "auto_approve_plan": True,  # Always auto-approve plans in runtime mode
-        }
+        if _wants_stream(request, http_request):
+            logger.info("Streaming invocation response")
+            # Reject up front while a plain 503 can still be returned
+            admission_controller.check_capacity()
+            return _stream_investigation(user_prompt)
 
         # Process through the agent graph exactly like the CLI
-        final_response = ""
-
-        logger.info("Starting agent graph execution")
-
-        async for event in agent_graph.astream(initial_state):
-            for node_name, node_output in event.items():
-                logger.info(f"Processing node: {node_name}")
-
-                # Log key events from each node
-                if node_name == "supervisor":
-                    next_agent = node_output.get("next", "")
-                    metadata = node_output.get("metadata", {})
-                    logger.info(f"Supervisor routing to: {next_agent}")
-                    if metadata.get("routing_reasoning"):
-                        logger.info(
-                            f"Routing reasoning: {metadata['routing_reasoning']}"
-                        )
-
-                elif node_name in [
-                    "kubernetes_agent",
-                    "logs_agent",
-                    "metrics_agent",
-                    "runbooks_agent",
-                ]:
-                    agent_results = node_output.get("agent_results", {})
-                    logger.info(f"{node_name} completed with results")
-
-                # Capture final response from aggregate node
-                elif node_name == "aggregate":
-                    final_response = node_output.get("final_response", "")
-                    logger.info("Aggregate node completed, final response captured")
-
-        if not final_response:
-            logger.warning("No final response received from agent graph")
-            final_response = (
-                "I encountered an issue processing your request. Please try again."
-            )
-        else:
-            logger.info(f"Final response length: {len(final_response)} characters")
-
-        # Simple response format
-        response_data = {
-            "message": final_response,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "model": SREConstants.app.agent_model_name,
-        }
+        response_data: Dict[str, Any] = {}
+        async with admission_controller.slot():
+            async for event_type, data in _run_investigation(user_prompt):
+                if event_type == "final":
+                    response_data = data
 
         logger.info("Successfully processed agent request")
         logger.info("Returning invocation response")
@@ -176,6 +420,9 @@ async def invoke_agent(request: InvocationRequest):
 
     except HTTPException:
         raise
+    except AdmissionRejectedError as e:
+        logger.warning(f"Rejecting invocation: {e}")
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Agent processing failed: {e}")
         logger.exception("Full exception details:")
@@ -187,7 +434,7 @@ async def invoke_agent(request: InvocationRequest):
 @app.get("/ping")
 async def ping():
     """Health check endpoint."""
-    return {"status": "healthy"}
+    return {"status": "healthy", "admission": admission_controller.stats()}
 
 
 async def invoke_sre_agent_async(prompt: str, provider: str = "anthropic") -> str:
@@ -78,6 +78,13 @@ class TimeoutConfig(BaseModel):
         description="Maximum time to wait for graph execution (10 minutes)",
     )
 
+    agent_execution_timeout_seconds: int = Field(
+        default=120,
+        ge=1,
+        le=3600,
+        description="Maximum time a single agent may run before it is abandoned",
+    )
+
     mcp_tools_timeout_seconds: int = Field(
         default=30,
         ge=1,
@@ -150,9 +157,14 @@ class ApplicationConfig(BaseModel):
         description="Default directory for saving investigation reports",
     )
 
+    parallel_agent_execution: bool = Field(
+        default=False,
+        description="Run independent investigation plan steps concurrently",
+    )
+
     conversation_state_file: str = Field(
-        default=".multi_agent_conversation_state.json",
-        description="Filename for saving conversation state",
+        default=".multi_agent_conversation_journal.jsonl",
+        description="Append-only journal file for saving conversation state",
     )
 
     spinner_chars: list[str] = Field(
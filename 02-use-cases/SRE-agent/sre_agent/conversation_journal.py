@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+import base64
+import json
+import logging
+import os
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    messages_to_dict,
+)
+
+logger = logging.getLogger(__name__)
+
+# Payloads larger than this are stored zlib compressed
+COMPRESS_THRESHOLD_BYTES = 1024
+
+# Rewrite the journal once it holds at least this many records of cleared
+# conversations and they outnumber the live ones
+COMPACT_MIN_DEAD_RECORDS = 100
+
+
+def _encode_payload(payload: Any, compress: bool = False) -> Dict[str, Any]:
+    """Serialize a payload, compressing it if it is large or compress is set."""
+    data = json.dumps(payload, default=str, separators=(",", ":"))
+    if not compress and len(data) < COMPRESS_THRESHOLD_BYTES:
+        return {"encoding": "json", "data": payload}
+    compressed = zlib.compress(data.encode("utf-8"))
+    return {
+        "encoding": "zlib+base64",
+        "data": base64.b64encode(compressed).decode("ascii"),
+    }
+
+
+def _decode_payload(record: Dict[str, Any]) -> Any:
+    """Inverse of _encode_payload."""
+    if record.get("encoding") == "zlib+base64":
+        data = zlib.decompress(base64.b64decode(record["data"]))
+        return json.loads(data)
+    return record.get("data")
+
+
+def _message_to_record(message: BaseMessage) -> Optional[Dict[str, Any]]:
+    if isinstance(message, HumanMessage):
+        role = "user"
+    elif isinstance(message, AIMessage):
+        role = "assistant"
+    else:
+        return None
+    return {"type": "message", "role": role, **_encode_payload(message.content)}
+
+
+def _record_to_message(record: Dict[str, Any]) -> Optional[BaseMessage]:
+    content = _decode_payload(record) or ""
+    if record.get("role") == "user":
+        return HumanMessage(content=content)
+    if record.get("role") == "assistant":
+        return AIMessage(content=content)
+    return None
+
+
+class ConversationJournal:
+    """Append-only JSONL journal of an interactive conversation.
+
+    Each save appends only the messages added since the previous save
+    (compressed when large) and the agent traces of the latest turn (always
+    compressed), so the cost of a save does not grow with the length of the
+    session. Clearing the conversation appends a ``clear``
+    record; loading replays the journal from the last one. Records of
+    cleared conversations are dropped on load, and during a session once
+    they outnumber the live records.
+    """
+
+    def __init__(self, filename: str):
+        self.path = Path(filename)
+        self._persisted_count = 0
+        self._pending_clear = False
+        # Records in the file, and how many of them follow the last clear
+        self._total_records = 0
+        self._live_records = 0
+
+    def _append_records(self, records: List[Dict[str, Any]]) -> None:
+        timestamp = datetime.now().isoformat()
+        with open(self.path, "a") as f:
+            for record in records:
+                record["timestamp"] = timestamp
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def save(
+        self,
+        messages: List[BaseMessage],
+        traces: Optional[Dict[str, List[BaseMessage]]] = None,
+    ) -> None:
+        """Append the messages added since the previous save to the journal.
+
+        Args:
+            messages: Full conversation history; only unsaved messages are written
+            traces: Tool call trace messages of the latest turn keyed by agent
+        """
+        records: List[Dict[str, Any]] = []
+        cleared = self._pending_clear
+        if cleared:
+            records.append({"type": "clear"})
+            self._pending_clear = False
+
+        for message in messages[self._persisted_count :]:
+            record = _message_to_record(message)
+            if record is not None:
+                records.append(record)
+
+        for agent_name, trace in (traces or {}).items():
+            if trace:
+                records.append(
+                    {
+                        "type": "trace",
+                        "agent": agent_name,
+                        **_encode_payload(messages_to_dict(trace), compress=True),
+                    }
+                )
+
+        if records:
+            self._append_records(records)
+            self._total_records += len(records)
+            if cleared:
+                self._live_records = len(records) - 1
+            else:
+                self._live_records += len(records)
+        self._persisted_count = len(messages)
+        logger.debug(f"Appended {len(records)} records to {self.path}")
+
+        dead_records = self._total_records - self._live_records
+        if dead_records >= max(COMPACT_MIN_DEAD_RECORDS, self._live_records):
+            self._rewrite(self._read_records()[0])
+
+    def mark_cleared(self) -> None:
+        """Record that the conversation was cleared (written on the next save)."""
+        self._pending_clear = True
+        self._persisted_count = 0
+
+    def _read_records(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """Read records after the last clear, skipping corrupt lines.
+
+        Returns:
+            The live records and whether any clear record was found
+        """
+        records: List[Dict[str, Any]] = []
+        saw_clear = False
+        self._total_records = 0
+        with open(self.path, "r") as f:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A partially written last line from an interrupted save
+                    logger.warning(f"Skipping corrupt line {line_number} in {self.path}")
+                    continue
+                self._total_records += 1
+                if record.get("type") == "clear":
+                    records = []
+                    saw_clear = True
+                else:
+                    records.append(record)
+        self._live_records = len(records)
+        return records, saw_clear
+
+    def load(self) -> Optional[List[BaseMessage]]:
+        """Replay the journal and return the conversation messages.
+
+        Returns None if there is no journal.
+        """
+        if not self.path.exists():
+            return None
+
+        records, saw_clear = self._read_records()
+        messages = []
+        for record in records:
+            if record.get("type") == "message":
+                message = _record_to_message(record)
+                if message is not None:
+                    messages.append(message)
+
+        self._persisted_count = len(messages)
+        self._pending_clear = False
+        logger.info(f"Loaded {len(messages)} messages from {self.path}")
+
+        # Drop records of cleared conversations so replay stays short
+        if saw_clear:
+            self._rewrite(records)
+        return messages
+
+    def _rewrite(self, records: List[Dict[str, Any]]) -> None:
+        """Atomically replace the journal with the given records."""
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+        os.replace(tmp_path, self.path)
+        self._total_records = self._live_records = len(records)
+        logger.info(f"Compacted {self.path} to {len(records)} records")
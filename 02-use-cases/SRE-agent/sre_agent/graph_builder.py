@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 
 import logging
-from typing import Any, Dict, List, Literal
+from typing import Any, Dict, List, Literal, Optional
 
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import BaseTool
@@ -14,6 +14,8 @@ from .agent_nodes import (
     create_runbooks_agent,
 )
 from .agent_state import AgentState
+from .constants import SREConstants
+from .parallel_executor import ParallelAgentExecutor
 from .supervisor import SupervisorAgent
 
 # Configure logging with basicConfig
@@ -60,6 +62,13 @@ def _route_supervisor(state: AgentState) -> str:
     return agent_map.get(next_agent, "aggregate")
 
 
+def _route_supervisor_parallel(state: AgentState) -> str:
+    """Route from supervisor to the parallel executor or finish."""
+    if state.get("next", "FINISH") == "FINISH":
+        return "aggregate"
+    return "parallel_agents"
+
+
 async def _prepare_initial_state(state: AgentState) -> Dict[str, Any]:
     """Prepare the initial state with the user's query."""
     messages = state.get("messages", [])
@@ -81,19 +90,30 @@ async def _prepare_initial_state(state: AgentState) -> Dict[str, Any]:
 
 
 def build_multi_agent_graph(
-    tools: List[BaseTool], llm_provider: str = "bedrock", **llm_kwargs
+    tools: List[BaseTool],
+    llm_provider: str = "bedrock",
+    parallel_execution: Optional[bool] = None,
+    **llm_kwargs,
 ) -> StateGraph:
     """Build the multi-agent collaboration graph.
 
     Args:
         tools: List of all available tools
         llm_provider: LLM provider to use
+        parallel_execution: Run the investigation plan's agents concurrently
+            instead of returning to the supervisor after each one. Defaults to
+            SREConstants.app.parallel_agent_execution.
         **llm_kwargs: Additional arguments for LLM
 
     Returns:
         Compiled StateGraph for multi-agent collaboration
     """
-    logger.info("Building multi-agent collaboration graph")
+    if parallel_execution is None:
+        parallel_execution = SREConstants.app.parallel_agent_execution
+
+    logger.info(
+        f"Building multi-agent collaboration graph (parallel execution: {parallel_execution})"
+    )
 
     # Create the state graph
     workflow = StateGraph(AgentState)
@@ -114,10 +134,6 @@ def build_multi_agent_graph(
     # Add nodes to the graph
     workflow.add_node("prepare", _prepare_initial_state)
     workflow.add_node("supervisor", supervisor.route)
-    workflow.add_node("kubernetes_agent", kubernetes_agent)
-    workflow.add_node("logs_agent", logs_agent)
-    workflow.add_node("metrics_agent", metrics_agent)
-    workflow.add_node("runbooks_agent", runbooks_agent)
     workflow.add_node("aggregate", supervisor.aggregate_responses)
 
     # Set entry point
@@ -126,24 +142,51 @@ def build_multi_agent_graph(
     # Add edges from prepare to supervisor
     workflow.add_edge("prepare", "supervisor")
 
-    # Add conditional edges from supervisor
-    workflow.add_conditional_edges(
-        "supervisor",
-        _route_supervisor,
-        {
-            "kubernetes_agent": "kubernetes_agent",
-            "logs_agent": "logs_agent",
-            "metrics_agent": "metrics_agent",
-            "runbooks_agent": "runbooks_agent",
-            "aggregate": "aggregate",
-        },
-    )
-
-    # Add edges from agents back to supervisor
-    workflow.add_edge("kubernetes_agent", "supervisor")
-    workflow.add_edge("logs_agent", "supervisor")
-    workflow.add_edge("metrics_agent", "supervisor")
-    workflow.add_edge("runbooks_agent", "supervisor")
+    if parallel_execution:
+        # Supervisor plans once, then all plan steps fan out concurrently
+        parallel_agents = ParallelAgentExecutor(
+            {
+                "kubernetes": kubernetes_agent,
+                "logs": logs_agent,
+                "metrics": metrics_agent,
+                "runbooks": runbooks_agent,
+            }
+        )
+        workflow.add_node("parallel_agents", parallel_agents)
+
+        workflow.add_conditional_edges(
+            "supervisor",
+            _route_supervisor_parallel,
+            {
+                "parallel_agents": "parallel_agents",
+                "aggregate": "aggregate",
+            },
+        )
+        workflow.add_edge("parallel_agents", "aggregate")
+    else:
+        workflow.add_node("kubernetes_agent", kubernetes_agent)
+        workflow.add_node("logs_agent", logs_agent)
+        workflow.add_node("metrics_agent", metrics_agent)
+        workflow.add_node("runbooks_agent", runbooks_agent)
+
+        # Add conditional edges from supervisor
+        workflow.add_conditional_edges(
+            "supervisor",
+            _route_supervisor,
+            {
+                "kubernetes_agent": "kubernetes_agent",
+                "logs_agent": "logs_agent",
+                "metrics_agent": "metrics_agent",
+                "runbooks_agent": "runbooks_agent",
+                "aggregate": "aggregate",
+            },
+        )
+
+        # Add edges from agents back to supervisor
+        workflow.add_edge("kubernetes_agent", "supervisor")
+        workflow.add_edge("logs_agent", "supervisor")
+        workflow.add_edge("metrics_agent", "supervisor")
+        workflow.add_edge("runbooks_agent", "supervisor")
 
     # Add edge from aggregate to END
     workflow.add_edge("aggregate", END)
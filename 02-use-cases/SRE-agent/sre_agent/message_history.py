@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, ToolMessage
+
+logger = logging.getLogger(__name__)
+
+# Rough characters-per-token ratio used for budgeting without a tokenizer
+CHARS_PER_TOKEN = 4
+
+SUMMARY_HEADER = "Summary of earlier conversation:\n"
+# Below this many characters a summary is not worth sending
+MIN_SUMMARY_CHARS = 40
+
+
+def _message_text(message: BaseMessage) -> str:
+    """Return the text of a message, flattening content blocks."""
+    content = message.content
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        parts = []
+        for block in content:
+            if isinstance(block, str):
+                parts.append(block)
+            elif isinstance(block, dict) and block.get("type") == "text":
+                parts.append(block.get("text", ""))
+        return " ".join(parts)
+    return str(content)
+
+
+def estimate_tokens(message: BaseMessage) -> int:
+    """Estimate the number of tokens a message adds to a prompt."""
+    tokens = len(_message_text(message)) // CHARS_PER_TOKEN + 1
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        tokens += len(str(tool_call.get("args", {}))) // CHARS_PER_TOKEN + 1
+    return tokens
+
+
+def _is_tool_exchange(message: BaseMessage) -> bool:
+    """Check if a message is a tool call request or a tool result."""
+    return isinstance(message, ToolMessage) or bool(
+        getattr(message, "tool_calls", None)
+    )
+
+
+def _speaker(message: BaseMessage) -> str:
+    if isinstance(message, HumanMessage):
+        return "User"
+    return getattr(message, "name", None) or "Assistant"
+
+
+class TraceStore:
+    """Bounded in-process store for agent trace messages, keyed by message id.
+
+    Tool calls and tool results are kept here instead of in the graph state, so
+    the conversation state and its checkpoints only grow by each agent's final
+    answer. The least recently stored messages are dropped beyond max_messages.
+    """
+
+    def __init__(self, max_messages: int = 2000):
+        self.max_messages = max_messages
+        self._messages: "OrderedDict[str, BaseMessage]" = OrderedDict()
+
+    def add(self, messages: List[BaseMessage]) -> None:
+        for message in messages:
+            self._messages[message.id] = message
+            self._messages.move_to_end(message.id)
+        while len(self._messages) > self.max_messages:
+            self._messages.popitem(last=False)
+
+    def get(self, message_id: str) -> Optional[BaseMessage]:
+        return self._messages.get(message_id)
+
+    def clear(self) -> None:
+        self._messages.clear()
+
+
+trace_store = TraceStore()
+
+
+def assign_message_ids(messages: List[BaseMessage]) -> List[str]:
+    """Give every message an id (if missing) and return the ids in order."""
+    ids = []
+    for message in messages:
+        if not message.id:
+            message.id = str(uuid.uuid4())
+        ids.append(message.id)
+    return ids
+
+
+def store_trace(messages: List[BaseMessage]) -> List[str]:
+    """Keep an agent's trace messages in the trace store and return their ids."""
+    ids = assign_message_ids(messages)
+    trace_store.add(messages)
+    return ids
+
+
+def resolve_trace(trace: List[Any], messages: List[BaseMessage]) -> List[BaseMessage]:
+    """Resolve an agent trace stored as message ids.
+
+    Ids are looked up in the given message list first and then in the trace
+    store. Traces recorded before traces were stored by reference hold the
+    messages themselves and are returned unchanged.
+    """
+    if not trace or not isinstance(trace[0], str):
+        return list(trace)
+    by_id = {message.id: message for message in messages if message.id}
+    resolved = []
+    for message_id in trace:
+        message = by_id.get(message_id) or trace_store.get(message_id)
+        if message is not None:
+            resolved.append(message)
+    return resolved
+
+
+class MessageHistoryManager:
+    """Keep the conversation history sent to an agent within a token budget.
+
+    Tool calls and tool results from earlier agent runs are dropped because
+    their conclusions are already captured in the agents' final responses.
+    If the remaining history is still over budget, older messages are folded
+    into a short extractive summary and only the most recent messages are
+    kept verbatim. No extra LLM call is made.
+    """
+
+    def __init__(
+        self,
+        max_history_tokens: int = 8000,
+        keep_recent_messages: int = 6,
+        summary_chars_per_message: int = 300,
+        max_summary_chars: int = 4000,
+        drop_tool_outputs: bool = True,
+    ):
+        """Initialize the history manager.
+
+        Args:
+            max_history_tokens: Token budget for the history passed to an agent
+            keep_recent_messages: Messages always kept verbatim when compacting
+            summary_chars_per_message: Characters kept from each summarized message
+            max_summary_chars: Upper bound for the summary of older messages
+            drop_tool_outputs: Drop tool calls and results from previous agent runs
+        """
+        self.max_history_tokens = max_history_tokens
+        self.keep_recent_messages = keep_recent_messages
+        self.summary_chars_per_message = summary_chars_per_message
+        self.max_summary_chars = max_summary_chars
+        self.drop_tool_outputs = drop_tool_outputs
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "MessageHistoryManager":
+        """Create a manager from the ``message_history`` section of agent_config.yaml."""
+        return cls(
+            max_history_tokens=config.get("max_history_tokens", 8000),
+            keep_recent_messages=config.get("keep_recent_messages", 6),
+            summary_chars_per_message=config.get("summary_chars_per_message", 300),
+            max_summary_chars=config.get("max_summary_chars", 4000),
+            drop_tool_outputs=config.get("drop_tool_outputs", True),
+        )
+
+    def _summarize(
+        self, messages: List[BaseMessage], max_chars: int
+    ) -> Optional[HumanMessage]:
+        """Fold older messages into a single extractive summary message."""
+        lines = []
+        for message in messages:
+            text = " ".join(_message_text(message).split())
+            if not text:
+                continue
+            if len(text) > self.summary_chars_per_message:
+                text = text[: self.summary_chars_per_message] + "..."
+            lines.append(f"- {_speaker(message)}: {text}")
+
+        # Keep the most recent lines when the summary itself is too long
+        max_chars -= len(SUMMARY_HEADER)
+        summary_lines: List[str] = []
+        total_chars = 0
+        for line in reversed(lines):
+            total_chars += len(line) + 1
+            if total_chars > max_chars:
+                if not summary_lines and max_chars > MIN_SUMMARY_CHARS:
+                    # Cut the most recent line rather than dropping the summary
+                    summary_lines.append(line[: max_chars - 4] + "...")
+                break
+            summary_lines.append(line)
+
+        if not summary_lines:
+            return None
+
+        summary_lines.reverse()
+        return HumanMessage(content=SUMMARY_HEADER + "\n".join(summary_lines))
+
+    def compact(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Return the history to send to an agent, within the token budget.
+
+        The input list is not modified. The last message is always kept. The
+        result starts with a user message and never separates a tool call from
+        its tool results, as required by the Bedrock Converse API.
+        """
+        history = [
+            message
+            for message in messages
+            if not (self.drop_tool_outputs and _is_tool_exchange(message))
+        ]
+
+        token_counts = [estimate_tokens(message) for message in history]
+        total_tokens = sum(token_counts)
+        if total_tokens <= self.max_history_tokens:
+            return history
+
+        # Keep recent messages verbatim, dropping more of them while over
+        # budget. Tool results whose tool call is dropped go with it.
+        last = len(history) - 1
+        start = max(len(history) - self.keep_recent_messages, 0)
+        recent_tokens = sum(token_counts[start:])
+        while start < last and (
+            recent_tokens > self.max_history_tokens
+            or isinstance(history[start], ToolMessage)
+        ):
+            recent_tokens -= token_counts[start]
+            start += 1
+
+        # The summary gets whatever budget the recent messages leave
+        summary_chars = min(
+            self.max_summary_chars,
+            (self.max_history_tokens - recent_tokens - 1) * CHARS_PER_TOKEN,
+        )
+        summary = self._summarize(history[:start], summary_chars)
+
+        if summary is None:
+            # Without a summary the history has to start with a user message
+            while start < last and not isinstance(history[start], HumanMessage):
+                start += 1
+            compacted = list(history[start:])
+        else:
+            compacted = [summary] + history[start:]
+
+        logger.info(
+            f"Compacted history from {len(messages)} messages (~{total_tokens} tokens) "
+            f"to {len(compacted)} messages "
+            f"(~{sum(estimate_tokens(message) for message in compacted)} tokens)"
+        )
+        return compacted
@@ -10,7 +10,7 @@ import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 import yaml
 from dotenv import load_dotenv
@@ -19,10 +19,15 @@ from langchain_core.tools import tool
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.errors import GraphRecursionError
 
+from .agent_nodes import _load_agent_config
 from .agent_state import AgentState
 from .constants import SREConstants
+from .conversation_journal import ConversationJournal
 from .graph_builder import build_multi_agent_graph
 from .logging_config import configure_logging, should_show_debug_traces
+from .message_history import resolve_trace
+from .prompt_loader import prompt_loader
+from .tool_cache import ToolResultCache, wrap_tools_with_cache
 
 # Configure logging if not already configured (e.g., when imported by agent_runtime)
 if not logging.getLogger().handlers:
@@ -228,11 +233,70 @@ def create_mcp_client() -> MultiServerMCPClient:
     return client
 
 
+# Tool result cache shared by all agents of the current multi-agent system
+_tool_cache: Optional[ToolResultCache] = None
+
+
+def get_tool_cache_stats() -> Optional[Dict[str, Any]]:
+    """Return hit/miss statistics of the MCP tool result cache, if enabled."""
+    return _tool_cache.stats() if _tool_cache is not None else None
+
+
+def _print_parallel_agent_results(node_output: Dict[str, Any]) -> None:
+    """Print the per-agent results produced by the parallel executor node."""
+    agent_results = node_output.get("agent_results", {})
+    timings = node_output.get("metadata", {}).get("agent_timings", {})
+
+    for agent_name, elapsed in timings.items():
+        print(f"\n🔧 {agent_name} ({elapsed:.1f}s):")
+        logger.info(f"🔧 {agent_name} ({elapsed:.1f}s):")
+        result = agent_results.get(agent_name)
+        if result:
+            print("   💡 Full Response:")
+            logger.info("   💡 Full Response:")
+            print(f"      {result}")
+            logger.info(f"      {result}")
+
+
+def _collect_trace_ids(node_output: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Return the trace ids an agent node output carries, keyed by agent."""
+    traces = {}
+    for key, value in node_output.get("metadata", {}).items():
+        if key.endswith("_trace") and isinstance(value, list):
+            traces[key[: -len("_trace")]] = value
+    return traces
+
+
+def _parallel_execution_from_env() -> bool:
+    """Read the PARALLEL_AGENTS environment variable."""
+    default = "true" if SREConstants.app.parallel_agent_execution else "false"
+    return os.getenv("PARALLEL_AGENTS", default).lower() in ("true", "1", "yes")
+
+
 async def create_multi_agent_system(
-    provider: str = "bedrock", checkpointer=None, **llm_kwargs
+    provider: str = "bedrock",
+    checkpointer=None,
+    parallel_execution: Optional[bool] = None,
+    **llm_kwargs,
 ):
-    """Create multi-agent system with MCP tools."""
-    logger.info(f"Creating multi-agent system with provider: {provider}")
+    """Create multi-agent system with MCP tools.
+
+    Args:
+        provider: LLM provider to use
+        checkpointer: Unused, kept for API compatibility
+        parallel_execution: Run independent plan steps concurrently. If None,
+            the PARALLEL_AGENTS environment variable decides.
+        **llm_kwargs: Additional arguments for LLM
+    """
+    if parallel_execution is None:
+        parallel_execution = _parallel_execution_from_env()
+
+    logger.info(
+        f"Creating multi-agent system with provider: {provider}, parallel execution: {parallel_execution}"
+    )
+
+    # Load and compile all prompt templates before the first request needs them
+    prompt_loader.warm_up()
 
     # Get Anthropic API key if needed
     if provider == "anthropic" and not llm_kwargs.get("api_key"):
@@ -252,6 +316,14 @@ async def create_multi_agent_system(
 
         logger.info(f"Retrieved {len(mcp_tools)} tools from MCP")
 
+        # Serve repeated identical tool calls from a local cache
+        global _tool_cache
+        _tool_cache = ToolResultCache.from_config(
+            _load_agent_config().get("tool_cache", {})
+        )
+        if _tool_cache is not None:
+            mcp_tools = wrap_tools_with_cache(mcp_tools, _tool_cache)
+
         # Print tool information (only in debug mode)
         logger.info(f"MCP tools loaded: {len(mcp_tools)}")
         if should_show_debug_traces():
@@ -288,80 +360,21 @@ async def create_multi_agent_system(
 
     # Build the multi-agent graph
     graph = build_multi_agent_graph(
-        tools=all_tools, llm_provider=provider, **llm_kwargs
+        tools=all_tools,
+        llm_provider=provider,
+        parallel_execution=parallel_execution,
+        **llm_kwargs,
     )
 
     return graph, all_tools
 
 
-def _save_conversation_state(
-    messages: list,
-    state: Dict[str, Any],
-    filename: str = SREConstants.app.conversation_state_file,
-):
-    """Save conversation state to a file."""
-    try:
-        # Convert messages to serializable format
-        serializable_messages = []
-        for msg in messages:
-            if hasattr(msg, "model_dump"):
-                serializable_messages.append(msg.model_dump())
-            elif hasattr(msg, "dict"):
-                serializable_messages.append(msg.dict())
-            elif hasattr(msg, "content"):
-                serializable_messages.append(
-                    {"role": getattr(msg, "role", "unknown"), "content": msg.content}
-                )
-            else:
-                serializable_messages.append(str(msg))
-
-        # Convert state to serializable format
-        serializable_state = {}
-        if isinstance(state, dict):
-            # Filter out non-serializable items
-            for k, v in state.items():
-                if k == "messages":
-                    continue  # Already handled above
-                elif isinstance(v, (str, int, float, bool, list, dict, type(None))):
-                    serializable_state[k] = v
-                else:
-                    serializable_state[k] = str(v)
-
-        with open(filename, "w") as f:
-            json.dump(
-                {
-                    "messages": serializable_messages,
-                    "state": serializable_state,
-                    "timestamp": datetime.now().isoformat(),
-                },
-                f,
-                indent=2,
-            )
-        logger.debug(f"Saved conversation state to {filename}")
-    except Exception as e:
-        logger.error(f"Failed to save conversation state: {e}")
-
-
-def _load_conversation_state(
-    filename: str = SREConstants.app.conversation_state_file,
-) -> tuple[Optional[list], Optional[Dict[str, Any]]]:
-    """Load conversation state from a file."""
-    try:
-        if Path(filename).exists():
-            with open(filename, "r") as f:
-                data = json.load(f)
-                logger.info(f"Loaded conversation state from {filename}")
-                return data.get("messages", []), data.get("state", {})
-    except Exception as e:
-        logger.error(f"Failed to load conversation state: {e}")
-    return None, None
-
-
 async def _run_interactive_session(
     provider: str,
     save_state: bool = True,
     output_dir: str = "./reports",
     save_markdown: bool = True,
+    parallel_execution: Optional[bool] = None,
 ):
     """Run an interactive multi-turn conversation session."""
     # Buffer to store last query and response for /savereport command
@@ -379,6 +392,7 @@ async def _run_interactive_session(
     print("  /savereport - Save the last query's investigation report")
     print("  /history - Show conversation history")
     print("  /agents - Show available agents")
+    print("  /cache - Show tool result cache statistics")
     print("  /help - Show this help message")
     print(
         "\nNote: Investigation reports are not saved automatically in interactive mode."
@@ -387,23 +401,21 @@ async def _run_interactive_session(
     print("\n" + "=" * 80 + "\n")
 
     # Load previous conversation if exists
-    saved_messages, saved_state = None, None
+    journal = ConversationJournal(SREConstants.app.conversation_state_file)
+    saved_messages = None
     if save_state:
-        saved_messages, saved_state = _load_conversation_state()
+        saved_messages = journal.load()
+    else:
+        # Nothing was loaded, so a /save starts a new conversation in the journal
+        journal.mark_cleared()
 
     # Create multi-agent system
-    graph, all_tools = await create_multi_agent_system(provider)
+    graph, all_tools = await create_multi_agent_system(
+        provider, parallel_execution=parallel_execution
+    )
 
     # Initialize conversation state
-    messages = []
-    if saved_messages:
-        # Convert saved messages to LangChain format
-        for msg in saved_messages:
-            if isinstance(msg, dict):
-                if msg.get("role") == "user":
-                    messages.append(HumanMessage(content=msg.get("content", "")))
-                elif msg.get("role") == "assistant":
-                    messages.append(AIMessage(content=msg.get("content", "")))
+    messages = list(saved_messages or [])
 
     while True:
         try:
@@ -414,11 +426,12 @@ async def _run_interactive_session(
             if user_input.lower() in ["/exit", "/quit"]:
                 print("\n👋 Goodbye!")
                 if save_state and messages:
-                    _save_conversation_state(messages, {})
+                    journal.save(messages)
                 break
 
             elif user_input.lower() == "/clear":
                 messages = []
+                journal.mark_cleared()
                 last_query = None
                 last_response = None
                 original_query = None
@@ -426,24 +439,14 @@ async def _run_interactive_session(
                 continue
 
             elif user_input.lower() == "/save":
-                _save_conversation_state(messages, {})
+                journal.save(messages)
                 print("💾 Conversation state saved.")
                 continue
 
             elif user_input.lower() == "/load":
-                loaded_messages, loaded_state = _load_conversation_state()
+                loaded_messages = journal.load()
                 if loaded_messages is not None:
-                    messages = []
-                    for msg in loaded_messages:
-                        if isinstance(msg, dict):
-                            if msg.get("role") == "user":
-                                messages.append(
-                                    HumanMessage(content=msg.get("content", ""))
-                                )
-                            elif msg.get("role") == "assistant":
-                                messages.append(
-                                    AIMessage(content=msg.get("content", ""))
-                                )
+                    messages = loaded_messages
                     print("📂 Previous conversation loaded.")
                 else:
                     print("❌ No saved conversation found.")
@@ -483,6 +486,21 @@ async def _run_interactive_session(
                         )
                 continue
 
+            elif user_input.lower() == "/cache":
+                stats = get_tool_cache_stats()
+                if stats is None:
+                    print("ℹ️  Tool result cache is disabled.")
+                else:
+                    print("\n🗄️  Tool Result Cache:")
+                    print(
+                        f"  Entries: {stats['entries']}/{stats['max_entries']}, "
+                        f"hits: {stats['hits']}, misses: {stats['misses']}, "
+                        f"hit rate: {stats['hit_rate']:.0%}"
+                    )
+                    for tool_name, hits in sorted(stats["hits_by_tool"].items()):
+                        print(f"  - {tool_name}: {hits} hits")
+                continue
+
             elif user_input.lower() == "/agents":
                 print("\n🤝 Available Agents:")
                 print("  1. Supervisor Agent - Orchestrates and routes queries")
@@ -509,6 +527,7 @@ async def _run_interactive_session(
                 print("  /savereport - Save the last query's investigation report")
                 print("  /history - Show conversation history")
                 print("  /agents - Show available agents")
+                print("  /cache - Show tool result cache statistics")
                 print("  /help - Show this help message")
                 print("\nReport Saving:")
                 print(
@@ -554,6 +573,9 @@ async def _run_interactive_session(
                 "auto_approve_plan": False,  # Default to False for interactive mode
             }
 
+            # Trace ids of the agents that ran this turn, journaled with the turn
+            turn_traces: Dict[str, List[str]] = {}
+
             # Stream the graph execution
             try:
                 # Start initial spinner for supervisor
@@ -578,6 +600,7 @@ async def _run_interactive_session(
 
                     # Print progress updates
                     for node_name, node_output in event.items():
+                        turn_traces.update(_collect_trace_ids(node_output))
                         if node_name == "supervisor":
                             next_agent = node_output.get("next", "unknown")
                             metadata = node_output.get("metadata", {})
@@ -628,7 +651,9 @@ async def _run_interactive_session(
                             agent_messages = []
                             for key, value in metadata.items():
                                 if "_trace" in key and isinstance(value, list):
-                                    agent_messages = value
+                                    agent_messages = resolve_trace(
+                                        value, node_output.get("messages", [])
+                                    )
                                     break
 
                             # Show debug info about trace messages found (only in debug mode)
@@ -732,6 +757,9 @@ async def _run_interactive_session(
                                         print(f"      {result}")
                                         logger.info(f"      {result}")
 
+                        elif node_name == "parallel_agents":
+                            _print_parallel_agent_results(node_output)
+
                         elif node_name == "aggregate":
                             final_response = node_output.get("final_response", "")
                             if final_response:
@@ -776,7 +804,13 @@ async def _run_interactive_session(
 
             # Auto-save after each turn if enabled
             if save_state:
-                _save_conversation_state(messages, {})
+                journal.save(
+                    messages,
+                    traces={
+                        agent: resolve_trace(trace_ids, [])
+                        for agent, trace_ids in turn_traces.items()
+                    },
+                )
 
         except KeyboardInterrupt:
             print("\n\n⚠️  Interrupted. Type /exit to quit.")
@@ -827,6 +861,11 @@ async def main():
         action="store_true",
         help="Disable saving final responses to markdown files",
     )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="Run independent investigation plan steps concurrently",
+    )
 
     args = parser.parse_args()
 
@@ -848,10 +887,13 @@ async def main():
                 save_state=not args.no_save,
                 output_dir=args.output_dir,
                 save_markdown=not args.no_markdown,
+                parallel_execution=args.parallel or None,
             )
         # Single prompt mode
         else:
-            graph, all_tools = await create_multi_agent_system(args.provider)
+            graph, all_tools = await create_multi_agent_system(
+                args.provider, parallel_execution=args.parallel or None
+            )
             logger.info("Multi-agent system created successfully")
 
             # Create initial state
@@ -941,7 +983,9 @@ async def main():
                             agent_messages = []
                             for key, value in metadata.items():
                                 if "_trace" in key and isinstance(value, list):
-                                    agent_messages = value
+                                    agent_messages = resolve_trace(
+                                        value, node_output.get("messages", [])
+                                    )
                                     break
 
                             # Show debug info about trace messages found (only in debug mode)
@@ -1045,6 +1089,9 @@ async def main():
                                         print(f"      {result}")
                                         logger.info(f"      {result}")
 
+                        elif node_name == "parallel_agents":
+                            _print_parallel_agent_results(node_output)
+
                         elif node_name == "aggregate":
                             final_response = node_output.get("final_response", "")
                             if final_response:
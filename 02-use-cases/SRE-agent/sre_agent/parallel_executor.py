@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from .agent_nodes import BaseAgentNode
+from .agent_state import AgentState
+
+logger = logging.getLogger(__name__)
+
+
+def _build_waves(agents_sequence: List[str]) -> List[List[str]]:
+    """Group a plan's agent sequence into waves of independent agents.
+
+    Distinct agents do not consume each other's results, so they share a wave.
+    An agent that appears again later in the sequence is a follow-up step and
+    is placed in the wave after its previous occurrence.
+    """
+    waves: List[List[str]] = []
+    last_wave: Dict[str, int] = {}
+
+    for agent in agents_sequence:
+        wave_index = last_wave.get(agent, -1) + 1
+        if wave_index == len(waves):
+            waves.append([])
+        waves[wave_index].append(agent)
+        last_wave[agent] = wave_index
+
+    return waves
+
+
+class ParallelAgentExecutor:
+    """Graph node that runs the agents of an investigation plan concurrently.
+
+    Wall-clock time for a wave is that of its slowest agent instead of the sum
+    of all agent latencies. Each agent node applies its own execution timeout,
+    so one stuck agent does not hold up the results of the others.
+    """
+
+    def __init__(self, agent_nodes: Dict[str, BaseAgentNode]):
+        """Initialize the executor.
+
+        Args:
+            agent_nodes: Mapping of plan agent names (kubernetes, logs, ...) to nodes
+        """
+        self.agent_nodes = agent_nodes
+
+    async def _run_agent(
+        self, agent_key: str, state: AgentState
+    ) -> tuple[str, Dict[str, Any], float]:
+        """Run one agent, never raising."""
+        node = self.agent_nodes[agent_key]
+        start = time.perf_counter()
+
+        try:
+            # BaseAgentNode enforces the agent execution timeout itself
+            output = await node(state)
+        except Exception as e:
+            logger.error(f"{node.name} - Parallel execution failed: {e}")
+            output = {"agent_results": {node.name: f"Error: {str(e)}"}}
+
+        return agent_key, output, time.perf_counter() - start
+
+    async def __call__(self, state: AgentState) -> Dict[str, Any]:
+        """Execute the remaining plan steps wave by wave and merge the results."""
+        metadata = state.get("metadata", {})
+        plan = metadata.get("investigation_plan", {})
+        plan_step = metadata.get("plan_step", 0)
+
+        remaining = [
+            agent
+            for agent in plan.get("agents_sequence", [])[plan_step:]
+            if agent in self.agent_nodes
+        ]
+        if not remaining and state.get("next") in self.agent_nodes:
+            remaining = [state["next"]]
+
+        agent_results = dict(state.get("agent_results", {}))
+        agents_invoked = list(state.get("agents_invoked", []))
+        merged_metadata = dict(metadata)
+        base_messages = list(state.get("messages", []))
+        new_messages: List[Any] = []
+        timings: Dict[str, float] = {}
+
+        for wave in _build_waves(remaining):
+            logger.info(f"Running agents in parallel: {', '.join(wave)}")
+
+            # Every agent in a wave sees the same state snapshot
+            wave_state: AgentState = {
+                **state,
+                "agent_results": dict(agent_results),
+                "agents_invoked": list(agents_invoked),
+                "messages": base_messages + new_messages,
+                "metadata": dict(merged_metadata),
+            }
+            wave_input_length = len(wave_state["messages"])
+
+            outputs = await asyncio.gather(
+                *(self._run_agent(agent, wave_state) for agent in wave)
+            )
+
+            # Merge in plan order so the result is deterministic
+            for agent_key, output, elapsed in outputs:
+                node_name = self.agent_nodes[agent_key].name
+                timings[node_name] = round(elapsed, 3)
+
+                if node_name in output.get("agent_results", {}):
+                    agent_results[node_name] = output["agent_results"][node_name]
+                agents_invoked.append(node_name)
+
+                trace_key = f"{node_name.replace(' ', '_')}_trace"
+                trace = output.get("metadata", {}).get(trace_key)
+                if trace is not None:
+                    merged_metadata[trace_key] = trace
+
+                # Agents return input messages plus their own; keep only theirs
+                new_messages.extend(output.get("messages", [])[wave_input_length:])
+
+        logger.info(f"Parallel execution finished, agent timings: {timings}")
+
+        plan_length = len(plan.get("agents_sequence", []))
+        merged_metadata.update(
+            {
+                "plan_step": max(plan_length, plan_step),
+                "parallel_execution": True,
+                "agent_timings": timings,
+                "routing_reasoning": "Investigation plan completed in parallel. Presenting results.",
+            }
+        )
+
+        return {
+            "agent_results": agent_results,
+            "agents_invoked": agents_invoked,
+            "messages": new_messages,
+            "metadata": merged_metadata,
+            "next": "FINISH",
+        }
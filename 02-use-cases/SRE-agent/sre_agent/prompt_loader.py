@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
 import logging
-from functools import lru_cache
+import os
+import string
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # Configure logging with basicConfig
 logging.basicConfig(
@@ -14,6 +17,60 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# How often (in seconds) a cached prompt file is re-stat'ed for changes
+PROMPT_RELOAD_CHECK_INTERVAL_SECONDS = 1.0
+
+
+class _CompiledTemplate:
+    """Prompt template parsed once into literal text and field references."""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.parts: List[Tuple[str, Optional[str], str, Optional[str]]] = list(
+            string.Formatter().parse(content)
+        )
+        self.fields = {field for _, field, _, _ in self.parts if field is not None}
+
+        # Attribute/index access, positional or nested fields fall back to str.format
+        self.simple = all(
+            field.isidentifier() and "{" not in (spec or "")
+            for _, field, spec, _ in self.parts
+            if field is not None
+        )
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """Substitute values, raising KeyError for a missing variable."""
+        if not self.fields:
+            # Still unescape doubled braces like str.format would
+            return "".join(literal for literal, _, _, _ in self.parts)
+        if not self.simple:
+            return self.content.format(**values)
+
+        chunks = []
+        for literal, field, spec, conversion in self.parts:
+            chunks.append(literal)
+            if field is None:
+                continue
+            value = values[field]
+            if conversion == "r":
+                value = repr(value)
+            elif conversion == "s":
+                value = str(value)
+            elif conversion == "a":
+                value = ascii(value)
+            chunks.append(format(value, spec) if spec else str(value))
+        return "".join(chunks)
+
+
+class _CachedPrompt:
+    """A loaded prompt file with the signature it was loaded with."""
+
+    def __init__(self, signature: tuple, content: str):
+        self.signature = signature
+        self.content = content
+        self.template = _CompiledTemplate(content)
+        self.last_check = time.monotonic()
+
 
 class PromptLoader:
     """Utility class for loading and managing prompt templates."""
@@ -30,11 +87,69 @@ class PromptLoader:
             # Default to config/prompts relative to this file
             self.prompts_dir = Path(__file__).parent / "config" / "prompts"
 
+        self._lock = threading.Lock()
+        self._cache: Dict[str, _CachedPrompt] = {}
+        self._agent_prompts: Dict[Tuple[str, str, str], Tuple[tuple, str]] = {}
+
+        # Timing counters reported by stats()
+        self._hits = 0
+        self._loads = 0
+        self._load_seconds = 0.0
+        self._renders: Dict[str, int] = {}
+        self._render_seconds: Dict[str, float] = {}
+
         logger.debug(f"PromptLoader initialized with prompts_dir: {self.prompts_dir}")
 
-    @lru_cache(maxsize=32)
+    def _get_cached_prompt(self, filename: str) -> _CachedPrompt:
+        """Return the cached prompt, reloading it if the file has changed.
+
+        Raises:
+            FileNotFoundError: If the prompt file doesn't exist
+            IOError: If there's an error reading the file
+        """
+        cached = self._cache.get(filename)
+        now = time.monotonic()
+        if (
+            cached is not None
+            and now - cached.last_check < PROMPT_RELOAD_CHECK_INTERVAL_SECONDS
+        ):
+            self._hits += 1
+            return cached
+
+        filepath = self.prompts_dir / filename
+
+        with self._lock:
+            try:
+                stat = os.stat(filepath)
+            except FileNotFoundError:
+                self._cache.pop(filename, None)
+                raise FileNotFoundError(f"Prompt file not found: {filepath}")
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            cached = self._cache.get(filename)
+            if cached is not None and cached.signature == signature:
+                cached.last_check = now
+                self._hits += 1
+                return cached
+
+            start = time.perf_counter()
+            try:
+                with open(filepath, "r", encoding="utf-8") as f:
+                    content = f.read().strip()
+            except Exception as e:
+                logger.error(f"Error loading prompt file {filename}: {e}")
+                raise IOError(f"Failed to read prompt file {filename}: {e}")
+
+            cached = _CachedPrompt(signature, content)
+            self._cache[filename] = cached
+            self._loads += 1
+            self._load_seconds += time.perf_counter() - start
+
+            logger.debug(f"Loaded prompt file: {filename}")
+            return cached
+
     def _load_prompt_file(self, filename: str) -> str:
-        """Load a prompt file with caching.
+        """Load a prompt file through the cache.
 
         Args:
             filename: Name of the prompt file to load
@@ -46,20 +161,13 @@ class PromptLoader:
             FileNotFoundError: If the prompt file doesn't exist
             IOError: If there's an error reading the file
         """
-        filepath = self.prompts_dir / filename
-
-        if not filepath.exists():
-            raise FileNotFoundError(f"Prompt file not found: {filepath}")
+        return self._get_cached_prompt(filename).content
 
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                content = f.read().strip()
-
-            logger.debug(f"Loaded prompt file: {filename}")
-            return content
-        except Exception as e:
-            logger.error(f"Error loading prompt file {filename}: {e}")
-            raise IOError(f"Failed to read prompt file {filename}: {e}")
+    def _record_render(self, template_name: str, start: float) -> None:
+        self._renders[template_name] = self._renders.get(template_name, 0) + 1
+        self._render_seconds[template_name] = self._render_seconds.get(
+            template_name, 0.0
+        ) + (time.perf_counter() - start)
 
     def load_prompt(self, prompt_name: str) -> str:
         """Load a prompt by name.
@@ -83,10 +191,13 @@ class PromptLoader:
         Returns:
             Template content with variables substituted
         """
-        template_content = self.load_prompt(template_name)
+        template = self._get_cached_prompt(f"{template_name}.txt").template
 
+        start = time.perf_counter()
         try:
-            return template_content.format(**kwargs)
+            rendered = template.render(kwargs)
+            self._record_render(template_name, start)
+            return rendered
         except KeyError as e:
             logger.error(f"Missing template variable {e} in template {template_name}")
             raise ValueError(f"Missing required template variable: {e}")
@@ -107,6 +218,24 @@ class PromptLoader:
         Returns:
             Complete system prompt for the agent
         """
+        # Reuse the combined prompt while neither source file has changed
+        cache_key = (agent_type, agent_name, agent_description)
+        try:
+            base_signature = self._get_cached_prompt("agent_base_prompt.txt").signature
+        except FileNotFoundError:
+            base_signature = None
+        try:
+            specific_signature = self._get_cached_prompt(
+                f"{agent_type}_agent_prompt.txt"
+            ).signature
+        except FileNotFoundError:
+            specific_signature = None
+        signatures = (base_signature, specific_signature)
+
+        cached = self._agent_prompts.get(cache_key)
+        if cached is not None and cached[0] == signatures:
+            return cached[1]
+
         try:
             # Load base prompt template
             base_prompt = self.load_template(
@@ -123,6 +252,7 @@ class PromptLoader:
                 logger.warning(f"No specific prompt found for agent type: {agent_type}")
                 combined_prompt = base_prompt
 
+            self._agent_prompts[cache_key] = (signatures, combined_prompt)
             return combined_prompt
 
         except Exception as e:
@@ -214,6 +344,44 @@ class PromptLoader:
             logger.error(f"Error listing prompt files: {e}")
             return []
 
+    def warm_up(self) -> int:
+        """Load and compile every prompt file so the first requests skip disk I/O.
+
+        Returns:
+            Number of prompt files loaded
+        """
+        loaded = 0
+        for prompt_name in self.list_available_prompts():
+            try:
+                self._get_cached_prompt(f"{prompt_name}.txt")
+                loaded += 1
+            except (FileNotFoundError, IOError) as e:
+                logger.warning(f"Could not preload prompt {prompt_name}: {e}")
+        logger.info(f"Preloaded {loaded} prompt templates from {self.prompts_dir}")
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters and load/render timings.
+
+        Returns:
+            Dictionary with cache hits, disk loads and per-template render timings
+        """
+        renders = {
+            name: {
+                "count": count,
+                "avg_ms": round(self._render_seconds[name] * 1000 / count, 3),
+            }
+            for name, count in self._renders.items()
+        }
+        return {
+            "cached_files": len(self._cache),
+            "cache_hits": self._hits,
+            "loads": self._loads,
+            "load_ms": round(self._load_seconds * 1000, 3),
+            "cached_agent_prompts": len(self._agent_prompts),
+            "renders": renders,
+        }
+
 
 # Convenience instance for easy import
 prompt_loader = PromptLoader()
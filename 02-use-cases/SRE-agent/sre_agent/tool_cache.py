@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+logger = logging.getLogger(__name__)
+
+
+def _base_tool_name(tool_name: str) -> str:
+    """Strip the gateway target prefix from a tool name."""
+    return tool_name.split("___")[-1] if "___" in tool_name else tool_name
+
+
+def _canonicalize_args(arguments: Dict[str, Any]) -> str:
+    """Serialize tool arguments so equivalent calls produce the same key.
+
+    Arguments explicitly set to None are dropped because they are equivalent
+    to leaving the optional parameter out.
+    """
+    cleaned = {k: v for k, v in arguments.items() if v is not None}
+    return json.dumps(cleaned, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class ToolResultCache:
+    """LRU cache with per-tool TTLs for MCP tool results.
+
+    Identical calls (same tool, same canonicalized arguments) made within the
+    TTL are answered from memory instead of going back through the gateway.
+    Concurrent identical calls share a single in-flight request.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        default_ttl_seconds: float = 60.0,
+        tool_ttl_seconds: Optional[Dict[str, float]] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached results (least recently used evicted)
+            default_ttl_seconds: TTL for tools without a specific TTL
+            tool_ttl_seconds: Per-tool TTL overrides keyed by base tool name.
+                A TTL of 0 disables caching for that tool.
+        """
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self.tool_ttl_seconds = dict(tool_ttl_seconds or {})
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = (
+            OrderedDict()
+        )
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hits_by_tool: Dict[str, int] = {}
+        self.misses_by_tool: Dict[str, int] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ToolResultCache"]:
+        """Create a cache from the ``tool_cache`` section of agent_config.yaml.
+
+        Returns None if caching is disabled.
+        """
+        if not config.get("enabled", True):
+            return None
+        return cls(
+            max_entries=config.get("max_entries", 256),
+            default_ttl_seconds=config.get("default_ttl_seconds", 60.0),
+            tool_ttl_seconds=config.get("tool_ttl_seconds", {}),
+        )
+
+    def ttl_for(self, tool_name: str) -> float:
+        """Return the TTL in seconds for a tool."""
+        return self.tool_ttl_seconds.get(
+            _base_tool_name(tool_name), self.default_ttl_seconds
+        )
+
+    def _record(self, counters: Dict[str, int], tool_name: str) -> None:
+        base_name = _base_tool_name(tool_name)
+        counters[base_name] = counters.get(base_name, 0) + 1
+
+    def _get(self, key: Tuple[str, str]) -> Tuple[bool, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _put(self, key: Tuple[str, str], value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def call(self, tool_name: str, arguments: Dict[str, Any], coroutine) -> Any:
+        """Return a cached result or await ``coroutine(**arguments)`` and cache it.
+
+        Exceptions are propagated and never cached.
+        """
+        ttl = self.ttl_for(tool_name)
+        if ttl <= 0:
+            return await coroutine(**arguments)
+
+        key = (tool_name, _canonicalize_args(arguments))
+
+        found, value = self._get(key)
+        if found:
+            self.hits += 1
+            self._record(self.hits_by_tool, tool_name)
+            logger.info(f"Tool cache hit: {tool_name}")
+            return value
+
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None:
+            self.hits += 1
+            self._record(self.hits_by_tool, tool_name)
+            logger.info(f"Tool cache hit (in flight): {tool_name}")
+            return await asyncio.shield(in_flight)
+
+        self.misses += 1
+        self._record(self.misses_by_tool, tool_name)
+
+        # The fetch runs as its own task so that cancelling the caller that started
+        # it (e.g. an agent hitting its timeout) does not cancel it for the waiters
+        task = asyncio.ensure_future(self._fetch(key, ttl, arguments, coroutine))
+        self._in_flight[key] = task
+        task.add_done_callback(self._finish_fetch)
+        return await asyncio.shield(task)
+
+    async def _fetch(
+        self, key: Tuple[str, str], ttl: float, arguments: Dict[str, Any], coroutine
+    ) -> Any:
+        try:
+            value = await coroutine(**arguments)
+        finally:
+            self._in_flight.pop(key, None)
+        self._put(key, value, ttl)
+        return value
+
+    @staticmethod
+    def _finish_fetch(task: asyncio.Future) -> None:
+        # Mark the outcome retrieved so a failure nobody awaited is not logged
+        if not task.cancelled():
+            task.exception()
+
+    def clear(self) -> None:
+        """Drop all cached results (counters are kept)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            "hits_by_tool": dict(self.hits_by_tool),
+            "misses_by_tool": dict(self.misses_by_tool),
+        }
+
+
+def wrap_tools_with_cache(
+    tools: List[BaseTool], cache: ToolResultCache
+) -> List[BaseTool]:
+    """Wrap async tools so their results are served through ``cache``.
+
+    Tools without a coroutine (local sync tools such as get_current_time) are
+    returned unchanged.
+    """
+    wrapped_tools: List[BaseTool] = []
+    cached_count = 0
+
+    for tool in tools:
+        coroutine = getattr(tool, "coroutine", None)
+        if not isinstance(tool, StructuredTool) or coroutine is None:
+            wrapped_tools.append(tool)
+            continue
+
+        def _make_cached_call(tool_name: str, original):
+            async def _cached_call(**arguments: Any) -> Any:
+                return await cache.call(tool_name, arguments, original)
+
+            return _cached_call
+
+        wrapped_tools.append(
+            StructuredTool(
+                name=tool.name,
+                description=tool.description,
+                args_schema=tool.args_schema,
+                coroutine=_make_cached_call(tool.name, coroutine),
+                response_format=tool.response_format,
+                metadata=tool.metadata,
+            )
+        )
+        cached_count += 1
+
+    logger.info(f"Tool result cache enabled for {cached_count} tools")
+    return wrapped_tools
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""In-process stand-ins for the four demo backend servers.
+
+Each tool mirrors an operation of the backend OpenAPI specs and answers from
+the same fake data files the servers use, without HTTP, the gateway or API
+key retrieval.
+"""
+
+import asyncio
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+from .fake_llm import BenchmarkRecorder
+
+DATA_PATH = Path(__file__).parent.parent.parent / "backend" / "data"
+
+# Maximum number of records returned per tool call
+MAX_RECORDS = 20
+
+# (gateway target, operation) -> data file relative to DATA_PATH
+TOOL_DATA_FILES: Dict[tuple, str] = {
+    ("k8s-api", "get_pod_status"): "k8s_data/pods.json",
+    ("k8s-api", "get_deployment_status"): "k8s_data/deployments.json",
+    ("k8s-api", "get_cluster_events"): "k8s_data/events.json",
+    ("k8s-api", "get_resource_usage"): "k8s_data/resource_usage.json",
+    ("k8s-api", "get_node_status"): "k8s_data/nodes.json",
+    ("logs-api", "search_logs"): "logs_data/log_patterns.json",
+    ("logs-api", "get_error_logs"): "logs_data/log_patterns.json",
+    ("logs-api", "analyze_log_patterns"): "logs_data/log_patterns.json",
+    ("logs-api", "get_recent_logs"): "logs_data/log_counts.json",
+    ("logs-api", "count_log_events"): "logs_data/log_counts.json",
+    ("metrics-api", "get_performance_metrics"): "metrics_data/response_times.json",
+    ("metrics-api", "get_error_rates"): "metrics_data/error_rates.json",
+    ("metrics-api", "get_resource_metrics"): "metrics_data/resource_usage.json",
+    ("metrics-api", "get_availability_metrics"): "metrics_data/availability.json",
+    ("metrics-api", "analyze_trends"): "metrics_data/trends.json",
+    ("runbooks-api", "search_runbooks"): "runbooks_data/incident_playbooks.json",
+    ("runbooks-api", "get_incident_playbook"): "runbooks_data/incident_playbooks.json",
+    ("runbooks-api", "get_troubleshooting_guide"): "runbooks_data/troubleshooting_guides.json",
+    ("runbooks-api", "get_escalation_procedures"): "runbooks_data/escalation_procedures.json",
+    ("runbooks-api", "get_common_resolutions"): "runbooks_data/common_resolutions.json",
+}
+
+
+@lru_cache(maxsize=None)
+def _load_response(relative_path: str) -> str:
+    """Load a data file once and serialize a bounded response from it."""
+    with open(DATA_PATH / relative_path, "r") as f:
+        data = json.load(f)
+
+    response = {}
+    for key, value in data.items():
+        response[key] = value[:MAX_RECORDS] if isinstance(value, list) else value
+    return json.dumps(response)
+
+
+def create_standin_tools(
+    recorder: BenchmarkRecorder, latency_seconds: float = 0.0
+) -> List[BaseTool]:
+    """Create tools named like the gateway's MCP tools (``target___operation``).
+
+    Args:
+        recorder: Receives one tool call count per invocation
+        latency_seconds: Simulated backend round trip per call
+    """
+    tools: List[BaseTool] = []
+
+    for (target, operation), relative_path in TOOL_DATA_FILES.items():
+        tool_name = f"{target}___{operation}"
+
+        def _make_call(name: str, path: str):
+            async def _call(
+                namespace: Optional[str] = None,
+                service: Optional[str] = None,
+                query: Optional[str] = None,
+            ) -> str:
+                recorder.record_tool_call(name)
+                if latency_seconds:
+                    await asyncio.sleep(latency_seconds)
+                return _load_response(path)
+
+            return _call
+
+        tools.append(
+            StructuredTool.from_function(
+                coroutine=_make_call(tool_name, relative_path),
+                name=tool_name,
+                description=f"Benchmark stand-in for {operation}",
+            )
+        )
+
+    return tools
+
+
+def preload_data() -> Dict[str, Any]:
+    """Load every data file up front so the first calls do not pay disk I/O."""
+    return {path: len(_load_response(path)) for path in set(TOOL_DATA_FILES.values())}
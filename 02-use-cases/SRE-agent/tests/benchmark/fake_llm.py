@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""Deterministic chat model used in place of Bedrock/Anthropic for benchmarks."""
+
+import asyncio
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+CHARS_PER_TOKEN = 4
+
+# Plan agents picked from keywords in the query, in this order
+_AGENT_KEYWORDS = {
+    "kubernetes": re.compile(r"pod|crash|deploy|node|cluster|database", re.I),
+    "logs": re.compile(r"log|error|auth|exception", re.I),
+    "metrics": re.compile(r"latency|performance|response|resource|metric|scale", re.I),
+    "runbooks": re.compile(r"runbook|procedure|playbook|health|production", re.I),
+}
+
+
+def _text(message: BaseMessage) -> str:
+    return message.content if isinstance(message.content, str) else str(message.content)
+
+
+class BenchmarkRecorder:
+    """Thread-safe counters for LLM and tool usage during a benchmark run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.tool_calls: Counter = Counter()
+
+    def record_llm_call(self, input_tokens: int, output_tokens: int) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+
+    def record_tool_call(self, tool_name: str) -> None:
+        with self._lock:
+            self.tool_calls[tool_name] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "llm_calls": self.llm_calls,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "tool_calls": sum(self.tool_calls.values()),
+                "tool_calls_by_tool": dict(self.tool_calls),
+            }
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers instantly (or after a fixed delay) without a network call.
+
+    With tools bound it behaves like a ReAct agent: the first call requests
+    ``tool_calls_per_step`` tools, the call after the tool results returns a
+    final answer. ``with_structured_output`` builds an investigation plan from
+    keywords in the query.
+    """
+
+    latency_seconds: float = 0.0
+    response_tokens: int = 200
+    tool_calls_per_step: int = 2
+    recorder: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-sre-benchmark"
+
+    def bind_tools(self, tools: List[Any], **kwargs: Any):
+        tool_names = [getattr(tool, "name", str(tool)) for tool in tools]
+        return self.bind(tool_names=tool_names, **kwargs)
+
+    def _respond(
+        self, messages: List[BaseMessage], tool_names: Optional[List[str]] = None
+    ) -> AIMessage:
+        input_tokens = sum(len(_text(m)) for m in messages) // CHARS_PER_TOKEN
+
+        # Messages produced since the agent's task was handed over
+        last_human = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=-1,
+        )
+        tool_results = [
+            m for m in messages[last_human + 1 :] if isinstance(m, ToolMessage)
+        ]
+
+        if tool_names and not tool_results:
+            calls = [
+                {"name": name, "args": {}, "id": f"call_{index}_{name}"}
+                for index, name in enumerate(tool_names[: self.tool_calls_per_step])
+            ]
+            message = AIMessage(content="", tool_calls=calls)
+            output_tokens = 20 * len(calls)
+        else:
+            findings = ", ".join(m.name or "tool" for m in tool_results) or "context"
+            content = f"Findings based on {findings}. " + "detail " * self.response_tokens
+            message = AIMessage(content=content.strip())
+            output_tokens = self.response_tokens
+
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        if self.recorder is not None:
+            self.recorder.record_llm_call(input_tokens, output_tokens)
+        return message
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency_seconds:
+            # Blocks like the real synchronous clients do
+            time.sleep(self.latency_seconds)
+        message = self._respond(messages, kwargs.get("tool_names"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        message = self._respond(messages, kwargs.get("tool_names"))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def with_structured_output(self, schema: Any, **kwargs: Any):
+        def _build(messages: List[BaseMessage]) -> Any:
+            query = next(
+                (_text(m) for m in reversed(messages) if isinstance(m, HumanMessage)),
+                "",
+            )
+            agents = [
+                agent
+                for agent, pattern in _AGENT_KEYWORDS.items()
+                if pattern.search(query)
+            ] or ["kubernetes", "logs"]
+            if self.recorder is not None:
+                self.recorder.record_llm_call(len(query) // CHARS_PER_TOKEN, 50)
+            return schema(
+                steps=[f"Investigate with {agent} agent" for agent in agents],
+                agents_sequence=agents,
+                complexity="simple",
+                auto_execute=True,
+                reasoning="Deterministic benchmark plan",
+            )
+
+        async def _abuild(messages: List[BaseMessage]) -> Any:
+            if self.latency_seconds:
+                await asyncio.sleep(self.latency_seconds)
+            return _build(messages)
+
+        return RunnableLambda(_build, afunc=_abuild)
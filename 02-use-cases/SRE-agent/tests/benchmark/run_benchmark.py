@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""Load test for the SRE multi-agent graph with a fake LLM and in-process backends.
+
+Drives N concurrent investigations through ``build_multi_agent_graph`` and
+reports per-node latency percentiles, LLM tokens, tool calls and memory. With
+the default zero latencies the numbers measure orchestration overhead only.
+
+Usage (from the SRE-agent directory):
+    uv run python -m tests.benchmark.run_benchmark --investigations 50 --concurrency 10
+    uv run python -m tests.benchmark.run_benchmark --output baseline.json
+    uv run python -m tests.benchmark.run_benchmark --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import ExitStack
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+from langchain_core.messages import HumanMessage
+
+from sre_agent import agent_nodes
+from sre_agent.graph_builder import build_multi_agent_graph
+from sre_agent.output_formatter import SREOutputFormatter
+from sre_agent.supervisor import SupervisorAgent
+from sre_agent.tool_cache import ToolResultCache, wrap_tools_with_cache
+
+from .backend_standins import create_standin_tools, preload_data
+from .fake_llm import BenchmarkRecorder, FakeChatModel
+
+logger = logging.getLogger(__name__)
+
+# Same prompts as scripts/run_readme_prompts.sh
+PROMPTS = [
+    "What's the status of the database pods?",
+    "Why are the payment-service pods crash looping?",
+    "Investigate high latency in the API gateway over the last hour",
+    "Find all database connection errors in the last 24 hours",
+    "How is the product catalog service performing?",
+    "Our database pods are crash looping in production",
+    "API response times have degraded 3x in the last hour",
+    "Perform a comprehensive health check of all production services",
+    "Analyze resource utilization trends and predict when we'll need to scale",
+    "Check for any suspicious patterns in authentication logs",
+]
+
+
+def _percentile(values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(int(round(percentile / 100 * len(ordered))) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def _summarize(values: List[float]) -> Dict[str, float]:
+    """Latency summary in milliseconds."""
+    return {
+        "count": len(values),
+        "p50_ms": round(_percentile(values, 50) * 1000, 3),
+        "p95_ms": round(_percentile(values, 95) * 1000, 3),
+        "p99_ms": round(_percentile(values, 99) * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3) if values else 0.0,
+    }
+
+
+async def _run_investigation(
+    graph, prompt: str, node_timings: Dict[str, List[float]]
+) -> float:
+    """Run one investigation and record how long each node took."""
+    initial_state = {
+        "messages": [HumanMessage(content=prompt)],
+        "next": "supervisor",
+        "agent_results": {},
+        "current_query": prompt,
+        "metadata": {},
+        "requires_collaboration": False,
+        "agents_invoked": [],
+        "final_response": None,
+        "auto_approve_plan": True,
+    }
+
+    start = time.perf_counter()
+    last_event = start
+    async for event in graph.astream(initial_state):
+        now = time.perf_counter()
+        for node_name in event:
+            node_timings.setdefault(node_name, []).append(now - last_event)
+        last_event = now
+    return time.perf_counter() - start
+
+
+async def run_benchmark(
+    investigations: int,
+    concurrency: int,
+    llm_latency: float = 0.0,
+    tool_latency: float = 0.0,
+    parallel_execution: bool = False,
+    tool_cache: bool = False,
+    trace_memory: bool = False,
+) -> Dict[str, Any]:
+    """Build the graph against fakes and run the investigations.
+
+    Returns:
+        Benchmark report as a JSON-serializable dictionary
+    """
+    recorder = BenchmarkRecorder()
+    llm = FakeChatModel(latency_seconds=llm_latency, recorder=recorder)
+    tools = create_standin_tools(recorder, latency_seconds=tool_latency)
+    preload_data()
+
+    cache = None
+    if tool_cache:
+        cache = ToolResultCache()
+        tools = wrap_tools_with_cache(tools, cache)
+
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch.object(agent_nodes, "_create_llm", lambda *args, **kwargs: llm)
+        )
+        stack.enter_context(
+            patch.object(SupervisorAgent, "_create_llm", lambda self, **kwargs: llm)
+        )
+        stack.enter_context(
+            patch.object(SREOutputFormatter, "_create_llm", lambda self, **kwargs: llm)
+        )
+
+        build_start = time.perf_counter()
+        graph = build_multi_agent_graph(tools, parallel_execution=parallel_execution)
+        build_seconds = time.perf_counter() - build_start
+
+        if trace_memory:
+            tracemalloc.start()
+
+        node_timings: Dict[str, List[float]] = {}
+        durations: List[float] = []
+        failures = 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _worker(index: int) -> None:
+            nonlocal failures
+            async with semaphore:
+                try:
+                    durations.append(
+                        await _run_investigation(
+                            graph, PROMPTS[index % len(PROMPTS)], node_timings
+                        )
+                    )
+                except Exception as e:
+                    failures += 1
+                    logger.error(f"Investigation {index} failed: {e}")
+
+        run_start = time.perf_counter()
+        await asyncio.gather(*(_worker(i) for i in range(investigations)))
+        wall_seconds = time.perf_counter() - run_start
+
+        peak_traced_mb = None
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peak_traced_mb = round(peak / (1024 * 1024), 2)
+
+    usage = recorder.snapshot()
+    completed = len(durations)
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+
+    return {
+        "config": {
+            "investigations": investigations,
+            "concurrency": concurrency,
+            "llm_latency_seconds": llm_latency,
+            "tool_latency_seconds": tool_latency,
+            "parallel_execution": parallel_execution,
+            "tool_cache": tool_cache,
+        },
+        "graph_build_ms": round(build_seconds * 1000, 3),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_per_second": round(completed / wall_seconds, 3)
+        if wall_seconds
+        else 0.0,
+        "completed": completed,
+        "failures": failures,
+        "end_to_end": _summarize(durations),
+        "nodes": {name: _summarize(values) for name, values in node_timings.items()},
+        "llm_calls": usage["llm_calls"],
+        "input_tokens": usage["input_tokens"],
+        "output_tokens": usage["output_tokens"],
+        "input_tokens_per_investigation": round(
+            usage["input_tokens"] / completed, 1
+        )
+        if completed
+        else 0.0,
+        "tool_calls": usage["tool_calls"],
+        "tool_calls_by_tool": usage["tool_calls_by_tool"],
+        "tool_cache": cache.stats() if cache else None,
+        "max_rss_mb": round(max_rss_mb, 2),
+        "peak_traced_mb": peak_traced_mb,
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    config = report["config"]
+    print("\n📊 SRE Multi-Agent Graph Benchmark")
+    print(
+        f"   {config['investigations']} investigations, concurrency {config['concurrency']}, "
+        f"parallel agents: {config['parallel_execution']}, tool cache: {config['tool_cache']}"
+    )
+    print(
+        f"   Completed: {report['completed']}, failures: {report['failures']}, "
+        f"wall: {report['wall_seconds']}s, throughput: {report['throughput_per_second']}/s"
+    )
+    print(f"   Graph build: {report['graph_build_ms']}ms")
+
+    print(f"\n   {'node':<20}{'count':>8}{'p50 ms':>12}{'p95 ms':>12}{'p99 ms':>12}")
+    rows = dict(report["nodes"])
+    rows["end_to_end"] = report["end_to_end"]
+    for name, stats in rows.items():
+        print(
+            f"   {name:<20}{stats['count']:>8}{stats['p50_ms']:>12}"
+            f"{stats['p95_ms']:>12}{stats['p99_ms']:>12}"
+        )
+
+    print(
+        f"\n   LLM calls: {report['llm_calls']}, input tokens: {report['input_tokens']} "
+        f"({report['input_tokens_per_investigation']}/investigation), "
+        f"output tokens: {report['output_tokens']}"
+    )
+    print(f"   Tool calls: {report['tool_calls']}")
+    if report["tool_cache"]:
+        print(f"   Tool cache hit rate: {report['tool_cache']['hit_rate']:.0%}")
+    memory = f"   Max RSS: {report['max_rss_mb']} MB"
+    if report["peak_traced_mb"] is not None:
+        memory += f", peak traced: {report['peak_traced_mb']} MB"
+    print(memory)
+
+
+def _compare_with_baseline(
+    report: Dict[str, Any], baseline: Dict[str, Any], max_regression: float
+) -> List[str]:
+    """Return descriptions of p95 latencies that regressed beyond the threshold."""
+    regressions = []
+    current = dict(report["nodes"], end_to_end=report["end_to_end"])
+    previous = dict(baseline.get("nodes", {}), end_to_end=baseline.get("end_to_end", {}))
+
+    for name, stats in current.items():
+        baseline_p95 = previous.get(name, {}).get("p95_ms")
+        if not baseline_p95:
+            continue
+        change = (stats["p95_ms"] - baseline_p95) / baseline_p95
+        if change > max_regression:
+            regressions.append(
+                f"{name}: p95 {baseline_p95}ms -> {stats['p95_ms']}ms (+{change:.0%})"
+            )
+
+    baseline_tokens = baseline.get("input_tokens_per_investigation")
+    if baseline_tokens:
+        change = (
+            report["input_tokens_per_investigation"] - baseline_tokens
+        ) / baseline_tokens
+        if change > max_regression:
+            regressions.append(
+                f"input tokens/investigation: {baseline_tokens} -> "
+                f"{report['input_tokens_per_investigation']} (+{change:.0%})"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the SRE multi-agent graph with a fake LLM"
+    )
+    parser.add_argument("--investigations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.0, help="Simulated seconds per LLM call"
+    )
+    parser.add_argument(
+        "--tool-latency",
+        type=float,
+        default=0.0,
+        help="Simulated seconds per backend tool call",
+    )
+    parser.add_argument(
+        "--parallel", action="store_true", help="Use parallel agent execution"
+    )
+    parser.add_argument(
+        "--tool-cache", action="store_true", help="Wrap tools with the result cache"
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="Track peak Python allocations with tracemalloc (slows the run)",
+    )
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument(
+        "--max-regression",
+        type=float,
+        default=0.2,
+        help="Allowed p95 increase over the baseline as a fraction (default: 0.2)",
+    )
+    parser.add_argument("--debug", action="store_true", help="Show agent logs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.WARNING)
+    logging.getLogger().setLevel(logging.DEBUG if args.debug else logging.WARNING)
+
+    report = asyncio.run(
+        run_benchmark(
+            investigations=args.investigations,
+            concurrency=args.concurrency,
+            llm_latency=args.llm_latency,
+            tool_latency=args.tool_latency,
+            parallel_execution=args.parallel,
+            tool_cache=args.tool_cache,
+            trace_memory=args.trace_memory,
+        )
+    )
+    _print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        regressions = _compare_with_baseline(report, baseline, args.max_regression)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"   {regression}")
+            return 1
+        print("\n✅ No regressions against baseline")
+
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,9 @@
 import json
 import os
 from typing import Dict, Any, Optional, List
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
 import asyncio
 import uuid
@@ -12,7 +13,18 @@ from botocore.exceptions import NoCredentialsError, ProfileNotFound
 from botocore.config import Config
 from contextlib import asynccontextmanager
 import time
-from functools import lru_cache
+import hashlib
+import base64
+import binascii
+import mmap
+import re
+import sqlite3
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
 
 # Load environment variables
 load_dotenv()
@@ -120,7 +132,7 @@ except ImportError:
         raise
 
 # Import AgentCore for code interpreter
-from bedrock_agentcore.tools.code_interpreter_client import code_session
+from bedrock_agentcore.tools.code_interpreter_client import CodeInterpreter, code_session
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -128,9 +140,17 @@ async def lifespan(app: FastAPI):
     global aws_session, aws_region
     aws_session, aws_region = setup_aws_credentials()
     initialize_agents()
+    active_sessions.purge_expired()
+    pool = get_code_interpreter_pool()
+    eviction_task = asyncio.create_task(evict_idle_interpreters_periodically(pool))
+    image_pruning_task = asyncio.create_task(prune_images_periodically(get_image_store()))
     yield
-    # Shutdown (if needed)
-    pass
+    # Shutdown - stop warm interpreter sessions so they are not billed until timeout
+    eviction_task.cancel()
+    image_pruning_task.cancel()
+    pool.shutdown()
+    blocking_executor.shutdown(wait=False, cancel_futures=True)
+    active_sessions.close()
 
 app = FastAPI(
     title="AgentCore Code Interpreter", 
@@ -168,6 +188,13 @@ class FileUploadRequest(BaseModel):
     content: str
     session_id: Optional[str] = None
 
+# Session store settings
+MAX_ACTIVE_SESSIONS = int(os.getenv('MAX_ACTIVE_SESSIONS', '200'))  # Sessions kept in memory
+SESSION_TTL_SECONDS = int(os.getenv('SESSION_TTL_SECONDS', '3600'))  # Idle time before a session leaves memory
+MAX_SESSION_HISTORY = int(os.getenv('MAX_SESSION_HISTORY', '100'))  # Entries kept per history list
+SESSION_DB_PATH = os.getenv('SESSION_DB_PATH', '')  # SQLite file for sessions, empty keeps them in memory only
+SESSION_RETENTION_DAYS = int(os.getenv('SESSION_RETENTION_DAYS', '7'))  # How long sessions stay in SQLite
+
 # Session management
 class CodeInterpreterSession:
     def __init__(self, session_id: str):
@@ -176,141 +203,899 @@ class CodeInterpreterSession:
         self.code_history = []
         self.execution_results = []
         self.interactive_sessions = {}  # Track interactive execution sessions
-        self.uploaded_csv = None  # Store uploaded CSV file data
+        self.uploaded_csv = None  # Uploaded CSV metadata, the content lives in the upload store
+        self.last_accessed = time.time()
+
+    def trim_history(self, max_entries: int):
+        """Keep only the most recent max_entries of each history list"""
+        for history in (self.conversation_history, self.code_history, self.execution_results):
+            if len(history) > max_entries:
+                del history[:-max_entries]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "session_id": self.session_id,
+            "conversation_history": self.conversation_history,
+            "code_history": self.code_history,
+            "execution_results": self.execution_results,
+            "uploaded_csv": self.uploaded_csv
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CodeInterpreterSession":
+        session = cls(data["session_id"])
+        session.conversation_history = data.get("conversation_history", [])
+        session.code_history = data.get("code_history", [])
+        session.execution_results = data.get("execution_results", [])
+        session.uploaded_csv = data.get("uploaded_csv")
+        return session
+
+class SessionStore:
+    """Bounded store for IDE sessions.
+
+    Sessions live in an LRU map of at most max_sessions entries and leave memory after
+    ttl_seconds without access. History lists are capped at max_history entries. With a
+    db_path, sessions are also written to SQLite on every save, so evicted sessions and
+    session history survive a backend restart.
+    """
+    def __init__(self, max_sessions: int = MAX_ACTIVE_SESSIONS, ttl_seconds: int = SESSION_TTL_SECONDS,
+                 max_history: int = MAX_SESSION_HISTORY, db_path: str = SESSION_DB_PATH,
+                 retention_days: int = SESSION_RETENTION_DAYS):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_history = max_history
+        self.retention_seconds = retention_days * 24 * 3600
+        self._sessions = OrderedDict()  # session id -> CodeInterpreterSession, least recently used first
+        self._lock = threading.RLock()
+        self.evicted = 0
+        self.loaded = 0
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("""CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                upload_sha256 TEXT,
+                updated_at REAL NOT NULL
+            )""")
+            self._db.execute("CREATE INDEX IF NOT EXISTS sessions_upload ON sessions (upload_sha256)")
+            self._db.commit()
+            print(f"💾 Persisting sessions to {db_path}")
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def values(self) -> list:
+        """Sessions currently in memory"""
+        with self._lock:
+            return list(self._sessions.values())
+
+    def _load(self, session_id: str) -> Optional[CodeInterpreterSession]:
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT data FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        self.loaded += 1
+        return CodeInterpreterSession.from_dict(json.loads(row[0]))
+
+    def _evict_locked(self) -> list:
+        """Remove expired sessions and sessions beyond max_sessions (caller holds the lock)"""
+        evicted = []
+        expiry = time.time() - self.ttl_seconds
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and oldest.last_accessed >= expiry:
+                break
+            del self._sessions[oldest_id]
+            evicted.append(oldest)
+        self.evicted += len(evicted)
+        return evicted
+
+    def _add(self, session: CodeInterpreterSession):
+        with self._lock:
+            self._sessions[session.session_id] = session
+            evicted = self._evict_locked()
+        for stale in evicted:
+            print(f"🧹 Session {stale.session_id} evicted from memory")
+            if self._db is None and stale.uploaded_csv:
+                # Nothing can restore this session, so its upload is no longer needed
+                release_upload(stale.uploaded_csv['sha256'])
+
+    def get(self, session_id: str) -> Optional[CodeInterpreterSession]:
+        """Return a session from memory or SQLite, or None if it is unknown"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._load(session_id)
+                if session is None:
+                    return None
+                self._sessions[session_id] = session
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_accessed = time.time()
+        self._add(session)
+        return session
+
+    def get_or_create(self, session_id: Optional[str] = None) -> CodeInterpreterSession:
+        if session_id is None:
+            session_id = str(uuid.uuid4())
+        session = self.get(session_id)
+        if session is None:
+            session = CodeInterpreterSession(session_id)
+            self._add(session)
+        return session
+
+    def save(self, session: CodeInterpreterSession):
+        """Apply the history caps and persist the session if SQLite is configured"""
+        session.trim_history(self.max_history)
+        if self._db is None:
+            return
+        upload_sha256 = session.uploaded_csv['sha256'] if session.uploaded_csv else None
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, data, upload_sha256, updated_at) VALUES (?, ?, ?, ?)",
+                (session.session_id, json.dumps(session.to_dict(), default=str), upload_sha256, time.time())
+            )
+            self._db.commit()
+
+    def references_upload(self, digest: str) -> bool:
+        """Check whether any session, in memory or in SQLite, uses an uploaded file"""
+        with self._lock:
+            if any(s.uploaded_csv and s.uploaded_csv['sha256'] == digest for s in self._sessions.values()):
+                return True
+            if self._db is None:
+                return False
+            return self._db.execute("SELECT 1 FROM sessions WHERE upload_sha256 = ? LIMIT 1",
+                                    (digest,)).fetchone() is not None
+
+    def purge_expired(self) -> int:
+        """Delete sessions older than the retention period from SQLite"""
+        if self._db is None:
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            digests = [row[0] for row in self._db.execute(
+                "SELECT DISTINCT upload_sha256 FROM sessions WHERE updated_at < ? AND upload_sha256 IS NOT NULL",
+                (cutoff,))]
+            purged = self._db.execute("DELETE FROM sessions WHERE updated_at < ?", (cutoff,)).rowcount
+            self._db.commit()
+        for digest in digests:
+            release_upload(digest)
+        if purged:
+            print(f"🧹 Purged {purged} sessions older than {self.retention_seconds // 86400} days")
+        return purged
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_memory": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "ttl_seconds": self.ttl_seconds,
+                "max_history": self.max_history,
+                "evicted": self.evicted,
+                "loaded_from_db": self.loaded,
+                "persistent": self._db is not None
+            }
 
 # Global variables for agents
 code_generator_agent = None
 code_executor_agent = None
 executor_type = "unknown"  # Track which executor type we're using
-active_sessions = {}
+active_sessions = SessionStore()
+
+# Code Interpreter session pool settings
+CODE_INTERPRETER_POOL_SIZE = int(os.getenv('CODE_INTERPRETER_POOL_SIZE', '20'))
+CODE_INTERPRETER_IDLE_TIMEOUT = int(os.getenv('CODE_INTERPRETER_IDLE_TIMEOUT', '600'))  # 10 minutes
+CODE_INTERPRETER_SESSION_TIMEOUT = int(os.getenv('AGENTCORE_SESSION_TIMEOUT', '1800'))  # 30 minutes
+CODE_INTERPRETER_HEALTH_CHECK_INTERVAL = int(os.getenv('CODE_INTERPRETER_HEALTH_CHECK_INTERVAL', '120'))
+DEFAULT_POOL_KEY = "default"  # Interpreter used when no IDE session is known
+
+class PooledInterpreter:
+    """A started AgentCore Code Interpreter kept warm for one IDE session"""
+    def __init__(self, client: CodeInterpreter):
+        self.client = client
+        self.created_at = time.time()
+        self.last_used = self.created_at
+        self.last_health_check = self.created_at
+        self.lock = threading.Lock()  # One execution at a time per interpreter
+        self.uploaded_files = {}  # Sandbox path -> sha256 of the uploaded content
+        self.in_use = 0
+
+class CodeInterpreterPool:
+    """Keeps one warm Code Interpreter per IDE session so variables and files survive between runs.
+
+    Interpreters idle for longer than idle_timeout are stopped, the least recently used
+    idle interpreter is stopped when the pool is full, and an interpreter that has been
+    idle for a while is health checked before it is handed out again.
+    """
+    def __init__(self, region: str, max_size: int = CODE_INTERPRETER_POOL_SIZE,
+                 idle_timeout: int = CODE_INTERPRETER_IDLE_TIMEOUT,
+                 session_timeout: int = CODE_INTERPRETER_SESSION_TIMEOUT,
+                 health_check_interval: int = CODE_INTERPRETER_HEALTH_CHECK_INTERVAL):
+        self.region = region
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.session_timeout = session_timeout
+        self.health_check_interval = health_check_interval
+        self._interpreters = OrderedDict()  # IDE session id -> PooledInterpreter, LRU order
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.replaced = 0
+
+    def _start_interpreter(self) -> PooledInterpreter:
+        client = CodeInterpreter(self.region)
+        client.start(session_timeout_seconds=self.session_timeout)
+        print(f"🚀 Started Code Interpreter session {client.session_id}")
+        return PooledInterpreter(client)
+
+    def _stop_interpreter(self, interpreter: PooledInterpreter):
+        try:
+            interpreter.client.stop()
+        except Exception as e:
+            print(f"⚠️  Failed to stop Code Interpreter session: {e}")
+
+    def _is_expired(self, interpreter: PooledInterpreter, now: float) -> bool:
+        # Leave a margin so a session is never used right as AgentCore times it out
+        return now - interpreter.created_at > self.session_timeout - 60
+
+    def _is_healthy(self, interpreter: PooledInterpreter) -> bool:
+        """Run a no-op in the sandbox if it has been idle longer than the health check interval"""
+        now = time.time()
+        if self._is_expired(interpreter, now):
+            return False
+        if now - interpreter.last_health_check < self.health_check_interval:
+            return True
+        try:
+            response = interpreter.client.invoke("executeCode", {
+                "code": "pass",
+                "language": "python",
+                "clearContext": False
+            })
+            for event in response["stream"]:
+                if event.get("result", {}).get("isError", False):
+                    return False
+            interpreter.last_health_check = time.time()
+            return True
+        except Exception as e:
+            print(f"⚠️  Code Interpreter health check failed: {e}")
+            return False
+
+    def _collect_evictable_locked(self, now: float) -> list:
+        """Remove idle/expired interpreters and any beyond max_size (caller holds the lock)"""
+        evicted = []
+        for key, interpreter in list(self._interpreters.items()):
+            if interpreter.in_use:
+                continue
+            if now - interpreter.last_used > self.idle_timeout or self._is_expired(interpreter, now):
+                evicted.append(self._interpreters.pop(key))
+        # Oldest first; busy interpreters are skipped so the pool may briefly exceed max_size
+        for key in list(self._interpreters.keys()):
+            if len(self._interpreters) <= self.max_size:
+                break
+            if not self._interpreters[key].in_use:
+                evicted.append(self._interpreters.pop(key))
+        self.evicted += len(evicted)
+        return evicted
 
-def clean_output_for_display(output: str) -> str:
-    """Clean output for display by removing image binary data while preserving analysis text"""
-    if not output:
-        return output
-    
-    # If output contains IMAGE_DATA, extract everything except the binary
-    if 'IMAGE_DATA:' in output:
-        parts = output.split('IMAGE_DATA:')
-        cleaned_parts = []
-        
-        # Add the part before IMAGE_DATA
-        if parts[0].strip():
-            cleaned_parts.append(parts[0].strip())
-        
-        # Process parts after IMAGE_DATA
-        for i in range(1, len(parts)):
-            # Split on newline to separate binary from any following text
-            lines = parts[i].split('\n', 1)
-            if len(lines) > 1:
-                # Skip the binary line, keep any text after it
-                remaining_text = lines[1].strip()
-                if remaining_text and not remaining_text.startswith(('iVBOR', '/9j/', 'data:')):
-                    cleaned_parts.append(remaining_text)
-        
-        if cleaned_parts:
-            result = '\n\n'.join(cleaned_parts)
-            print(f"🧹 Cleaned output: removed image binary, kept {len(result)} chars of text")
-            return result
+    def _checkout(self, session_id: str) -> PooledInterpreter:
+        """Return the session's interpreter with its lock held, starting one if needed.
+
+        The health check runs under the interpreter lock, so an interpreter is never
+        probed or replaced while another request is executing in it.
+        """
+        while True:
+            fresh = False
+            with self._lock:
+                interpreter = self._interpreters.get(session_id)
+                if interpreter is not None:
+                    self._interpreters.move_to_end(session_id)
+                    interpreter.in_use += 1
+
+            if interpreter is None:
+                # Start outside the lock - starting a sandbox takes a few seconds
+                new_interpreter = self._start_interpreter()
+                to_stop = []
+                with self._lock:
+                    interpreter = self._interpreters.get(session_id)
+                    if interpreter is not None:
+                        # Another request for the same session won the race
+                        to_stop.append(new_interpreter)
+                    else:
+                        interpreter = new_interpreter
+                        self._interpreters[session_id] = interpreter
+                        self.created += 1
+                        fresh = True
+                    interpreter.in_use += 1
+                    to_stop.extend(self._collect_evictable_locked(time.time()))
+                for stale in to_stop:
+                    self._stop_interpreter(stale)
+
+            interpreter.lock.acquire()
+            with self._lock:
+                current = self._interpreters.get(session_id) is interpreter
+            if current and self._is_healthy(interpreter):
+                if not fresh:
+                    with self._lock:
+                        self.reused += 1
+                return interpreter
+
+            if current:
+                print(f"🔄 Replacing unhealthy Code Interpreter for session {session_id}")
+                self.discard(session_id, interpreter)
+                with self._lock:
+                    self.replaced += 1
+            # Replaced or discarded while we waited for it, retry with a new interpreter
+            interpreter.lock.release()
+            with self._lock:
+                interpreter.in_use -= 1
+
+    @contextmanager
+    def session(self, session_id: Optional[str] = None):
+        """Check out the warm interpreter of an IDE session, starting one if needed"""
+        session_id = session_id or DEFAULT_POOL_KEY
+        interpreter = self._checkout(session_id)
+        try:
+            yield interpreter
+        finally:
+            interpreter.lock.release()
+            with self._lock:
+                interpreter.in_use -= 1
+                interpreter.last_used = time.time()
+
+    def discard(self, session_id: Optional[str] = None, interpreter: Optional[PooledInterpreter] = None):
+        """Drop a session's interpreter, e.g. after an infrastructure error.
+
+        If interpreter is given it is only removed from the pool if it is still the
+        session's current one, so a replacement started meanwhile is kept.
+        """
+        session_id = session_id or DEFAULT_POOL_KEY
+        with self._lock:
+            current = self._interpreters.get(session_id)
+            if current is not None and (interpreter is None or current is interpreter):
+                self._interpreters.pop(session_id)
+            if interpreter is None:
+                interpreter = current
+        if interpreter is not None:
+            self._stop_interpreter(interpreter)
+
+    def evict_idle(self) -> int:
+        """Stop interpreters idle longer than idle_timeout"""
+        with self._lock:
+            evicted = self._collect_evictable_locked(time.time())
+        for interpreter in evicted:
+            self._stop_interpreter(interpreter)
+        if evicted:
+            print(f"🧹 Evicted {len(evicted)} idle Code Interpreter sessions")
+        return len(evicted)
+
+    def shutdown(self):
+        """Stop all pooled interpreters"""
+        with self._lock:
+            interpreters = list(self._interpreters.values())
+            self._interpreters.clear()
+        for interpreter in interpreters:
+            self._stop_interpreter(interpreter)
+        print(f"🛑 Stopped {len(interpreters)} pooled Code Interpreter sessions")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._interpreters),
+                "max_size": self.max_size,
+                "in_use": sum(1 for i in self._interpreters.values() if i.in_use),
+                "created": self.created,
+                "reused": self.reused,
+                "evicted": self.evicted,
+                "replaced": self.replaced,
+                "idle_timeout_seconds": self.idle_timeout
+            }
+
+code_interpreter_pool = None
+
+def get_code_interpreter_pool() -> CodeInterpreterPool:
+    """Get the Code Interpreter pool, creating it on first use"""
+    global code_interpreter_pool
+    if code_interpreter_pool is None:
+        code_interpreter_pool = CodeInterpreterPool(aws_region or os.getenv('AWS_REGION', 'us-east-1'))
+    return code_interpreter_pool
+
+async def evict_idle_interpreters_periodically(pool: CodeInterpreterPool, interval: int = 60):
+    """Background task that stops idle pooled interpreters"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(pool.evict_idle)
+        except Exception as e:
+            print(f"⚠️  Idle interpreter eviction failed: {e}")
+
+# Uploaded file storage settings
+UPLOAD_STORAGE_DIR = os.getenv('UPLOAD_STORAGE_DIR', os.path.join(tempfile.gettempdir(), 'text-to-python-ide-uploads'))
+IMAGE_STORAGE_DIR = os.getenv('IMAGE_STORAGE_DIR', os.path.join(tempfile.gettempdir(), 'text-to-python-ide-images'))
+IMAGE_RETENTION_SECONDS = int(os.getenv('IMAGE_RETENTION_SECONDS', str(24 * 3600)))
+IMAGE_STORAGE_MAX_BYTES = int(os.getenv('IMAGE_STORAGE_MAX_BYTES', str(512 * 1024 * 1024)))
+SANDBOX_UPLOAD_CHUNK_BYTES = int(os.getenv('SANDBOX_UPLOAD_CHUNK_BYTES', str(4 * 1024 * 1024)))  # 4 MB per writeFiles call
+CSV_PREVIEW_CHARS = 1000
+
+class UploadStore:
+    """Content-addressed store for uploaded files.
+
+    Files are kept on disk under their sha256 so identical uploads share one copy
+    and large CSVs are never held in the Python heap; readers memory-map them.
+    """
+    def __init__(self, directory: str = UPLOAD_STORAGE_DIR):
+        self.directory = directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest)
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def put_bytes(self, data: bytes, extension: str = "") -> tuple[str, int]:
+        """Store binary content, returns (sha256 + extension, size in bytes)"""
+        key = hashlib.sha256(data).hexdigest() + extension
+        if self.exists(key):
+            # Storing it again counts as a use for prune()
+            os.utime(self.path(key))
         else:
-            return "Code executed successfully - chart generated"
-    
-    return output
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path(key))
+        return key, len(data)
+
+    def put_text(self, content: str) -> tuple[str, int]:
+        """Store text content, returns (sha256, size in bytes)"""
+        return self.put_bytes(content.encode('utf-8'))
+
+    async def put_stream(self, chunks) -> tuple[str, int]:
+        """Store content from an async iterator of bytes without buffering it, returns (sha256, size)"""
+        hasher = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                async for chunk in chunks:
+                    if chunk:
+                        hasher.update(chunk)
+                        size += len(chunk)
+                        f.write(chunk)
+            digest = hasher.hexdigest()
+            if self.exists(digest):
+                os.remove(tmp_path)
+            else:
+                os.replace(tmp_path, self.path(digest))
+            return digest, size
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @contextmanager
+    def open_mmap(self, digest: str):
+        """Memory-map a stored file read-only"""
+        with open(self.path(digest), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield b''
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def preview(self, digest: str, max_chars: int = CSV_PREVIEW_CHARS) -> str:
+        """First max_chars characters of a stored file"""
+        with self.open_mmap(digest) as mapped:
+            # UTF-8 uses at most 4 bytes per character
+            return mapped[:max_chars * 4].decode('utf-8', errors='ignore')[:max_chars]
+
+    def iter_text_chunks(self, digest: str, chunk_bytes: int = SANDBOX_UPLOAD_CHUNK_BYTES):
+        """Yield the file as text chunks of about chunk_bytes, split on line boundaries"""
+        with self.open_mmap(digest) as mapped:
+            size = len(mapped)
+            start = 0
+            while start < size:
+                end = min(start + chunk_bytes, size)
+                if end < size:
+                    newline = mapped.rfind(b'\n', start, end)
+                    if newline >= start:
+                        end = newline + 1
+                    else:
+                        # No line break in range, don't cut a multi-byte character in half
+                        boundary = end
+                        while boundary > start and mapped[boundary] & 0xC0 == 0x80:
+                            boundary -= 1
+                        if boundary > start:
+                            end = boundary
+                yield mapped[start:end].decode('utf-8')
+                start = end
+
+    def remove(self, digest: str):
+        try:
+            os.remove(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, max_age_seconds: int, max_total_bytes: int) -> int:
+        """Remove files older than max_age_seconds, then the oldest ones until the store fits
+        in max_total_bytes. Returns the number of files removed."""
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                # Skip files still being written by put_bytes/put_stream
+                if not entry.is_file() or entry.name.startswith('tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.name))
+
+        entries.sort()
+        expiry = time.time() - max_age_seconds
+        total_bytes = sum(size for _, size, _ in entries)
+        removed = 0
+        for mtime, size, name in entries:
+            if mtime >= expiry and total_bytes <= max_total_bytes:
+                break
+            self.remove(name)
+            total_bytes -= size
+            removed += 1
+        return removed
+
+upload_store = None
+image_store = None
+
+def get_upload_store() -> UploadStore:
+    """Get the upload store, creating it on first use"""
+    global upload_store
+    if upload_store is None:
+        upload_store = UploadStore()
+    return upload_store
+
+def get_image_store() -> UploadStore:
+    """Get the store for chart images extracted from execution output"""
+    global image_store
+    if image_store is None:
+        image_store = UploadStore(IMAGE_STORAGE_DIR)
+    return image_store
+
+async def prune_images_periodically(store: UploadStore, interval: int = 300):
+    """Background task that removes old chart images from disk"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await asyncio.to_thread(store.prune, IMAGE_RETENTION_SECONDS, IMAGE_STORAGE_MAX_BYTES)
+            if removed:
+                print(f"🧹 Removed {removed} stored chart images")
+        except Exception as e:
+            print(f"⚠️  Image pruning failed: {e}")
+
+def _write_sandbox_files(interpreter: PooledInterpreter, files_data: list) -> Optional[str]:
+    """Invoke writeFiles, returns an error message on failure"""
+    upload_response = interpreter.client.invoke("writeFiles", {"content": files_data})
+    for event in upload_response["stream"]:
+        result = event.get("result", {})
+        if result.get("isError", False):
+            error_content = result.get("content", [{}])
+            error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
+            print(f"❌ File upload error: {error_text}")
+            return error_text
+        for item in result.get("content", []):
+            if item.get("type") == "text":
+                print(f"✅ File upload: {item.get('text', '')}")
+    return None
+
+def _write_sandbox_file_chunked(interpreter: PooledInterpreter, path: str, digest: str) -> Optional[str]:
+    """Send a large stored file in parts and join them inside the sandbox"""
+    part_paths = []
+    for index, chunk in enumerate(get_upload_store().iter_text_chunks(digest)):
+        part_path = f"{path}.part{index}"
+        error = _write_sandbox_files(interpreter, [{"path": part_path, "text": chunk}])
+        if error:
+            return error
+        part_paths.append(part_path)
+
+    join_code = f"""import os
+with open({path!r}, 'w') as _out:
+    for _part in {part_paths!r}:
+        with open(_part) as _f:
+            _out.write(_f.read())
+        os.remove(_part)
+"""
+    response = interpreter.client.invoke("executeCode", {
+        "code": join_code,
+        "language": "python",
+        "clearContext": False
+    })
+    for event in response["stream"]:
+        result = event.get("result", {})
+        if result.get("isError", False):
+            return str(result.get("content", "Failed to join uploaded file parts"))
+    print(f"✅ File upload: {path} in {len(part_paths)} parts")
+    return None
+
+# Blocking work (Bedrock agent calls, AgentCore sandbox calls) runs on a bounded thread pool
+# so one slow request never stalls the event loop for other users
+AGENT_WORKER_THREADS = int(os.getenv('AGENT_WORKER_THREADS', '16'))
+GENERATION_TIMEOUT = int(os.getenv('GENERATION_TIMEOUT', '300'))
+EXECUTION_TIMEOUT = int(os.getenv('EXECUTION_TIMEOUT', '600'))
+
+blocking_executor = ThreadPoolExecutor(max_workers=AGENT_WORKER_THREADS, thread_name_prefix="agent-worker")
+blocking_calls_in_flight = 0
+
+async def wait_for_disconnect(http_request: Request, poll_interval: float = 1.0):
+    """Return once the HTTP client has gone away"""
+    while not await http_request.is_disconnected():
+        await asyncio.sleep(poll_interval)
+
+async def run_blocking(func, *args, timeout: float, http_request: Optional[Request] = None, on_cancel=None, **kwargs):
+    """Run a blocking call on the worker pool and await it without blocking the event loop.
+
+    Raises a 504 HTTPException after timeout seconds and a 499 HTTPException if the client
+    disconnects first. In both cases (and when the awaiting task is cancelled) on_cancel is run
+    on the worker pool so the underlying work, e.g. a sandbox execution, can be abandoned.
+    The worker thread itself cannot be interrupted and finishes in the background.
+    """
+    global blocking_calls_in_flight
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(blocking_executor, partial(func, *args, **kwargs))
+    disconnect_task = asyncio.create_task(wait_for_disconnect(http_request)) if http_request is not None else None
+    waiters = {future, disconnect_task} if disconnect_task else {future}
+    blocking_calls_in_flight += 1
+    completed = False
+    try:
+        done, _ = await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if future in done:
+            completed = True
+            return future.result()
+        if disconnect_task is not None and disconnect_task in done:
+            print(f"🚫 Client disconnected - abandoning {func.__name__}")
+            raise HTTPException(status_code=499, detail="Client closed request")
+        print(f"⏱️  {func.__name__} timed out after {timeout}s")
+        raise HTTPException(status_code=504, detail=f"Request timed out after {timeout} seconds")
+    finally:
+        blocking_calls_in_flight -= 1
+        if disconnect_task is not None:
+            disconnect_task.cancel()
+        if not completed:
+            future.cancel()  # Drops the call if it has not started yet
+            if on_cancel is not None:
+                loop.run_in_executor(blocking_executor, on_cancel)
+
+def blocking_executor_stats() -> Dict[str, Any]:
+    return {
+        "max_workers": AGENT_WORKER_THREADS,
+        "in_flight": blocking_calls_in_flight,
+        "generation_timeout_seconds": GENERATION_TIMEOUT,
+        "execution_timeout_seconds": EXECUTION_TIMEOUT
+    }
+
+def sync_files_to_sandbox(interpreter: PooledInterpreter, files: list) -> Optional[str]:
+    """Write files the sandbox does not have yet, returns an error message on failure.
 
-def extract_image_data(execution_result: str):
-    """Extract base64 image data from execution results - fixed for AgentCore format"""
+    Files are either {'filename', 'content'} or {'filename', 'sha256', 'size'} referring to
+    the upload store. The sandbox's path -> sha256 registry skips unchanged files.
+    """
+    pending = []
+    for file_info in files:
+        path = file_info.get('filename', 'uploaded_file.csv')
+        digest = file_info.get('sha256') or hashlib.sha256(file_info.get('content', '').encode('utf-8')).hexdigest()
+        if interpreter.uploaded_files.get(path) != digest:
+            pending.append((path, file_info, digest))
+
+    if not pending:
+        print(f"📁 {len(files)} files already in sandbox - skipping upload")
+        return None
+
+    print(f"📁 Uploading {len(pending)} files to sandbox...")
+    small_files = []
+    for path, file_info, digest in pending:
+        if 'sha256' not in file_info:
+            small_files.append({"path": path, "text": file_info.get('content', '')})
+        elif file_info.get('size', 0) <= SANDBOX_UPLOAD_CHUNK_BYTES:
+            with get_upload_store().open_mmap(digest) as mapped:
+                small_files.append({"path": path, "text": mapped[:].decode('utf-8')})
+        else:
+            error = _write_sandbox_file_chunked(interpreter, path, digest)
+            if error:
+                return error
+            interpreter.uploaded_files[path] = digest
+
+    if small_files:
+        error = _write_sandbox_files(interpreter, small_files)
+        if error:
+            return error
+
+    for path, _, digest in pending:
+        interpreter.uploaded_files[path] = digest
+    return None
+
+IMAGE_MARKER = 'IMAGE_DATA:'
+MIN_IMAGE_BASE64_CHARS = 1000  # At least ~750 bytes decoded, anything shorter is not a chart
+IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpeg'),
+)
+IMAGE_ID_PATTERN = re.compile(r'^[0-9a-f]{64}\.(png|jpeg)$')
+
+def _store_image(encoded: str) -> Optional[Dict[str, Any]]:
+    """Decode a base64 image once, store it and return a reference to it"""
+    if len(encoded) < MIN_IMAGE_BASE64_CHARS:
+        print(f"⚠️  Image data too short to be a valid image")
+        return None
     try:
-        import re
-        import base64
-        
+        decoded = base64.b64decode(encoded)
+    except (binascii.Error, ValueError) as e:
+        print(f"❌ Image decode error: {e}")
+        return None
+
+    for signature, image_format in IMAGE_SIGNATURES:
+        if decoded.startswith(signature):
+            image_id, size = get_image_store().put_bytes(decoded, f".{image_format}")
+            return {
+                'format': image_format,
+                'id': image_id,
+                'url': f"/api/images/{image_id}",
+                'size': size,
+                'source': 'agentcore_stdout'
+            }
+    print(f"⚠️  Image data has an unknown signature")
+    return None
+
+def split_output_and_images(output: str) -> tuple[str, list]:
+    """Separate chart images from execution output in a single pass.
+
+    Each IMAGE_DATA:<base64> line is decoded once and stored in the image store; the
+    returned images are references ({'id', 'url', 'format', 'size'}) instead of inline
+    base64. The remaining text is returned for display.
+    """
+    if not output or IMAGE_MARKER not in output:
+        return output, []
+
+    text_parts = []
+    images = []
+    position = 0
+    while True:
+        marker = output.find(IMAGE_MARKER, position)
+        if marker == -1:
+            text_parts.append(output[position:])
+            break
+        text_parts.append(output[position:marker])
+        line_end = output.find('\n', marker)
+        if line_end == -1:
+            line_end = len(output)
+        image = _store_image(output[marker + len(IMAGE_MARKER):line_end].strip())
+        if image is not None:
+            images.append(image)
+        position = line_end + 1
+
+    display_text = "\n".join(part.strip() for part in text_parts if part.strip())
+    if not display_text:
+        display_text = "Code executed successfully - chart generated"
+    print(f"🎯 Extracted {len(images)} images, kept {len(display_text)} chars of text")
+    return display_text, images
+
+class StreamingOutputProcessor:
+    """Splits stdout into display text and chart images as it arrives.
+
+    Complete lines are processed immediately; an IMAGE_DATA: line becomes an image as
+    soon as its newline is seen, so charts appear while the script is still running.
+    Everything processed is also kept, so result() returns the whole output without
+    decoding the images a second time.
+    """
+    def __init__(self):
+        self._partial_line = ""
+        self.text_parts = []
+        self.images = []
+
+    def _process_lines(self, lines: list) -> tuple[str, list]:
+        text_lines = []
         images = []
-        
-        print(f"🔍 Image extraction - Input length: {len(execution_result)}")
-        print(f"🔍 Contains IMAGE_DATA: {'IMAGE_DATA:' in execution_result}")
-        
-        if 'IMAGE_DATA:' in execution_result:
-            # Find all IMAGE_DATA: patterns in the text
-            # AgentCore puts the full base64 string in stdout, so we need a greedy pattern
-            pattern = r'IMAGE_DATA:([A-Za-z0-9+/=\n\r\s]+?)(?=\n[A-Za-z]|\nBase64|\n$|$)'
-            matches = re.findall(pattern, execution_result, re.MULTILINE | re.DOTALL)
-            
-            print(f"🔍 Regex matches found: {len(matches)}")
-            
-            for i, match in enumerate(matches):
-                try:
-                    # Clean up the base64 string - remove all whitespace and newlines
-                    clean_match = re.sub(r'[\s\n\r]', '', match)
-                    
-                    print(f"🔍 Match {i+1} - Original length: {len(match)}, Clean length: {len(clean_match)}")
-                    print(f"🔍 Match {i+1} - Starts with: {clean_match[:50]}...")
-                    
-                    # Must be reasonable length for an image (at least 1KB when decoded)
-                    if len(clean_match) > 1000:
-                        # Validate it's valid base64 and can be decoded
-                        decoded = base64.b64decode(clean_match)
-                        print(f"🔍 Match {i+1} - Decoded length: {len(decoded)} bytes")
-                        
-                        # Check if it looks like a PNG (starts with PNG signature)
-                        if decoded.startswith(b'\x89PNG\r\n\x1a\n'):
-                            images.append({
-                                'format': 'png',
-                                'data': clean_match,
-                                'source': 'agentcore_stdout'
-                            })
-                            print(f"✅ Match {i+1} - Valid PNG image extracted")
-                        # Also check for JPEG signatures
-                        elif decoded.startswith(b'\xff\xd8\xff'):
-                            images.append({
-                                'format': 'jpeg',
-                                'data': clean_match,
-                                'source': 'agentcore_stdout'
-                            })
-                            print(f"✅ Match {i+1} - Valid JPEG image extracted")
-                        else:
-                            print(f"⚠️  Match {i+1} - Invalid image signature")
-                    else:
-                        print(f"⚠️  Match {i+1} - Too short to be valid image")
-                except Exception as e:
-                    print(f"❌ Match {i+1} - Extraction error: {e}")
-                    continue
-        
-        print(f"🎯 Final result: {len(images)} images extracted")
-        return images
-        
-    except Exception as e:
-        print(f"❌ Image extraction error: {e}")
-        return []
+        for line in lines:
+            marker = line.find(IMAGE_MARKER)
+            if marker == -1:
+                text_lines.append(line)
+                continue
+            if line[:marker].strip():
+                text_lines.append(line[:marker])
+            image = _store_image(line[marker + len(IMAGE_MARKER):].strip())
+            if image is not None:
+                images.append(image)
+        self.text_parts.extend(text_lines)
+        self.images.extend(images)
+        return "".join(text_lines), images
+
+    def feed(self, text: str) -> tuple[str, list]:
+        """Add stdout text, returns (display text, images) for the completed lines"""
+        lines = (self._partial_line + text).splitlines(keepends=True)
+        if lines and not lines[-1].endswith('\n'):
+            self._partial_line = lines.pop()
+        else:
+            self._partial_line = ""
+        return self._process_lines(lines)
+
+    def flush(self) -> tuple[str, list]:
+        """Process any remaining text without a trailing newline"""
+        remaining, self._partial_line = self._partial_line, ""
+        return self._process_lines([remaining] if remaining else [])
 
-def upload_files_to_agentcore_sandbox(files_data: list, aws_region: str) -> bool:
-    """Upload files to AgentCore sandbox using writeFiles tool"""
+    def result(self) -> tuple[str, list]:
+        """Display text and images for all stdout processed so far"""
+        return "".join(self.text_parts).strip(), list(self.images)
+
+# IDE session id -> callback receiving execution events, called from worker threads
+execution_listeners: Dict[str, Any] = {}
+
+def emit_execution_event(session_id: Optional[str], event: Dict[str, Any]):
+    """Forward an execution event to the session's listener (e.g. its WebSocket), if any"""
+    listener = execution_listeners.get(session_id or DEFAULT_POOL_KEY)
+    if listener is not None:
+        try:
+            listener(event)
+        except Exception as e:
+            print(f"⚠️  Execution listener failed: {e}")
+
+def stream_execution_events(session_id: Optional[str], response_stream,
+                            processor: Optional[StreamingOutputProcessor] = None):
+    """Yield interpreter stream events while forwarding stdout, stderr and images to listeners
+
+    Pass a processor to read the split stdout from it afterwards; otherwise one is only
+    created when the session has a listener.
+    """
+    if processor is None and (session_id or DEFAULT_POOL_KEY) in execution_listeners:
+        processor = StreamingOutputProcessor()
+    for event in response_stream:
+        if processor is not None:
+            result = event.get("result", {})
+            if result.get("isError", False):
+                error_content = result.get("content", [{}])
+                error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
+                emit_execution_event(session_id, {"type": "execution_error", "error": error_text})
+            structured_content = result.get("structuredContent", {})
+            text, images = processor.feed(structured_content.get("stdout", ""))
+            if text:
+                emit_execution_event(session_id, {"type": "execution_output", "stream": "stdout", "text": text})
+            for image in images:
+                emit_execution_event(session_id, {"type": "execution_image", "image": image})
+            if structured_content.get("stderr"):
+                emit_execution_event(session_id, {"type": "execution_output", "stream": "stderr",
+                                                  "text": structured_content["stderr"]})
+        yield event
+    if processor is not None:
+        text, images = processor.flush()
+        if text:
+            emit_execution_event(session_id, {"type": "execution_output", "stream": "stdout", "text": text})
+        for image in images:
+            emit_execution_event(session_id, {"type": "execution_image", "image": image})
+
+def upload_files_to_agentcore_sandbox(files_data: list, aws_region: str, session_id: Optional[str] = None) -> bool:
+    """Upload files to the session's pooled AgentCore sandbox using writeFiles tool"""
     try:
         print(f"🔧 Uploading {len(files_data)} files to AgentCore sandbox...")
         
-        with code_session(aws_region) as code_client:
-            response = code_client.invoke("writeFiles", {"content": files_data})
-            
-            for event in response["stream"]:
-                result = event.get("result", {})
-                if result.get("isError", False):
-                    error_content = result.get("content", [{}])
-                    error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                    print(f"❌ File upload error: {error_text}")
-                    return False
-                else:
-                    content = result.get("content", [])
-                    for item in content:
-                        if item.get("type") == "text":
-                            print(f"✅ File upload result: {item.get('text', '')}")
-                    return True
-        
-        return False
+        files = [{"filename": f["path"], "content": f.get("text", "")} for f in files_data]
+        pooled = None
+        with get_code_interpreter_pool().session(session_id) as interpreter:
+            pooled = interpreter
+            return sync_files_to_sandbox(interpreter, files) is None
         
     except Exception as e:
         print(f"❌ File upload failed: {str(e)}")
+        get_code_interpreter_pool().discard(session_id, pooled)
         return False
 
-def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[str, list]:
+def execute_chart_code_direct(code: str, session_files: list = None, session_id: Optional[str] = None) -> tuple[str, list]:
     """Execute chart code directly with AgentCore to preserve full base64 output"""
+    pooled = None
     try:
         print(f"\n🎨 Direct AgentCore chart execution")
         print(f"📝 Code length: {len(code)} characters")
@@ -319,76 +1104,56 @@ def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[st
         clean_code = extract_python_code_from_prompt(code)
         print(f"🔧 Clean code length: {len(clean_code)} characters")
         
-        with code_session(aws_region) as code_client:
-            # Upload files to sandbox if provided
+        # Process response directly without Strands-Agents truncation. Stdout is split
+        # into text and images as it streams, so a base64 line spanning several events
+        # stays whole and every image is decoded once.
+        processor = StreamingOutputProcessor()
+        stderr_parts = []
+        
+        with get_code_interpreter_pool().session(session_id) as interpreter:
+            pooled = interpreter
+            # Upload files to sandbox if provided and not already there
             if session_files:
-                print(f"📁 Uploading {len(session_files)} files to sandbox...")
-                files_data = []
-                for file_info in session_files:
-                    files_data.append({
-                        "path": file_info['filename'],
-                        "text": file_info['content']
-                    })
-                
-                # Upload files using writeFiles tool
-                upload_response = code_client.invoke("writeFiles", {"content": files_data})
-                for event in upload_response["stream"]:
-                    result = event.get("result", {})
-                    if result.get("isError", False):
-                        error_content = result.get("content", [{}])
-                        error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                        print(f"❌ File upload error: {error_text}")
-                        return f"File upload failed: {error_text}", []
-                    else:
-                        content = result.get("content", [])
-                        for item in content:
-                            if item.get("type") == "text":
-                                print(f"✅ File upload: {item.get('text', '')}")
+                upload_error = sync_files_to_sandbox(interpreter, session_files)
+                if upload_error:
+                    return f"File upload failed: {upload_error}", []
             
             # Execute the cleaned code
-            response = code_client.invoke("executeCode", {
+            response = interpreter.client.invoke("executeCode", {
                 "code": clean_code,
                 "language": "python",
                 "clearContext": False
             })
-        
-        # Process response directly without Strands-Agents truncation
-        output_parts = []
-        full_stdout = ""
-        
-        for event in response["stream"]:
-            result = event.get("result", {})
             
-            if result.get("isError", False):
-                error_content = result.get("content", [{}])
-                error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                print(f"❌ Direct execution error: {error_text}")
-                return f"Error: {error_text}", []
-            
-            # Extract structured content
-            structured_content = result.get("structuredContent", {})
-            stdout = structured_content.get("stdout", "")
-            stderr = structured_content.get("stderr", "")
-            
-            if stdout:
-                output_parts.append(stdout)
-                full_stdout += stdout
-                print(f"📤 Direct stdout captured: {len(stdout)} characters")
-            if stderr:
-                output_parts.append(f"Errors: {stderr}")
-                print(f"⚠️  Direct stderr: {stderr}")
-        
-        # Combine output
-        final_output = "\n".join(output_parts) if output_parts else "Code executed successfully"
-        
-        # Extract images directly from full stdout
-        images = extract_image_data(full_stdout)
-        
-        # Clean the output for display (remove image binary but keep analysis text)
-        display_output = clean_output_for_display(final_output)
+            # Consume events as they arrive so listeners see output progressively
+            for event in stream_execution_events(session_id, response["stream"], processor):
+                result = event.get("result", {})
+                
+                if result.get("isError", False):
+                    error_content = result.get("content", [{}])
+                    error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
+                    print(f"❌ Direct execution error: {error_text}")
+                    return f"Error: {error_text}", []
+                
+                # Extract structured content
+                structured_content = result.get("structuredContent", {})
+                stdout = structured_content.get("stdout", "")
+                stderr = structured_content.get("stderr", "")
+                
+                if stdout:
+                    print(f"📤 Direct stdout captured: {len(stdout)} characters")
+                if stderr:
+                    stderr_parts.append(stderr)
+                    print(f"⚠️  Direct stderr: {stderr}")
+        
+        # Combine the display text (images already stored) with any stderr
+        display_output, images = processor.result()
+        if stderr_parts:
+            display_output = "\n".join(part for part in (display_output, f"Errors: {''.join(stderr_parts)}") if part)
+        if not display_output:
+            display_output = "Code executed successfully - chart generated" if images else "Code executed successfully"
         
         print(f"✅ Direct execution completed:")
-        print(f"   Output length: {len(final_output)}")
         print(f"   Display output length: {len(display_output)}")
         print(f"   Images extracted: {len(images)}")
         
@@ -398,6 +1163,7 @@ def execute_chart_code_direct(code: str, session_files: list = None) -> tuple[st
         print(f"❌ Direct AgentCore execution failed: {str(e)}")
         import traceback
         print(f"📋 Traceback: {traceback.format_exc()}")
+        get_code_interpreter_pool().discard(session_id, pooled)
         return f"Direct execution failed: {str(e)}", []
 
 def detect_chart_code(code: str) -> bool:
@@ -651,9 +1417,21 @@ def extract_python_code_from_prompt(input_text: str) -> str:
     print(f"🔧 Using input as-is (no markdown formatting detected)")
     return input_text.strip()
 
-@tool
-def execute_python_code(code: str, description: str = "", files: list = None) -> str:
-    """Execute Python code using AgentCore CodeInterpreter - reliable execution with proper output capture and file support"""
+def make_execute_python_code_tool(session_id: str):
+    """Build the code execution tool for one IDE session.
+
+    The session is bound here on the server side rather than passed by the model, so code
+    can only ever run in the sandbox of the session that made the request.
+    """
+    @tool
+    def execute_python_code(code: str, description: str = "", files: list = None) -> str:
+        """Execute Python code using AgentCore CodeInterpreter - reliable execution with proper output capture and file support"""
+        return run_python_code(session_id, code, description, files)
+
+    return execute_python_code
+
+def run_python_code(session_id: str, code: str, description: str = "", files: list = None) -> str:
+    """Execute Python code in the pooled sandbox of an IDE session"""
     
     # Extract clean Python code from markdown-formatted input
     clean_code = extract_python_code_from_prompt(code)
@@ -666,65 +1444,53 @@ def execute_python_code(code: str, description: str = "", files: list = None) ->
     print(f"🔧 Files provided: {len(files) if files else 0}")
     print(f"🔧 Clean code preview: {clean_code[:200]}...")
     
+    pooled = None
     try:
-        with code_session(aws_region) as code_client:
-            # Upload files to sandbox if provided
+        with get_code_interpreter_pool().session(session_id) as interpreter:
+            pooled = interpreter
+            # Upload files to sandbox if provided and not already there
             if files:
-                print(f"📁 Uploading {len(files)} files to sandbox...")
-                files_data = []
-                for file_info in files:
-                    files_data.append({
-                        "path": file_info.get('filename', 'uploaded_file.csv'),
-                        "text": file_info.get('content', '')
-                    })
-                
-                # Upload files using writeFiles tool
-                upload_response = code_client.invoke("writeFiles", {"content": files_data})
-                for event in upload_response["stream"]:
-                    result = event.get("result", {})
-                    if result.get("isError", False):
-                        error_content = result.get("content", [{}])
-                        error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                        print(f"❌ File upload error: {error_text}")
-                        return f"File upload failed: {error_text}"
-                    else:
-                        content = result.get("content", [])
-                        for item in content:
-                            if item.get("type") == "text":
-                                print(f"✅ File upload: {item.get('text', '')}")
+                upload_error = sync_files_to_sandbox(interpreter, files)
+                if upload_error:
+                    return f"File upload failed: {upload_error}"
             
             # Execute the code
-            response = code_client.invoke("executeCode", {
+            response = interpreter.client.invoke("executeCode", {
                 "code": clean_code,
                 "language": "python",
                 "clearContext": False
             })
-        
-        # Process the response stream to capture all output
-        output_parts = []
-        
-        for event in response["stream"]:
-            result = event.get("result", {})
             
-            if result.get("isError", False):
-                error_content = result.get("content", [{}])
-                error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
-                print(f"❌ AgentCore execution error: {error_text}")
-                return f"Error: {error_text}"
+            # Process the response stream as it arrives to capture all output; stdout
+            # chunks are concatenated as-is so IMAGE_DATA lines split across events stay whole
+            stdout_parts = []
+            stderr_parts = []
             
-            # Extract structured content (stdout, stderr)
-            structured_content = result.get("structuredContent", {})
-            stdout = structured_content.get("stdout", "")
-            stderr = structured_content.get("stderr", "")
-            
-            if stdout:
-                output_parts.append(stdout)
-                print(f"📤 Stdout captured: {len(stdout)} characters")
-            if stderr:
-                output_parts.append(f"Errors: {stderr}")
-                print(f"⚠️  Stderr captured: {len(stderr)} characters")
+            for event in stream_execution_events(session_id, response["stream"]):
+                result = event.get("result", {})
+                
+                if result.get("isError", False):
+                    error_content = result.get("content", [{}])
+                    error_text = error_content[0].get("text", "Unknown error") if error_content else "Unknown error"
+                    print(f"❌ AgentCore execution error: {error_text}")
+                    return f"Error: {error_text}"
+                
+                # Extract structured content (stdout, stderr)
+                structured_content = result.get("structuredContent", {})
+                stdout = structured_content.get("stdout", "")
+                stderr = structured_content.get("stderr", "")
+                
+                if stdout:
+                    stdout_parts.append(stdout)
+                    print(f"📤 Stdout captured: {len(stdout)} characters")
+                if stderr:
+                    stderr_parts.append(stderr)
+                    print(f"⚠️  Stderr captured: {len(stderr)} characters")
         
         # Combine all output
+        output_parts = ["".join(stdout_parts)] if stdout_parts else []
+        if stderr_parts:
+            output_parts.append(f"Errors: {''.join(stderr_parts)}")
         final_output = "\n".join(output_parts) if output_parts else "Code executed successfully (no output)"
         
         print(f"✅ AgentCore execution completed - Output length: {len(final_output)}")
@@ -734,6 +1500,7 @@ def execute_python_code(code: str, description: str = "", files: list = None) ->
         print(f"❌ AgentCore execution error: {str(e)}")
         import traceback
         print(f"📋 Full traceback: {traceback.format_exc()}")
+        get_code_interpreter_pool().discard(session_id, pooled)
         return f"Execution failed: {str(e)}"
 
 @lru_cache(maxsize=1)
@@ -853,7 +1620,7 @@ def initialize_agents():
         print(f"🎯 Using model: {model_id}")
         
         # Initialize Code Generator Agent using strands-agents
-        code_generator_agent = Agent(
+        code_generator_kwargs = dict(
             model=bedrock_model,
             system_prompt=f"""You are a Python code generator specialist powered by {model_id}. Your role is to:
             1. Generate clean, well-commented Python code based on user requirements
@@ -866,6 +1633,7 @@ def initialize_agents():
             Focus on creating practical, efficient code that solves the user's specific problem.
             Return ONLY the Python code, no explanations, no markdown, no additional text."""
         )
+        code_generator_agent = Agent(**code_generator_kwargs)
         
         # Test AgentCore availability
         with code_session(aws_region) as test_client:
@@ -896,15 +1664,16 @@ APPROACH:
 - The sandbox maintains state between executions, so you can refer to previous results
 
 TOOL AVAILABLE:
-- execute_python_code: Run Python code and see output
+- execute_python_code: Run Python code and see output.
 
 RESPONSE FORMAT: The execute_python_code tool returns execution results including stdout, stderr, and any errors."""
         
-        code_executor_agent = Agent(
+        code_executor_kwargs = dict(
             model=bedrock_model,
-            tools=[execute_python_code],
+            tools=[make_execute_python_code_tool(DEFAULT_POOL_KEY)],
             system_prompt=SYSTEM_PROMPT
         )
+        code_executor_agent = Agent(**code_executor_kwargs)
         
         print("✅ Agents initialized successfully:")
         print(f"   - Code Generator: Strands-Agents Agent with {model_id}")
@@ -914,6 +1683,8 @@ RESPONSE FORMAT: The execute_python_code tool returns execution results includin
         current_model_id = model_id
         _agents_cache['code_generator_agent'] = code_generator_agent
         _agents_cache['code_executor_agent'] = code_executor_agent
+        _agents_cache['code_generator_kwargs'] = code_generator_kwargs
+        _agents_cache['code_executor_kwargs'] = code_executor_kwargs
         _agents_cache['current_model_id'] = current_model_id
         _agents_cache['executor_type'] = executor_type
         
@@ -924,15 +1695,134 @@ RESPONSE FORMAT: The execute_python_code tool returns execution results includin
 
 # Startup is now handled by lifespan context manager
 
+def invoke_agent(role: str, prompt: str, session_id: Optional[str] = None):
+    """Run a prompt on a fresh agent of the given role ('code_generator' or 'code_executor').
+
+    Agents keep their conversation in memory and are not safe to call concurrently, so each
+    request gets its own instance built from the shared model and system prompt. For the
+    code executor, session_id selects the sandbox its execution tool runs in.
+    """
+    agent_kwargs = dict(_agents_cache[f'{role}_kwargs'])
+    if role == 'code_executor':
+        agent_kwargs['tools'] = [make_execute_python_code_tool(session_id or DEFAULT_POOL_KEY)]
+    agent = Agent(**agent_kwargs)
+    return agent(prompt)
+
+# Generation cache settings
+GENERATION_CACHE_SIZE = int(os.getenv('GENERATION_CACHE_SIZE', '256'))  # 0 disables the cache
+GENERATION_CACHE_TTL = int(os.getenv('GENERATION_CACHE_TTL', '3600'))
+GENERATION_CACHE_DB_PATH = os.getenv('GENERATION_CACHE_DB_PATH', '')  # SQLite file, empty keeps the cache in memory only
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace so prompts differing only in spacing share a cache entry"""
+    return " ".join(prompt.split())
+
+class GenerationCache:
+    """Prompt -> generated code cache keyed by model id and normalized prompt.
+
+    Entries expire after ttl_seconds and the least recently used entry is dropped beyond
+    max_entries. With a db_path entries are also kept in SQLite and survive restarts.
+    """
+    def __init__(self, max_entries: int = GENERATION_CACHE_SIZE, ttl_seconds: int = GENERATION_CACHE_TTL,
+                 db_path: str = GENERATION_CACHE_DB_PATH):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (code, created_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        if db_path and max_entries > 0:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("""CREATE TABLE IF NOT EXISTS generations (
+                cache_key TEXT PRIMARY KEY,
+                model_id TEXT NOT NULL,
+                code TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )""")
+            self._db.execute("DELETE FROM generations WHERE created_at < ?", (time.time() - ttl_seconds,))
+            self._db.commit()
+            # Warm the in-memory cache with the most recent entries
+            rows = self._db.execute(
+                "SELECT cache_key, code, created_at FROM generations ORDER BY created_at DESC LIMIT ?",
+                (max_entries,)).fetchall()
+            for cache_key, code, created_at in reversed(rows):
+                self._entries[cache_key] = (code, created_at)
+            print(f"💾 Loaded {len(rows)} cached generations from {db_path}")
+
+    @staticmethod
+    def key(model_id: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model_id}\n{normalize_prompt(prompt)}".encode('utf-8')).hexdigest()
+
+    def get(self, model_id: str, prompt: str) -> Optional[str]:
+        if self.max_entries <= 0:
+            return None
+        cache_key = self.key(model_id, prompt)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and time.time() - entry[1] > self.ttl_seconds:
+                del self._entries[cache_key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cache_key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, model_id: str, prompt: str, code: str):
+        if self.max_entries <= 0 or not code.strip():
+            return
+        cache_key = self.key(model_id, prompt)
+        created_at = time.time()
+        with self._lock:
+            self._entries[cache_key] = (code, created_at)
+            self._entries.move_to_end(cache_key)
+            evicted = []
+            while len(self._entries) > self.max_entries:
+                evicted.append(self._entries.popitem(last=False)[0])
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO generations (cache_key, model_id, code, created_at) VALUES (?, ?, ?, ?)",
+                    (cache_key, model_id, code, created_at))
+                self._db.executemany("DELETE FROM generations WHERE cache_key = ?", [(k,) for k in evicted])
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "persistent": self._db is not None
+            }
+
+generation_cache = GenerationCache()
+
+async def generate_code_cached(prompt: str, http_request: Optional[Request] = None) -> tuple[str, bool]:
+    """Generate code for a prompt, answering repeated prompts from the cache without calling the model.
+
+    Returns (generated code, whether it came from the cache).
+    """
+    model_id = globals().get('current_model_id', 'Unknown')
+    cached_code = generation_cache.get(model_id, prompt)
+    if cached_code is not None:
+        print(f"⚡ Generation cache hit for model {model_id}")
+        return cached_code, True
+    
+    agent_result = await run_blocking(invoke_agent, "code_generator", prompt,
+                                      timeout=GENERATION_TIMEOUT, http_request=http_request)
+    generated_code = str(agent_result) if agent_result is not None else ""
+    generation_cache.put(model_id, prompt, generated_code)
+    return generated_code, False
+
 def get_or_create_session(session_id: Optional[str] = None) -> CodeInterpreterSession:
     """Get existing session or create new one"""
-    if session_id is None:
-        session_id = str(uuid.uuid4())
-    
-    if session_id not in active_sessions:
-        active_sessions[session_id] = CodeInterpreterSession(session_id)
-    
-    return active_sessions[session_id]
+    return active_sessions.get_or_create(session_id)
 
 # Utility functions for code analysis
 def detect_chart_code(code: str) -> bool:
@@ -978,7 +1868,7 @@ def input(prompt=''):
     return input_setup + code
 
 @app.post("/api/generate-code")
-async def generate_code(request: CodeGenerationRequest):
+async def generate_code(request: CodeGenerationRequest, http_request: Request):
     """Generate Python code using the strands-agents code generator agent"""
     try:
         session = get_or_create_session(request.session_id)
@@ -1007,7 +1897,7 @@ async def generate_code(request: CodeGenerationRequest):
 You have access to a CSV file named '{session.uploaded_csv['filename']}' with the following content preview:
 
 ```csv
-{session.uploaded_csv['content'][:1000]}{'...' if len(session.uploaded_csv['content']) > 1000 else ''}
+{session.uploaded_csv['preview']}{'...' if session.uploaded_csv['truncated'] else ''}
 ```
 
 When generating code, assume this CSV data is available and can be loaded using pandas.read_csv() or similar methods. 
@@ -1055,11 +1945,8 @@ This ensures your charts are properly displayed in the web interface.
 """
             enhanced_prompt += chart_instructions
         
-        # Use the strands-agents agent for code generation
-        agent_result = code_generator_agent(enhanced_prompt)
-        
-        # Extract string content from AgentResult
-        generated_code = str(agent_result) if agent_result is not None else ""
+        # Use the strands-agents agent for code generation, repeated prompts come from the cache
+        generated_code, from_cache = await generate_code_cached(enhanced_prompt, http_request)
         
         # Store generation in session history
         session.conversation_history.append({
@@ -1069,22 +1956,27 @@ This ensures your charts are properly displayed in the web interface.
             "generated_code": generated_code,
             "agent": "strands_code_generator",
             "csv_used": session.uploaded_csv['filename'] if session.uploaded_csv else None,
+            "cached": from_cache,
             "timestamp": time.time()
         })
+        active_sessions.save(session)
         
         return {
             "success": True,
             "code": generated_code,
             "session_id": session.session_id,
             "agent_used": "strands_code_generator",
-            "csv_file_used": session.uploaded_csv['filename'] if session.uploaded_csv else None
+            "csv_file_used": session.uploaded_csv['filename'] if session.uploaded_csv else None,
+            "cached": from_cache
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code generation failed: {str(e)}")
 
 @app.post("/api/analyze-code")
-async def analyze_code(request: CodeExecutionRequest):
+async def analyze_code(request: CodeExecutionRequest, http_request: Request):
     """Analyze code to detect interactive elements and suggest inputs - OPTIMIZED"""
     try:
         is_interactive = detect_interactive_code(request.code)
@@ -1104,7 +1996,8 @@ Provide:
 
 Keep response short and practical."""
             
-            analysis_result = code_generator_agent(analysis_prompt)
+            analysis_result = await run_blocking(invoke_agent, "code_generator", analysis_prompt,
+                                                 timeout=GENERATION_TIMEOUT, http_request=http_request)
             
             return {
                 "success": True,
@@ -1120,11 +2013,13 @@ Keep response short and practical."""
                 "suggestions": None
             }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Code analysis failed: {str(e)}")
 
 @app.post("/api/execute-code")
-async def execute_code(request: CodeExecutionRequest):
+async def execute_code(request: CodeExecutionRequest, http_request: Request):
     """Execute Python code using hybrid approach: direct AgentCore for charts, Strands-Agents for others"""
     try:
         session = get_or_create_session(request.session_id)
@@ -1179,15 +2074,22 @@ async def execute_code(request: CodeExecutionRequest):
         if session.uploaded_csv:
             session_files.append({
                 'filename': session.uploaded_csv['filename'],
-                'content': session.uploaded_csv['content']
+                'sha256': session.uploaded_csv['sha256'],
+                'size': session.uploaded_csv['size']
             })
         
+        # On timeout or client disconnect stop the session's sandbox so the execution is abandoned
+        def abandon_execution():
+            get_code_interpreter_pool().discard(session.session_id)
+        
         # REVERTED: Use original logic - only force direct AgentCore for charts and files, NOT for interactive
         if is_chart_code or session_files:
             print(f"🎨 Chart code detected - using direct AgentCore execution")
             
             # Use direct AgentCore execution to preserve full base64 output
-            execution_result_str, images = execute_chart_code_direct(prepared_code, session_files)
+            execution_result_str, images = await run_blocking(
+                execute_chart_code_direct, prepared_code, session_files, session.session_id,
+                timeout=EXECUTION_TIMEOUT, http_request=http_request, on_cancel=abandon_execution)
             agent_used = "direct_agentcore_charts"
             
         else:
@@ -1197,7 +2099,9 @@ async def execute_code(request: CodeExecutionRequest):
             # since Strands-Agents tools can't easily access session files
             if session_files:
                 print(f"📁 Files detected - switching to direct AgentCore for file access")
-                execution_result_str, images = execute_chart_code_direct(prepared_code, session_files)
+                execution_result_str, images = await run_blocking(
+                    execute_chart_code_direct, prepared_code, session_files, session.session_id,
+                    timeout=EXECUTION_TIMEOUT, http_request=http_request, on_cancel=abandon_execution)
                 agent_used = "direct_agentcore_with_files"
             else:
                 # Use strands-agents with AgentCore tool for regular code without files
@@ -1209,7 +2113,9 @@ async def execute_code(request: CodeExecutionRequest):
 
 Use the tool to run the code and return the complete output."""
                 
-                execution_result = code_executor_agent(execution_prompt)
+                execution_result = await run_blocking(
+                    invoke_agent, "code_executor", execution_prompt, session.session_id,
+                    timeout=EXECUTION_TIMEOUT, http_request=http_request, on_cancel=abandon_execution)
                 
                 # Debug the AgentResult structure
                 print(f"🔍 AgentResult type: {type(execution_result)}")
@@ -1218,8 +2124,8 @@ Use the tool to run the code and return the complete output."""
                 execution_result_str = extract_text_from_agent_result(execution_result)
                 print(f"📊 Extracted text length: {len(execution_result_str)}")
                 
-                # Extract image data from execution results
-                images = extract_image_data(execution_result_str)
+                # Store images from execution results and return them by reference
+                execution_result_str, images = split_output_and_images(execution_result_str)
                 agent_used = "strands_agents_with_agentcore"
         
         # Calculate execution duration
@@ -1243,6 +2149,7 @@ Use the tool to run the code and return the complete output."""
             "start_time": execution_start_time,
             "end_time": execution_end_time
         })
+        active_sessions.save(session)
         
         return {
             "success": True,
@@ -1256,6 +2163,8 @@ Use the tool to run the code and return the complete output."""
             "is_chart_code": is_chart_code
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"❌ Code execution failed: {str(e)}")
         import traceback
@@ -1270,6 +2179,7 @@ async def clear_csv_from_session(session_id: str):
         
         if session.uploaded_csv:
             filename = session.uploaded_csv['filename']
+            digest = session.uploaded_csv['sha256']
             
             # Clear CSV from session
             session.uploaded_csv = None
@@ -1280,6 +2190,8 @@ async def clear_csv_from_session(session_id: str):
                 "filename": filename,
                 "timestamp": time.time()
             })
+            active_sessions.save(session)
+            release_upload(digest)
             
             print(f"🗑️ CSV file '{filename}' cleared from session {session_id}")
             
@@ -1299,6 +2211,40 @@ async def clear_csv_from_session(session_id: str):
         print(f"❌ Error clearing CSV from session: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to clear CSV: {str(e)}")
 
+def register_csv_upload(session: CodeInterpreterSession, filename: str, digest: str, size: int) -> str:
+    """Point the session at a stored CSV upload, returns the preview text"""
+    preview = get_upload_store().preview(digest)
+    previous = session.uploaded_csv
+    
+    session.conversation_history.append({
+        "type": "csv_upload",
+        "filename": filename,
+        "sha256": digest,
+        "size": size,
+        "timestamp": time.time()
+    })
+    
+    # Store CSV metadata for code generation, the content stays in the upload store
+    session.uploaded_csv = {
+        "filename": filename,
+        "sha256": digest,
+        "size": size,
+        "preview": preview,
+        "truncated": size > len(preview.encode('utf-8')),
+        "timestamp": asyncio.get_event_loop().time()
+    }
+    
+    active_sessions.save(session)
+    if previous and previous['sha256'] != digest:
+        release_upload(previous['sha256'])
+    return preview
+
+def release_upload(digest: str):
+    """Remove a stored upload once no session refers to it"""
+    if active_sessions.references_upload(digest):
+        return
+    get_upload_store().remove(digest)
+
 @app.post("/api/upload-csv")
 async def upload_csv_file(request: FileUploadRequest):
     """Upload and process a CSV file"""
@@ -1309,29 +2255,47 @@ async def upload_csv_file(request: FileUploadRequest):
         if not request.filename.lower().endswith('.csv'):
             raise HTTPException(status_code=400, detail="Only CSV files are allowed")
         
-        # Store CSV file in session
-        session.conversation_history.append({
-            "type": "csv_upload",
-            "filename": request.filename,
-            "content": request.content,
-            "timestamp": time.time()
-        })
+        digest, size = get_upload_store().put_text(request.content)
+        preview = register_csv_upload(session, request.filename, digest, size)
         
-        # Store CSV data for code generation
-        session.uploaded_csv = {
+        return {
+            "success": True,
+            "message": f"CSV file {request.filename} uploaded successfully",
+            "session_id": session.session_id,
             "filename": request.filename,
-            "content": request.content,
-            "timestamp": asyncio.get_event_loop().time()
+            "sha256": digest,
+            "preview": preview[:500] + "..." if len(preview) > 500 else preview
         }
         
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"CSV upload failed: {str(e)}")
+
+@app.post("/api/upload-csv/stream")
+async def upload_csv_file_stream(request: Request, filename: str, session_id: Optional[str] = None):
+    """Upload a CSV file sent as the raw request body, streamed to disk in chunks"""
+    try:
+        if not filename.lower().endswith('.csv'):
+            raise HTTPException(status_code=400, detail="Only CSV files are allowed")
+        
+        session = get_or_create_session(session_id)
+        digest, size = await get_upload_store().put_stream(request.stream())
+        preview = register_csv_upload(session, filename, digest, size)
+        print(f"📁 Streamed CSV upload {filename}: {size} bytes")
+        
         return {
             "success": True,
-            "message": f"CSV file {request.filename} uploaded successfully",
+            "message": f"CSV file {filename} uploaded successfully",
             "session_id": session.session_id,
-            "filename": request.filename,
-            "preview": request.content[:500] + "..." if len(request.content) > 500 else request.content
+            "filename": filename,
+            "sha256": digest,
+            "size": size,
+            "preview": preview[:500] + "..." if len(preview) > 500 else preview
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"CSV upload failed: {str(e)}")
 
@@ -1348,6 +2312,7 @@ async def upload_file(request: FileUploadRequest):
             "content": request.content,
             "timestamp": time.time()
         })
+        active_sessions.save(session)
         
         return {
             "success": True,
@@ -1363,11 +2328,10 @@ async def upload_file(request: FileUploadRequest):
 async def get_session_history(session_id: str):
     """Get session history"""
     try:
-        if session_id not in active_sessions:
+        session = active_sessions.get(session_id)
+        if session is None:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        session = active_sessions[session_id]
-        
         return {
             "success": True,
             "session_id": session_id,
@@ -1375,6 +2339,8 @@ async def get_session_history(session_id: str):
             "execution_results": session.execution_results
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get session history: {str(e)}")
 
@@ -1411,7 +2377,8 @@ async def get_agents_status():
             "executor_type": executor_type,
             "current_model": current_model,
             "aws_region": aws_region,
-            "authentication": "AWS Profile" if os.getenv('AWS_PROFILE') else "Access Keys"
+            "authentication": "AWS Profile" if os.getenv('AWS_PROFILE') else "Access Keys",
+            "generation_cache": generation_cache.stats()
         }
         
     except Exception as e:
@@ -1423,6 +2390,60 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await websocket.accept()
     print(f"WebSocket connected for session {session_id}")
     
+    # Execution events arrive on worker threads; a sender task forwards them in order
+    loop = asyncio.get_running_loop()
+    outgoing = asyncio.Queue()
+    
+    def forward_execution_event(event: Dict[str, Any]):
+        loop.call_soon_threadsafe(outgoing.put_nowait, {**event, "session_id": session_id})
+    
+    async def send_events():
+        while True:
+            event = await outgoing.get()
+            await websocket.send_text(json.dumps(event))
+    
+    async def execute_code(code: str):
+        """Run code in the session's sandbox, output/images are streamed as they arrive"""
+        try:
+            await outgoing.put({"type": "execution_started", "session_id": session_id})
+            if executor_type == "agentcore":
+                session = get_or_create_session(session_id)
+                session_files = []
+                if session.uploaded_csv:
+                    session_files.append({
+                        'filename': session.uploaded_csv['filename'],
+                        'sha256': session.uploaded_csv['sha256'],
+                        'size': session.uploaded_csv['size']
+                    })
+                
+                execution_result, images = await run_blocking(
+                    execute_chart_code_direct, code, session_files, session_id,
+                    timeout=EXECUTION_TIMEOUT,
+                    on_cancel=lambda: get_code_interpreter_pool().discard(session_id))
+            else:
+                agent_result = await run_blocking(
+                    invoke_agent, "code_executor", f"Simulate execution of: {code}", session_id,
+                    timeout=EXECUTION_TIMEOUT)
+                execution_result, images = split_output_and_images(extract_text_from_agent_result(agent_result))
+            
+            await outgoing.put({
+                "type": "execution_result",
+                "success": True,
+                "result": execution_result,
+                "images": images,
+                "session_id": session_id
+            })
+        except Exception as e:
+            await outgoing.put({
+                "type": "error",
+                "success": False,
+                "error": str(e)
+            })
+    
+    execution_listeners[session_id] = forward_execution_event
+    sender_task = asyncio.create_task(send_events())
+    execution_task = None
+    
     try:
         while True:
             data = await websocket.receive_text()
@@ -1431,47 +2452,57 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
             if message["type"] == "generate_code":
                 # Handle code generation via WebSocket
                 try:
-                    agent_result = code_generator_agent(message["prompt"])
+                    generated_code, from_cache = await generate_code_cached(message["prompt"])
                     
-                    # Extract string content from AgentResult
-                    generated_code = str(agent_result) if agent_result is not None else ""
-                    
-                    await websocket.send_text(json.dumps({
+                    await outgoing.put({
                         "type": "code_generated",
                         "success": True,
                         "code": generated_code,
+                        "cached": from_cache,
                         "session_id": session_id
-                    }))
+                    })
                 except Exception as e:
-                    await websocket.send_text(json.dumps({
+                    await outgoing.put({
                         "type": "error",
                         "success": False,
                         "error": str(e)
-                    }))
+                    })
             
             elif message["type"] == "execute_code":
-                # Handle code execution via WebSocket
-                try:
-                    if executor_type == "agentcore":
-                        execution_result = code_executor_agent(f"Execute this code: {message['code']}")
-                    else:
-                        execution_result = code_executor_agent(f"Simulate execution of: {message['code']}")
-                    
-                    await websocket.send_text(json.dumps({
-                        "type": "execution_result",
-                        "success": True,
-                        "result": execution_result,
-                        "session_id": session_id
-                    }))
-                except Exception as e:
-                    await websocket.send_text(json.dumps({
+                # Run as a task so the receive loop notices a disconnect while the code runs
+                if execution_task is not None and not execution_task.done():
+                    await outgoing.put({
                         "type": "error",
                         "success": False,
-                        "error": str(e)
-                    }))
+                        "error": "An execution is already running for this session"
+                    })
+                else:
+                    execution_task = asyncio.create_task(execute_code(message["code"]))
                     
     except WebSocketDisconnect:
         print(f"WebSocket disconnected for session {session_id}")
+    finally:
+        if execution_task is not None and not execution_task.done():
+            # run_blocking discards the session's interpreter, which stops the sandbox run
+            print(f"🚫 Abandoning execution for disconnected session {session_id}")
+            execution_task.cancel()
+        if execution_listeners.get(session_id) is forward_execution_event:
+            del execution_listeners[session_id]
+        sender_task.cancel()
+
+@app.get("/api/images/{image_id}")
+async def get_image(image_id: str):
+    """Serve a chart image extracted from execution output"""
+    match = IMAGE_ID_PATTERN.match(image_id)
+    if not match or not get_image_store().exists(image_id):
+        raise HTTPException(status_code=404, detail="Image not found")
+    
+    # Image ids are content hashes, so the response never changes
+    return FileResponse(
+        get_image_store().path(image_id),
+        media_type=f"image/{match.group(1)}",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
 
 @app.get("/health")
 async def health_check():
@@ -1486,6 +2517,9 @@ async def health_check():
         "current_model": current_model,
         "aws_region": aws_region,
         "authentication": "AWS Profile" if os.getenv('AWS_PROFILE') else "Access Keys",
+        "code_interpreter_pool": code_interpreter_pool.stats() if code_interpreter_pool else None,
+        "blocking_executor": blocking_executor_stats(),
+        "sessions": active_sessions.stats(),
         "architecture": {
             "code_generation": f"Strands-Agents Agent ({current_model})",
             "code_execution": f"{executor_type.title().replace('_', ' ')} Agent ({current_model})"
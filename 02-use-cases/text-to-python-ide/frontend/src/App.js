@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useMemo, useRef } from 'react';
 import {
   AppLayout,
   ContentLayout,
@@ -23,10 +23,20 @@ import SessionHistory from './components/SessionHistory';
 import InteractiveExecutionModal from './components/InteractiveExecutionModal';
 import CsvUploadModal from './components/CsvUploadModal';
 import ExecutionTimer from './components/ExecutionTimer';
-import { generateCode, executeCode, uploadFile, uploadCsvFile, getSessionHistory, analyzeCode } from './services/api';
+import { generateCode, executeCode, uploadFile, uploadCsvFile, getSessionHistory, analyzeCode, WebSocketService, appendExecutionEvent } from './services/api';
 import { v4 as uuidv4 } from 'uuid';
 import '@cloudscape-design/global-styles/index.css';
 
+// Placeholder result that streamed output and images are appended to while code runs
+const startStreamingResult = (code, interactive = false) => ({
+  code: code,
+  result: '',
+  images: [],
+  interactive: interactive,
+  streaming: true,
+  timestamp: new Date().toISOString()
+});
+
 function App() {
   const [sessionId, setSessionId] = useState(null);
   const [prompt, setPrompt] = useState('');
@@ -47,6 +57,9 @@ function App() {
   const [uploadedCsv, setUploadedCsv] = useState(null);
   const [csvUploadLoading, setCsvUploadLoading] = useState(false);
   const [isExecuting, setIsExecuting] = useState(false);
+  // Read by WebSocket handlers so editing code does not reconnect the socket
+  const editedCodeRef = useRef(editedCode);
+  editedCodeRef.current = editedCode;
 
   // Memoized session ID initialization
   const initialSessionId = useMemo(() => uuidv4(), []);
@@ -59,49 +72,50 @@ function App() {
   useEffect(() => {
     // Initialize WebSocket connection when sessionId is available
     if (sessionId) {
-      const ws = new WebSocket(`ws://localhost:8000/ws/${sessionId}`);
+      const ws = new WebSocketService(sessionId);
       
-      ws.onopen = () => {
-        // WebSocket connection established
-      };
+      ws.on('code_generated', (data) => {
+        if (!data.success) return;
+        const code = typeof data.code === 'string' ? data.code : '';
+        setGeneratedCode(code);
+        setEditedCode(code);
+        setActiveTab('editor');
+        setSuccessMessage('Code generated successfully via WebSocket!');
+        setTimeout(() => setSuccessMessage(null), 5000);
+      });
       
-      ws.onmessage = (event) => {
-        const data = JSON.parse(event.data);
-        
-        if (data.type === 'code_generated' && data.success) {
-          const code = typeof data.code === 'string' ? data.code : '';
-          setGeneratedCode(code);
-          setEditedCode(code);
-          setActiveTab('editor');
-          setSuccessMessage('Code generated successfully via WebSocket!');
-          setTimeout(() => setSuccessMessage(null), 5000);
-        } else if (data.type === 'execution_result' && data.success) {
-          setExecutionResult({
-            code: editedCode,
-            result: data.result,
-            success: data.success,
-            images: data.images || [],
-            timestamp: new Date().toISOString()
-          });
-          setActiveTab('results');
-        }
-      };
+      ws.on('execution_started', () => {
+        setExecutionResult(startStreamingResult(editedCodeRef.current));
+        setActiveTab('results');
+      });
       
-      ws.onclose = () => {
-        // WebSocket connection closed
+      // Output and charts are streamed while the code runs, for HTTP and WebSocket executions
+      const onExecutionEvent = (data) => {
+        setExecutionResult((previous) => appendExecutionEvent(previous, data));
       };
+      ws.on('execution_output', onExecutionEvent);
+      ws.on('execution_image', onExecutionEvent);
       
-      ws.onerror = (error) => {
-      };
+      ws.on('execution_result', (data) => {
+        if (!data.success) return;
+        setExecutionResult({
+          code: editedCodeRef.current,
+          result: data.result,
+          success: data.success,
+          images: data.images || [],
+          timestamp: new Date().toISOString()
+        });
+        setActiveTab('results');
+      });
+      
+      ws.connect();
       
       // Cleanup on unmount
       return () => {
-        if (ws.readyState === WebSocket.OPEN) {
-          ws.close();
-        }
+        ws.disconnect();
       };
     }
-  }, [sessionId, editedCode]);
+  }, [sessionId]);
 
   const handleGenerateCode = async () => {
     if (!prompt.trim()) {
@@ -176,6 +190,8 @@ function App() {
     setLoading(true);
     setIsExecuting(true);
     setError(null);
+    setExecutionResult(startStreamingResult(code, interactive));
+    setActiveTab('results');
 
     try {
       const response = await executeCode(code, sessionId, interactive, inputs);
@@ -195,6 +211,7 @@ function App() {
         setSessionHistory(null);
       }
     } catch (err) {
+      setExecutionResult(null);
       setError(`Code execution failed: ${err.message}`);
     } finally {
       setLoading(false);
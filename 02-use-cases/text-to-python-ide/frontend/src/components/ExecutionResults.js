@@ -16,6 +16,11 @@ import ImageDisplay from './ImageDisplay';
 
 const ExecutionResults = memo(({ result, onExecuteAgain }) => {
   const isError = useMemo(() => {
+    // Still running, output is being streamed in
+    if (result?.streaming) {
+      return false;
+    }
+    
     // Check if there's an explicit success field (false means error)
     if (result?.success !== undefined) {
       return !result.success;
@@ -36,7 +41,7 @@ const ExecutionResults = memo(({ result, onExecuteAgain }) => {
     }
     
     return false;
-  }, [result?.result, result?.success]);
+  }, [result?.result, result?.success, result?.streaming]);
 
   const formatTimestamp = useMemo(() => {
     if (!result?.timestamp) return '';
@@ -72,9 +77,13 @@ const ExecutionResults = memo(({ result, onExecuteAgain }) => {
         <ColumnLayout columns={2}>
           <Box>
             <Box variant="awsui-key-label">Status</Box>
-            <StatusIndicator type={isError ? "error" : "success"}>
-              {isError ? "Execution Failed" : "Execution Successful"}
-            </StatusIndicator>
+            {result.streaming ? (
+              <StatusIndicator type="in-progress">Running</StatusIndicator>
+            ) : (
+              <StatusIndicator type={isError ? "error" : "success"}>
+                {isError ? "Execution Failed" : "Execution Successful"}
+              </StatusIndicator>
+            )}
           </Box>
           <Box>
             <Box variant="awsui-key-label">Executed At</Box>
@@ -119,7 +128,7 @@ const ExecutionResults = memo(({ result, onExecuteAgain }) => {
               <CodeDisplay content={result.result} />
             </Alert>
           ) : (
-            <CodeDisplay content={result.result || 'No output generated'} />
+            <CodeDisplay content={result.result || (result.streaming ? 'Waiting for output...' : 'No output generated')} />
           )}
         </Container>
 
@@ -9,19 +9,37 @@ import {
   Badge
 } from '@cloudscape-design/components';
 
+const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+
+// Images are served by the backend by reference; older results still carry inline base64
+const getImageSrc = (image) => (
+  image.url ? `${API_BASE_URL}${image.url}` : `data:image/${image.format || 'png'};base64,${image.data}`
+);
+
 const ImageDisplay = memo(({ images = [] }) => {
   if (!images || images.length === 0) {
     return null;
   }
 
-  const downloadImage = (imageData, index) => {
+  const downloadImage = async (image, index) => {
     try {
+      // The download attribute is ignored for cross-origin URLs, so fetch the image first
+      let href = getImageSrc(image);
+      let objectUrl = null;
+      if (image.url) {
+        const response = await fetch(href);
+        objectUrl = URL.createObjectURL(await response.blob());
+        href = objectUrl;
+      }
       const link = document.createElement('a');
-      link.href = `data:image/png;base64,${imageData}`;
-      link.download = `chart_${index + 1}.png`;
+      link.href = href;
+      link.download = `chart_${index + 1}.${image.format === 'jpeg' ? 'jpg' : 'png'}`;
       document.body.appendChild(link);
       link.click();
       document.body.removeChild(link);
+      if (objectUrl) {
+        URL.revokeObjectURL(objectUrl);
+      }
     } catch (error) {
       // eslint-disable-next-line no-console
       console.error('Failed to download image:', error);
@@ -40,14 +58,14 @@ const ImageDisplay = memo(({ images = [] }) => {
                 <Button
                   variant="link"
                   iconName="download"
-                  onClick={() => downloadImage(images[0].data, 0)}
+                  onClick={() => downloadImage(images[0], 0)}
                 >
                   Download PNG
                 </Button>
               </Box>
               <Box textAlign="center">
                 <img
-                  src={`data:image/png;base64,${images[0].data}`}
+                  src={getImageSrc(images[0])}
                   alt="Generated Chart 1"
                   style={{
                     maxWidth: '100%',
@@ -71,14 +89,14 @@ const ImageDisplay = memo(({ images = [] }) => {
                     <Button
                       variant="link"
                       iconName="download"
-                      onClick={() => downloadImage(image.data, index)}
+                      onClick={() => downloadImage(image, index)}
                     >
                       Download PNG
                     </Button>
                   </Box>
                   <Box textAlign="center">
                     <img
-                      src={`data:image/png;base64,${image.data}`}
+                      src={getImageSrc(image)}
                       alt={`Generated Chart ${index + 1}`}
                       style={{
                         maxWidth: '100%',
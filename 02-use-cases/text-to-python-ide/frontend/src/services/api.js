@@ -86,10 +86,10 @@ export const analyzeCode = async (code, sessionId = null) => {
 
 export const uploadCsvFile = async (filename, content, sessionId = null) => {
   try {
-    const response = await api.post('/api/upload-csv', {
-      filename,
-      content,
-      session_id: sessionId
+    // Send the CSV as the raw body so large files are streamed to disk by the backend
+    const response = await api.post('/api/upload-csv/stream', content, {
+      params: { filename, session_id: sessionId || undefined },
+      headers: { 'Content-Type': 'text/csv' }
     });
     return response;
   } catch (error) {
@@ -235,4 +235,18 @@ export class WebSocketService {
   }
 }
 
+// Apply a streamed execution event (execution_output / execution_image) to a running result
+export const appendExecutionEvent = (result, event) => {
+  if (!result || !result.streaming) {
+    return result;
+  }
+  if (event.type === 'execution_image' && event.image) {
+    return { ...result, images: [...(result.images || []), event.image] };
+  }
+  if (event.type === 'execution_output' && event.text) {
+    return { ...result, result: (result.result || '') + event.text };
+  }
+  return result;
+};
+
 export default api;
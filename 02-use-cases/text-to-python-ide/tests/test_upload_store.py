@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script to verify chunked reads from the upload store
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent / 'backend'))
+
+def test_long_non_ascii_line():
+    """Test that a line longer than a chunk is not split inside a UTF-8 character"""
+    print("🧪 Testing Long Non-ASCII Line")
+    print("=" * 50)
+
+    from main import UploadStore
+
+    content = "name,city\n" + "é" * 25 + ",Zürich\n" + "ü" * 5 + "\n"
+    with tempfile.TemporaryDirectory() as directory:
+        store = UploadStore(directory)
+        digest, _ = store.put_text(content)
+
+        try:
+            # An odd chunk size makes a naive byte cut land inside a character
+            chunks = list(store.iter_text_chunks(digest, chunk_bytes=7))
+        except UnicodeDecodeError as e:
+            print(f"❌ Chunk could not be decoded: {e}")
+            return False
+
+    if "".join(chunks) != content:
+        print("❌ Chunks do not reassemble to the original content")
+        return False
+
+    print(f"✅ Read {len(content)} characters in {len(chunks)} chunks")
+    return True
+
+def test_prune():
+    """Test that pruning removes expired files and then the oldest ones over budget"""
+    print("\n🧪 Testing Store Pruning")
+    print("=" * 50)
+
+    import os
+    import time
+    from main import UploadStore
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = UploadStore(directory)
+        now = time.time()
+        keys = []
+        for age in (7200, 300, 200, 100):
+            key, _ = store.put_bytes(f"image aged {age}".encode() * 100, ".png")
+            os.utime(store.path(key), (now - age, now - age))
+            keys.append(key)
+
+        # The first file is expired, the second is the oldest over the budget
+        removed = store.prune(max_age_seconds=3600, max_total_bytes=3000)
+        remaining = [key for key in keys if store.exists(key)]
+
+    if removed != 2 or remaining != keys[2:]:
+        print(f"❌ Expected the two oldest files to be removed, {removed} removed")
+        return False
+
+    print("✅ Expired and over-budget files removed")
+    return True
+
+def main():
+    """Run all upload store tests"""
+    print("🎯 Upload Store Testing")
+    print("=" * 60)
+
+    success = test_long_non_ascii_line()
+    success = test_prune() and success
+
+    print("\n🎯 SUMMARY")
+    print("=" * 30)
+    print("✅ All upload store tests passed" if success else "❌ Upload store tests failed")
+
+    return 0 if success else 1
+
+if __name__ == "__main__":
+    sys.exit(main())